@@ -0,0 +1,323 @@
+import asyncio
+import json
+import os
+import re
+from datetime import date, timedelta
+from urllib.parse import parse_qs
+
+from utils.aggregates import range_totals
+from utils.exporter import DATASETS, FORMATS, export_chunks, export_file_name
+from utils.food_api import FoodApiError, food_entry, search_foods_async
+from utils.forecast import MIN_ENTRIES, forecast_weights
+from utils.instrumentation import set_page
+from utils.meal_store import append_entry, delete_entry, load_day, update_entry
+from utils.storage import PROFILE_FILE, user_file
+from utils.weights import add_weights, load_weights
+
+# -------------------- REST API --------------------
+# Headless ASGI service for mobile and partner clients, on the same storage and caches as the pages:
+#   uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+#
+#   GET  /health
+#   POST /users/<profile_id>/meals            {"date", "category", "query", "quantity"}  food looked up at USDA
+#                                             {"date", "category", "title", "nutrition"} logged as given
+#   PATCH /users/<profile_id>/meals/<id>      {"date", "category", "title", "nutrition"}, each optional
+#   DELETE /users/<profile_id>/meals/<id>     one entry, <id> is the "id" of the entries returned
+#   GET  /users/<profile_id>/days/<date>      entries of a day, ?category=Breakfast to filter
+#   GET  /users/<profile_id>/totals           per day totals, ?from=2025-05-01&to=2025-05-31 (default: last 7 days)
+#   GET  /users/<profile_id>/weights          weight series, ?from=&to=
+#   POST /users/<profile_id>/weights          {"date", "weight"} or {"weights": [{"date", "weight"}, ...]}
+#   GET  /users/<profile_id>/forecast         weight forecast, ?days=30 (1-30), needs MIN_ENTRIES weights
+#   GET  /users/<profile_id>/export/<dataset> meals, weights or body_composition as a streamed file,
+#                                             ?format=csv|jsonl|parquet&from=&to=
+#
+# Reads, writes and the forecast run in worker threads: a cache miss reads month or weight files (and the
+# first read of an old history adds the entry ids, utils/meal_store.py), which must not block the event loop.
+# USDA lookups use httpx.AsyncClient when installed (utils/food_api.py), so one slow upstream call never
+# blocks other requests.
+# Several workers are fine: writes of one user are serialized across processes by user_lock() (an flock in the
+# user's partition, utils/storage.py) and the caches of every worker are keyed by file version.
+# The profile id is the credential, exactly like the "profile" query parameter of the pages.
+MEAL_CATEGORIES = ("Breakfast", "Lunch", "Dinner", "Snack")
+MAX_BODY_BYTES = 1024 * 1024
+MAX_RANGE_DAYS = 3660       # ten years of daily totals per request
+MAX_FORECAST_DAYS = 30
+DEFAULT_TOTALS_DAYS = 7
+
+PROFILE = r"/users/(?P<profile_id>[0-9a-f]{32})"
+ENTRY = r"/meals/(?P<entry_id>[0-9a-f]{32})"
+
+
+class Stream:
+    # Response body sent in chunks (utils/exporter.py), the chunks are produced in a worker thread
+    def __init__(self, chunks, content_type, file_name):
+        self.chunks = chunks
+        self.content_type = content_type
+        self.file_name = file_name
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# -------------------- PARAMETERS --------------------
+def _date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be a date like 2025-05-15") from None
+
+
+def _number(value, name, minimum, maximum):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be a number") from None
+    if not minimum <= number <= maximum:
+        raise ApiError(400, f"'{name}' must be between {minimum} and {maximum}")
+    return number
+
+
+def _category(value):
+    if value not in MEAL_CATEGORIES:
+        raise ApiError(400, f"'category' must be one of {', '.join(MEAL_CATEGORIES)}")
+    return value
+
+
+def _require_profile(profile_id):
+    if not os.path.exists(user_file(profile_id, PROFILE_FILE)):
+        raise ApiError(404, "Unknown profile")
+
+
+def _date_range(query, default_days):
+    end = _date(query["to"], "to") if "to" in query else date.today()
+    start = _date(query["from"], "from") if "from" in query else end - timedelta(days=default_days - 1)
+    if start > end:
+        raise ApiError(400, "'from' is after 'to'")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ApiError(400, f"At most {MAX_RANGE_DAYS} days per request")
+    return start, end
+
+# -------------------- HANDLERS --------------------
+async def health(query, body):
+    return 200, {"status": "ok"}
+
+
+async def log_food(query, body, profile_id):
+    _require_profile(profile_id)
+    day = _date(body.get("date"), "date").isoformat()
+    category = _category(body.get("category"))
+    if "nutrition" in body:
+        nutrition = body["nutrition"]
+        if not isinstance(nutrition, dict):
+            raise ApiError(400, "'nutrition' must be an object")
+        entry = {"recipe_title": str(body.get("title") or "Manual entry"), "selected_date": day,
+                 "meal_category": category,
+                 "nutrition": {key: _number(nutrition.get(key, 0), key, 0, 100000)
+                               for key in ("calories", "carbohydrates", "fat", "protein")}}
+    else:
+        food_query = body.get("query")
+        if not food_query or not isinstance(food_query, str):
+            raise ApiError(400, "'query' or 'nutrition' is required")
+        quantity = _number(body.get("quantity", 100), "quantity", 1, 10000)
+        try:
+            foods = await search_foods_async(food_query)
+        except FoodApiError as e:
+            raise ApiError(502, str(e)) from None
+        if not foods:
+            raise ApiError(404, f"No food found for '{food_query}'")
+        entry = food_entry(foods[0], day, category, quantity)
+    await asyncio.to_thread(append_entry, profile_id, entry)
+    return 201, entry
+
+
+async def list_day(query, body, profile_id, day):
+    _require_profile(profile_id)
+    day = _date(day, "date").isoformat()
+    category = _category(query["category"]) if "category" in query else None
+    return 200, {"date": day, "entries": await asyncio.to_thread(load_day, profile_id, day, category)}
+
+
+async def edit_food(query, body, profile_id, entry_id):
+    _require_profile(profile_id)
+    changes = {}
+    if "date" in body:
+        changes["selected_date"] = _date(body["date"], "date").isoformat()
+    if "category" in body:
+        changes["meal_category"] = _category(body["category"])
+    if "title" in body:
+        changes["recipe_title"] = str(body["title"])
+    if "nutrition" in body:
+        if not isinstance(body["nutrition"], dict):
+            raise ApiError(400, "'nutrition' must be an object")
+        changes["nutrition"] = {key: _number(body["nutrition"].get(key, 0), key, 0, 100000)
+                                for key in ("calories", "carbohydrates", "fat", "protein")}
+    if not changes:
+        raise ApiError(400, "Nothing to change, give 'date', 'category', 'title' or 'nutrition'")
+    entry = await asyncio.to_thread(update_entry, profile_id, entry_id, changes)
+    if entry is None:
+        raise ApiError(404, "Unknown meal")
+    return 200, entry
+
+
+async def remove_food(query, body, profile_id, entry_id):
+    _require_profile(profile_id)
+    if not await asyncio.to_thread(delete_entry, profile_id, entry_id):
+        raise ApiError(404, "Unknown meal")
+    return 200, {"deleted": entry_id}
+
+
+async def totals(query, body, profile_id):
+    _require_profile(profile_id)
+    start, end = _date_range(query, DEFAULT_TOTALS_DAYS)
+    days = await asyncio.to_thread(range_totals, profile_id, start, end)
+    return 200, {"from": start.isoformat(), "to": end.isoformat(), "days": days}
+
+
+async def get_weights(query, body, profile_id):
+    _require_profile(profile_id)
+    start = _date(query["from"], "from").isoformat() if "from" in query else None
+    end = _date(query["to"], "to").isoformat() if "to" in query else None
+    weights = await asyncio.to_thread(load_weights, profile_id, start, end)
+    return 200, {"weights": [{"date": day, "weight": weight} for day, weight in weights]}
+
+
+async def post_weights(query, body, profile_id):
+    _require_profile(profile_id)
+    rows = body.get("weights", [body])
+    if not isinstance(rows, list) or not rows:
+        raise ApiError(400, "'weights' must be a non-empty list")
+    entries = [(_date(row.get("date"), "date").isoformat(), _number(row.get("weight"), "weight", 30, 300))
+               for row in rows if isinstance(row, dict)]
+    if len(entries) != len(rows):
+        raise ApiError(400, "Every weight needs 'date' and 'weight'")
+    count = await asyncio.to_thread(add_weights, profile_id, entries)
+    return 201, {"saved": len(entries), "total": count}
+
+
+async def forecast(query, body, profile_id):
+    _require_profile(profile_id)
+    days = int(_number(query.get("days", MAX_FORECAST_DAYS), "days", 1, MAX_FORECAST_DAYS))
+    weights = await asyncio.to_thread(load_weights, profile_id)   # only rows with a valid date (utils/weights.py)
+    if len(weights) < MIN_ENTRIES:
+        raise ApiError(409, f"A forecast needs at least {MIN_ENTRIES} weights")
+    predictions = await asyncio.to_thread(forecast_weights, [weight for _, weight in weights], days)
+    last_day = date.fromisoformat(weights[-1][0])
+    return 200, {"forecast": [{"date": (last_day + timedelta(days=i + 1)).isoformat(), "weight": round(weight, 2)}
+                              for i, weight in enumerate(predictions)]}
+
+
+
+async def export(query, body, profile_id, dataset):
+    _require_profile(profile_id)
+    fmt = query.get("format", "csv")
+    if dataset not in DATASETS:
+        raise ApiError(404, f"Unknown dataset, one of {', '.join(DATASETS)}")
+    start = _date(query["from"], "from").isoformat() if "from" in query else None
+    end = _date(query["to"], "to").isoformat() if "to" in query else None
+    try:
+        chunks = export_chunks(profile_id, dataset, fmt, start, end)
+    except ValueError as e:
+        raise ApiError(400, str(e)) from None
+    return 200, Stream(chunks, FORMATS[fmt][0], export_file_name(dataset, fmt, start, end))
+
+
+ROUTES = [(method, re.compile(f"^{pattern}$"), handler) for method, pattern, handler in (
+    ("GET", r"/health", health),
+    ("POST", PROFILE + r"/meals", log_food),
+    ("PATCH", PROFILE + ENTRY, edit_food),
+    ("DELETE", PROFILE + ENTRY, remove_food),
+    ("GET", PROFILE + r"/days/(?P<day>[0-9-]{10})", list_day),
+    ("GET", PROFILE + r"/totals", totals),
+    ("GET", PROFILE + r"/weights", get_weights),
+    ("POST", PROFILE + r"/weights", post_weights),
+    ("GET", PROFILE + r"/forecast", forecast),
+    ("GET", PROFILE + r"/export/(?P<dataset>[a-z_]+)", export),
+)]
+
+# -------------------- ASGI --------------------
+def _route(method, path):
+    allowed = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                return handler, match.groupdict()
+            allowed = True
+    raise ApiError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    if not size:
+        return {}
+    try:
+        body = json.loads(b"".join(chunks))
+    except ValueError:
+        raise ApiError(400, "Body must be JSON") from None
+    if not isinstance(body, dict):
+        raise ApiError(400, "Body must be a JSON object")
+    return body
+
+
+async def _send_json(send, status, payload):
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]})
+    await send({"type": "http.response.body", "body": data})
+
+
+async def _send_stream(send, status, stream):
+    # Chunked transfer (no content-length), one body message per chunk of the exporter
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", stream.content_type.encode()),
+        (b"content-disposition", f'attachment; filename="{stream.file_name}"'.encode())]})
+    while True:
+        chunk = await asyncio.to_thread(next, stream.chunks, None)
+        if chunk is None:
+            break
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            set_page("api")     # hot path timings of the event loop thread are counted for the API
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    try:
+        handler, params = _route(scope["method"], scope["path"])
+        query = {key: values[-1] for key, values in parse_qs(scope["query_string"].decode("latin-1")).items()}
+        body = await _read_body(receive) if scope["method"] in ("POST", "PATCH") else {}
+        status, payload = await handler(query, body, **params)
+    except ApiError as e:
+        status, payload = e.status, {"error": e.message}
+    if isinstance(payload, Stream):
+        await _send_stream(send, status, payload)
+    else:
+        await _send_json(send, status, payload)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,220 @@
+# Local stand-in for the USDA FoodData Central and Spoonacular APIs, for load tests without live APIs.
+#
+#   python benchmarks/api_stub.py --port 8765 --latency lognormal:120,0.6 --errors 429=0.05,500=0.01
+#   NUTRI_USDA_URL=http://127.0.0.1:8765/fdc/v1 NUTRI_SPOONACULAR_URL=http://127.0.0.1:8765 streamlit run app.py
+#
+# Replays recorded responses:
+#   GET /fdc/v1/foods/search?query=...            USDA search (foods of synthetic_history.FOODS in USDA format,
+#                                                 or usda_search.json from --recordings)
+#   GET /recipes/complexSearch                    ressources/sample_recipes.json
+#   GET /recipes/<id>/information                 the recipe from ressources/sample_recipe_details.json
+#   GET /_stats                                   requests per endpoint and status, for the load harness
+# Every request first waits for a latency drawn from the configured distribution and then fails with the
+# configured probability per status code (401/402/429/5xx, body like the real APIs), otherwise it is answered.
+# Can also be started in-process: start_stub(...) returns the running server.
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from apptest_utils import ROOT
+from synthetic_history import FOODS
+
+ERROR_MESSAGES = {
+    401: "You are not authorized. Please read https://spoonacular.com/food-api/docs#Authentication",
+    402: "Your daily points limit of 150 has been reached.",
+    403: "Access forbidden.",
+    429: "Too many requests.",
+    500: "Internal server error.",
+    502: "Bad gateway.",
+    503: "Service unavailable.",
+    504: "Gateway timeout.",
+}
+
+
+# -------------------- LATENCY AND ERRORS --------------------
+def parse_latency(spec):
+    # "fixed:50" | "uniform:20,200" | "lognormal:<median ms>,<sigma>" | "none" -> function(rng) -> seconds
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "none":
+        return lambda rng: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(*values) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])    # median of a lognormal distribution is exp(mu)
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise argparse.ArgumentTypeError(f"Invalid latency {spec!r}, use none, fixed:ms, uniform:lo,hi or lognormal:median,sigma")
+
+
+def parse_errors(spec):
+    # "429=0.05,500=0.01" -> [(429, 0.05), (500, 0.01)]
+    errors = []
+    for item in filter(None, spec.split(",")):
+        status, _, rate = item.partition("=")
+        errors.append((int(status), float(rate)))
+    if sum(rate for _, rate in errors) > 1:
+        raise argparse.ArgumentTypeError("The error rates add up to more than 1")
+    return errors
+
+
+def pick_status(rng, errors):
+    draw = rng.random()
+    for status, rate in errors:
+        if draw < rate:
+            return status
+        draw -= rate
+    return 200
+
+
+# -------------------- RECORDED RESPONSES --------------------
+def _usda_food(name, nutrition):
+    calories, protein, fat, carbohydrates = nutrition
+    return {"description": name.upper(), "foodNutrients": [
+        {"nutrientName": "Energy", "unitName": "KCAL", "value": calories},
+        {"nutrientName": "Protein", "unitName": "G", "value": protein},
+        {"nutrientName": "Total lipid (fat)", "unitName": "G", "value": fat},
+        {"nutrientName": "Carbohydrate, by difference", "unitName": "G", "value": carbohydrates},
+    ]}
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_recordings(folder=None):
+    # Files in `folder` (usda_search.json, recipes.json, recipe_details.json) replace the defaults
+    def recorded(name, default):
+        path = os.path.join(folder, name) if folder else None
+        return _read(path) if path and os.path.exists(path) else default()
+
+    return {
+        "usda_foods": recorded("usda_search.json", lambda: {"foods": [
+            _usda_food(name, nutrition) for foods in FOODS.values() for name, nutrition, _ in foods]})["foods"],
+        "recipes": recorded("recipes.json", lambda: _read(os.path.join(ROOT, "ressources", "sample_recipes.json"))),
+        "recipe_details": recorded("recipe_details.json",
+                                   lambda: _read(os.path.join(ROOT, "ressources", "sample_recipe_details.json"))),
+    }
+
+
+def usda_search(recordings, query, page_size):
+    words = query.lower().split()
+    foods = [food for food in recordings["usda_foods"] if all(word in food["description"].lower() for word in words)]
+    foods = foods or recordings["usda_foods"]   # like the real API: a search nearly always returns something
+    return {"totalHits": len(foods), "foods": foods[:page_size]}
+
+
+# -------------------- SERVER --------------------
+RECIPE_DETAILS = re.compile(r"^/recipes/(\d+)/information$")
+
+
+def make_handler(recordings, latency, errors, seed):
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    stats = Counter()
+    stats_lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real APIs behind requests.Session
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self, path, params):
+            if path.endswith("/foods/search"):
+                page_size = int(params.get("pageSize", ["50"])[0])
+                return "usda_search", lambda: usda_search(recordings, params.get("query", [""])[0], page_size)
+            if path == "/recipes/complexSearch":
+                return "recipes_search", lambda: recordings["recipes"]
+            match = RECIPE_DETAILS.match(path)
+            if match:
+                recipe_id = int(match.group(1))
+                details = recordings["recipe_details"]
+                return "recipe_details", lambda: next((r for r in details if r.get("id") == recipe_id), details[0])
+            return None, None
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/_stats":
+                with stats_lock:
+                    self._send(200, {f"{endpoint} {status}": count for (endpoint, status), count in sorted(stats.items())})
+                return
+            endpoint, respond = self._route(url.path, parse_qs(url.query))
+            if endpoint is None:
+                self._send(404, {"status": "failure", "code": 404, "message": "Not found"})
+                return
+
+            with rng_lock:
+                delay, status = latency(rng), pick_status(rng, errors)
+            time.sleep(delay)
+            with stats_lock:
+                stats[(endpoint, status)] += 1
+            if status != 200:
+                self._send(status, {"status": "failure", "code": status, "message": ERROR_MESSAGES.get(status, "Error")})
+            else:
+                self._send(200, respond())
+
+        def log_message(self, *args):
+            pass    # thousands of requests per load test, no access log
+
+    return StubHandler
+
+
+def start_stub(host="127.0.0.1", port=0, latency="none", errors="", seed=42, recordings=None):
+    # Starts the stub in a background thread and returns the server, server.server_address[1] is the port
+    latency = parse_latency(latency) if isinstance(latency, str) else latency
+    errors = parse_errors(errors) if isinstance(errors, str) else errors
+    handler = make_handler(load_recordings(recordings), latency, errors, seed)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="api-stub", daemon=True).start()
+    return server
+
+
+def stub_env(server):
+    # Environment variables that point the app to the stub
+    host, port = server.server_address[:2]
+    return {"NUTRI_USDA_URL": f"http://{host}:{port}/fdc/v1", "NUTRI_SPOONACULAR_URL": f"http://{host}:{port}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local USDA / Spoonacular stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=parse_latency, default="lognormal:120,0.6",
+                        help="none, fixed:ms, uniform:lo,hi or lognormal:median_ms,sigma")
+    parser.add_argument("--errors", type=parse_errors, default="", help="status=rate list, e.g. 429=0.05,500=0.01")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--recordings", help="folder with usda_search.json, recipes.json, recipe_details.json")
+    args = parser.parse_args()
+
+    server = start_stub(args.host, args.port, args.latency, args.errors, args.seed, args.recordings)
+    for name, value in stub_env(server).items():
+        print(f"export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
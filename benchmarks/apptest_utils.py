@@ -0,0 +1,24 @@
+# Helpers shared by the benchmarks that render pages headless with Streamlit's AppTest.
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def walk(node):
+    yield node
+    for child in (getattr(node, "children", None) or {}).values():
+        yield from walk(child)
+
+
+def payload_bytes(at):
+    # Approximation of what one rerun sends over the websocket: the serialized protos of all elements
+    return sum(node.proto.ByteSize() for node in walk(at._tree) if hasattr(getattr(node, "proto", None), "ByteSize"))
+
+
+def element_count(at):
+    return sum(1 for node in walk(at._tree) if not getattr(node, "children", None))
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,182 @@
+# Throughput and latency of the REST API (api.py) under concurrent clients.
+#
+#   pip install uvicorn httpx
+#   python benchmarks/bench_api.py --workers 4 --connections 64 --duration 20 --output api.json
+#
+# Starts uvicorn with api:app in a subprocess (users directory with seeded histories from
+# synthetic_history.py, USDA replaced by api_stub.py) and drives it with keep-alive HTTP/1.1 connections
+# from one asyncio client. Each connection sends requests back to back, drawn from MIX; reported are
+# requests per second, p50/p95/p99 latency overall and per endpoint, and the share of non 2xx responses.
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, timedelta
+
+from apptest_utils import ROOT
+from api_stub import start_stub, stub_env
+from load_sessions import latency_stats
+
+FOOD_QUERIES = ["banana", "oats", "apple", "salmon", "brown rice", "greek yogurt", "almonds", "broccoli"]
+
+# endpoint -> share of the requests
+MIX = {"day": 0.35, "totals": 0.25, "weights": 0.15, "log_food": 0.1, "log_manual": 0.1, "save_weight": 0.04,
+       "forecast": 0.01}
+
+
+def make_request(endpoint, profile_id, rng, today):
+    # (method, path, body) of one request
+    day = (today - timedelta(days=rng.randint(0, 365))).isoformat()
+    base = f"/users/{profile_id}"
+    if endpoint == "day":
+        return "GET", f"{base}/days/{day}", None
+    if endpoint == "totals":
+        return "GET", f"{base}/totals?from={(today - timedelta(days=29)).isoformat()}&to={today.isoformat()}", None
+    if endpoint == "weights":
+        return "GET", f"{base}/weights?from={day}", None
+    if endpoint == "log_food":
+        return "POST", f"{base}/meals", {"date": today.isoformat(), "category": "Breakfast",
+                                         "query": rng.choice(FOOD_QUERIES), "quantity": rng.choice((50, 100, 150))}
+    if endpoint == "log_manual":
+        return "POST", f"{base}/meals", {"date": today.isoformat(), "category": "Snack", "title": "Protein bar",
+                                         "nutrition": {"calories": 210, "carbohydrates": 22, "fat": 7, "protein": 20}}
+    if endpoint == "save_weight":
+        return "POST", f"{base}/weights", {"date": today.isoformat(), "weight": round(rng.uniform(60, 90), 1)}
+    return "GET", f"{base}/forecast?days=14", None
+
+# -------------------- CLIENT --------------------
+async def send_request(reader, writer, method, path, body):
+    data = json.dumps(body).encode() if body is not None else b""
+    head = (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n")
+    writer.write(head.encode() + data)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def connection(port, profile_ids, seed, deadline, results):
+    rng = random.Random(seed)
+    endpoints, weights = list(MIX), list(MIX.values())
+    today = date.today()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, path, body = make_request(endpoint, rng.choice(profile_ids), rng, today)
+            start = time.perf_counter()
+            status = await send_request(reader, writer, method, path, body)
+            results.append((endpoint, status, time.perf_counter() - start))
+    finally:
+        writer.close()
+
+
+async def run_load(port, profile_ids, connections, duration, seed):
+    results = []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(connection(port, profile_ids, seed + i, deadline, results) for i in range(connections)))
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    per_endpoint = {}
+    for endpoint in MIX:
+        latencies = [seconds for name, _, seconds in results if name == endpoint]
+        per_endpoint[endpoint] = dict(requests=len(latencies), **latency_stats(latencies))
+    errors = [status for _, status, _ in results if not 200 <= status < 300]
+    return {
+        "requests": len(results),
+        "elapsed_sec": round(elapsed, 1),
+        "requests_per_sec": round(len(results) / elapsed, 1),
+        **latency_stats([seconds for _, _, seconds in results]),
+        "error_rate": round(len(errors) / len(results), 4) if results else None,
+        "error_statuses": sorted(set(errors)),
+        "per_endpoint": per_endpoint,
+    }
+
+# -------------------- SERVER --------------------
+def wait_until_up(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+
+def start_api(port, workers, env):
+    command = [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+# -------------------- MAIN --------------------
+def main():
+    parser = argparse.ArgumentParser(description="REST API load test")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--connections", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load (after the warm up)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--years", type=float, default=1, help="history per user")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:120,0.6", help="USDA latency, see api_stub.py")
+    parser.add_argument("--errors", default="", help="USDA error rates, see api_stub.py")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency, errors=args.errors, seed=args.seed)
+    users_dir = tempfile.mkdtemp(prefix="nutri_api_")
+    env = dict(os.environ, NUTRI_USERS_DIR=users_dir, **stub_env(stub))
+    env.setdefault("API_KEY_USDA", "load-test")
+    os.environ["NUTRI_USERS_DIR"] = users_dir   # before synthetic_history imports utils
+    os.chdir(ROOT)
+    from synthetic_history import generate_history
+
+    server = None
+    try:
+        profile_ids = [generate_history(years=args.years, seed=args.seed + i)["profile_id"] for i in range(args.users)]
+        server = start_api(args.port, args.workers, env)
+        wait_until_up(args.port)
+        asyncio.run(run_load(args.port, profile_ids, args.connections, min(3, args.duration), args.seed - 1))
+        results, elapsed = asyncio.run(run_load(args.port, profile_ids, args.connections, args.duration, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        stub.shutdown()
+        shutil.rmtree(users_dir, ignore_errors=True)
+
+    summary = {"config": {"workers": args.workers, "connections": args.connections, "duration_sec": args.duration,
+                          "users": args.users, "years": args.years, "latency": args.latency, "errors": args.errors,
+                          "mix": MIX},
+               **summarize(results, elapsed)}
+    print(f"{args.workers} workers, {args.connections} connections: {summary['requests_per_sec']} req/s, "
+          f"p95 {summary['p95_ms']} ms, errors {summary['error_rate']}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,124 @@
+# Compares the old calendar grid (one st.button per day) with the heatmap calendar
+# (one HTML element + one selectbox) of "Calories Tracker.py".
+#
+#   python benchmarks/bench_calendar.py --meals-per-day 6 --runs 20
+#
+# Both variants are rendered headless with Streamlit's AppTest for the same month of data.
+# Reported per rerun: widget count, element count, approximate websocket payload (sum of the
+# serialized element protos) and render time.
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from apptest_utils import ROOT, element_count, payload_bytes
+
+YEAR, MONTH = 2025, 5
+
+LEGACY_SCRIPT = """
+import calendar
+import streamlit as st
+from utils.meal_store import load_month
+
+meals = load_month(PROFILE_ID, YEAR, MONTH)
+month_days = calendar.Calendar(firstweekday=0).monthdayscalendar(YEAR, MONTH)
+days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+cols = st.columns(7)
+for idx, day in enumerate(days_of_week):
+    cols[idx].markdown(f"**{day}**")
+for week in month_days:
+    cols = st.columns(7)
+    for idx, day in enumerate(week):
+        if day == 0:
+            cols[idx].markdown(" ")
+        else:
+            with cols[idx]:
+                if st.button(f"{day}", key=f"day_{day}"):
+                    st.session_state.selected_day = day
+if "selected_day" in st.session_state:
+    key = f"{YEAR}-{MONTH:02d}-{st.session_state.selected_day:02d}"
+    meals_today = [m for m in meals if m["selected_date"] == key]
+"""
+
+HEATMAP_SCRIPT = """
+import streamlit as st
+from utils.aggregates import month_aggregate
+from utils.calendar_heatmap import render_heatmap_html
+
+aggregate = month_aggregate(PROFILE_ID, YEAR, MONTH)
+selected_day = st.selectbox("Select a day to see its entries:", range(1, aggregate["days"] + 1), index=None)
+st.markdown(render_heatmap_html(aggregate, 2200, selected_day), unsafe_allow_html=True)
+if selected_day:
+    meals_today = aggregate["entries"][selected_day - 1]
+"""
+
+# -------------------- HELPERS --------------------
+def generate_month(profile_id, meals_per_day):
+    from utils.meal_store import append_entries
+    rng = random.Random(42)
+    entries = []
+    for day in range(1, 32):
+        for _ in range(meals_per_day):
+            entries.append({
+                "recipe_title": rng.choice(["Banana", "Oats", "Rice", "Chicken", "Salad"]),
+                "selected_date": f"{YEAR}-{MONTH:02d}-{day:02d}",
+                "meal_category": rng.choice(["Breakfast", "Lunch", "Dinner", "Snack"]),
+                "nutrition": {"calories": rng.uniform(50, 700), "carbohydrates": rng.uniform(0, 80),
+                              "fat": rng.uniform(0, 30), "protein": rng.uniform(0, 40)},
+            })
+    append_entries(profile_id, entries)
+
+
+def measure(script, profile_id, runs):
+    from streamlit.testing.v1 import AppTest
+
+    header = f"import sys\nsys.path.insert(0, {ROOT!r})\nPROFILE_ID = {profile_id!r}\nYEAR, MONTH = {YEAR}, {MONTH}\n"
+    at = AppTest.from_string(header + script)
+    at.run()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "widgets": len(at.button) + len(at.selectbox),
+        "elements": element_count(at),
+        "payload_bytes": payload_bytes(at),
+        "rerun_ms": round(sorted(timings)[len(timings) // 2] * 1000, 2),
+    }
+
+# -------------------- MAIN --------------------
+def main():
+    parser = argparse.ArgumentParser(description="Calendar grid vs heatmap benchmark")
+    parser.add_argument("--meals-per-day", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    users_dir = tempfile.mkdtemp(prefix="nutri_calendar_")
+    os.environ["NUTRI_USERS_DIR"] = users_dir     # read by utils.storage on import
+    try:
+        from utils.storage import new_profile_id
+        profile_id = new_profile_id()
+        generate_month(profile_id, args.meals_per_day)
+
+        legacy = measure(LEGACY_SCRIPT, profile_id, args.runs)
+        heatmap = measure(HEATMAP_SCRIPT, profile_id, args.runs)
+    finally:
+        shutil.rmtree(users_dir, ignore_errors=True)
+
+    print(json.dumps({
+        "legacy_grid": legacy,
+        "heatmap": heatmap,
+        "widget_reduction": f"{legacy['widgets']} -> {heatmap['widgets']}",
+        "payload_reduction_pct": round(100 * (1 - heatmap["payload_bytes"] / legacy["payload_bytes"]), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,147 @@
+# Timing comparison of full page reruns vs. fragment reruns of "Calories Tracker.py".
+#
+#   python benchmarks/bench_fragments.py --runs 20
+#
+# A full rerun executes the whole script (CSS, navigation, profile loading and every section).
+# A fragment rerun only executes the section that owns the widget plus the sections nested in it,
+# e.g. changing the date reruns "overview" (totals and both charts), picking a day only "day_detail".
+# Every interaction is done twice per run on the headless page: once followed by a full rerun (what
+# AppTest.run() does) and once followed by a rerun of only the fragment that owns the widget, like the
+# browser requests it. AppTest has no public call for the latter, so the fragment id is put into the
+# pending rerun request of its script runner (private API, checked with Streamlit 1.66).
+# The owning fragment comes from the dependency declarations (utils/fragments.py); every fragment rerun
+# is checked to execute exactly affected_sections(key), otherwise the benchmark fails.
+import argparse
+import dataclasses
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+from apptest_utils import ROOT  # noqa: F401  (puts the repository root on sys.path)
+
+# Interactions: each changes a widget on the AppTest and returns the key of that widget
+def change_date(at, i):
+    box = at.date_input(key="dashboard_date")
+    box.set_value(box.value.replace(day=1 + i % 28))
+    return box.key
+
+
+def page_month(at, i):
+    button = at.button(key="next_month" if i % 2 else "prev_month")
+    button.click()
+    return button.key
+
+
+def select_day(at, i):
+    box = next(box for box in at.selectbox if box.key.startswith("calendar_day_"))
+    box.set_value(1 + i % 28)
+    return box.key
+
+
+INTERACTIONS = {"change date": change_date, "previous / next month": page_month, "select a day": select_day}
+
+
+@contextmanager
+def fragment_rerun(fragment_id):
+    # Turns the next AppTest.run() into a rerun of one fragment
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    request_rerun = LocalScriptRunner.request_rerun
+
+    def fragment_request(self, rerun_data):
+        accepted = request_rerun(self, rerun_data)
+        self._requests._rerun_data = dataclasses.replace(self._requests._rerun_data, fragment_id_queue=[fragment_id])
+        return accepted
+
+    LocalScriptRunner.request_rerun = fragment_request
+    try:
+        yield
+    finally:
+        LocalScriptRunner.request_rerun = request_rerun
+
+
+def section_runs(at):
+    return {name: stats["runs"] for name, stats in at.session_state["section_timings"].items()}
+
+
+def fragment_ids(at):
+    # Section name -> fragment id. Every fragment is rerun once; a fragment runs its own section plus the
+    # nested ones, so going from the smallest to the largest set the owner is the one not assigned yet.
+    ran = {}
+    for fragment_id in list(at._fragment_storage._fragments):
+        before = section_runs(at)
+        with fragment_rerun(fragment_id):
+            at.run()
+        ran[fragment_id] = {name for name, runs in section_runs(at).items() if runs > before.get(name, 0)}
+        at.run()    # full rerun, the element tree of a fragment rerun only holds that fragment
+    owners = {}
+    for fragment_id, sections in sorted(ran.items(), key=lambda item: len(item[1])):
+        own = sections - set(owners)
+        if len(own) == 1:
+            owners[own.pop()] = fragment_id
+    return owners
+
+
+def timed_run(at, fragment_id=None):
+    start = time.perf_counter()
+    if fragment_id is None:
+        at.run()
+    else:
+        with fragment_rerun(fragment_id):
+            at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def check_dependencies(key, ran):
+    from utils.fragments import affected_sections
+
+    declared = set(affected_sections(key))
+    if ran != declared:
+        raise RuntimeError(f"Changing {key!r} reran {sorted(ran)}, the declarations say {sorted(declared)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs fragment rerun timings")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(ROOT)  # the pages use paths relative to the repository root
+    at = AppTest.from_file(os.path.join(ROOT, "pages", "Calories Tracker.py"), default_timeout=60)
+    at.run()
+    owners = fragment_ids(at)
+
+    from utils.fragments import owning_section
+
+    results = {"interactions": {}}
+    for interaction, interact in INTERACTIONS.items():
+        full_runs, fragment_runs = [], []
+        for i in range(args.runs):
+            interact(at, i)
+            full_runs.append(timed_run(at))
+            key = interact(at, i + 1)
+            section = owning_section(key)
+            before = section_runs(at)
+            fragment_runs.append(timed_run(at, owners[section]))
+            check_dependencies(key, {name for name, runs in section_runs(at).items() if runs > before.get(name, 0)})
+            at.run()    # back to the complete element tree for the next interaction
+        full_ms, fragment_ms = statistics.median(full_runs), statistics.median(fragment_runs)
+        results["interactions"][interaction] = {
+            "section": section,
+            "full_rerun_ms": round(full_ms, 2),
+            "fragment_rerun_ms": round(fragment_ms, 2),
+            "speedup": round(full_ms / fragment_ms, 1) if fragment_ms else None,
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
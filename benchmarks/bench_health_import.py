@@ -0,0 +1,131 @@
+# Throughput and memory of the Apple Health import (utils/health_import.py).
+#
+#   python benchmarks/bench_health_import.py --records 200000,2000000 --output health.json
+#
+# For every size a seeded export.xml like the one of "Export All Health Data" is written to a temporary
+# file: mostly step count / heart rate records with metadata (what makes real exports large), a weight
+# and a body fat record about every 200 records, some days measured twice, a few workouts and
+# correlations. Reported per size: records per second, MB per second and the peak of the memory
+# allocated during the import (tracemalloc), which should stay the same for every size.
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from apptest_utils import ROOT  # noqa: F401  (puts the repository root on sys.path)
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation|Workout|ActivitySummary)*)>
+<!ATTLIST HealthData locale CDATA #REQUIRED>
+]>
+<HealthData locale="en_US">
+ <ExportDate value="2025-05-15 20:00:00 +0200"/>
+ <Me HKCharacteristicTypeIdentifierBiologicalSex="HKBiologicalSexFemale"/>
+"""
+NOISE = (
+    ('HKQuantityTypeIdentifierStepCount', 'count', lambda rng: rng.randint(10, 900)),
+    ('HKQuantityTypeIdentifierHeartRate', 'count/min', lambda rng: rng.randint(55, 150)),
+    ('HKQuantityTypeIdentifierActiveEnergyBurned', 'kcal', lambda rng: round(rng.uniform(0.1, 12), 3)),
+)
+
+
+def _record(rng, kind, unit, value, moment, source="iPhone"):
+    stamp = moment.strftime("%Y-%m-%d %H:%M:%S +0200")
+    return (f' <Record type="{kind}" sourceName="{source}" sourceVersion="17.4" unit="{unit}" '
+            f'creationDate="{stamp}" startDate="{stamp}" endDate="{stamp}" value="{value}">\n'
+            f'  <MetadataEntry key="HKMetadataKeySyncIdentifier" value="{rng.getrandbits(64):x}"/>\n'
+            f' </Record>\n')
+
+
+def write_export(path, records, seed):
+    rng = random.Random(seed)
+    moment = datetime(2015, 1, 1, 7, 0)
+    weight, body_fat = 85.0, 0.28
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for i in range(records):
+            moment += timedelta(minutes=rng.randint(1, 9))
+            if i % 200 == 0:
+                weight += rng.uniform(-0.3, 0.28)
+                f.write(_record(rng, "HKQuantityTypeIdentifierBodyMass", "kg", round(weight, 1), moment, "Scale"))
+            elif i % 200 == 1:
+                body_fat += rng.uniform(-0.002, 0.0018)
+                f.write(_record(rng, "HKQuantityTypeIdentifierBodyFatPercentage", "%", round(body_fat, 3), moment, "Scale"))
+            elif i % 5000 == 2:
+                f.write(f' <Correlation type="HKCorrelationTypeIdentifierBloodPressure" startDate="{moment}">\n'
+                        + _record(rng, "HKQuantityTypeIdentifierBloodPressureSystolic", "mmHg", 120, moment)
+                        + ' </Correlation>\n')
+            elif i % 5000 == 3:
+                f.write(f' <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="30" '
+                        f'startDate="{moment}">\n'
+                        + "".join(f'  <WorkoutEvent type="HKWorkoutEventTypeSegment" date="{moment}"/>\n'
+                                  for _ in range(20))
+                        + ' </Workout>\n')
+            else:
+                kind, unit, value = rng.choice(NOISE)
+                f.write(_record(rng, kind, unit, value(rng), moment))
+        f.write("</HealthData>\n")
+
+
+def run(records, seed, folder):
+    from utils.health_import import import_apple_health
+    from utils.storage import new_profile_id
+
+    path = os.path.join(folder, f"export_{records}.xml")
+    write_export(path, records, seed)
+    tracemalloc.start()
+    start = time.perf_counter()
+    stats = import_apple_health(new_profile_id(), path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    return {
+        "records": stats["records"],
+        "file_mb": round(size_mb, 1),
+        "measurements": stats["measurements"],
+        "weight_days": stats["weight_days"],
+        "body_fat_days": stats["body_fat_days"],
+        "seconds": round(elapsed, 2),
+        "records_per_sec": round(stats["records"] / elapsed),
+        "mb_per_sec": round(size_mb / elapsed, 1),
+        "peak_traced_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apple Health import benchmark")
+    parser.add_argument("--records", default="200000,2000000", help="comma separated export sizes in records")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="nutri_health_")
+    os.environ["NUTRI_USERS_DIR"] = os.path.join(folder, "users")
+    results = []
+    try:
+        for records in (int(size) for size in args.records.split(",")):
+            result = run(records, args.seed, folder)
+            results.append(result)
+            print(f"{records:>9} records: {result['records_per_sec']} records/s ({result['mb_per_sec']} MB/s), "
+                  f"peak {result['peak_traced_mb']} MB", file=sys.stderr)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
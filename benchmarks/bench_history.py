@@ -0,0 +1,273 @@
+# Benchmark suite for users with a long history (generated by synthetic_history.py).
+#
+#   python benchmarks/bench_history.py --years 10 --output results.json
+#   python benchmarks/bench_history.py --output new.json --compare results.json   # diff against an older run
+#
+# 1. generates a seeded history (10 years, 4-10 meals per day, daily weights, weekly body composition)
+# 2. times the data paths directly: month load (cold/warm), full history scan, day filter, day totals,
+#    calendar month render (aggregate + heatmap HTML) and saving a meal
+# 3. renders every page in pages/ headless with Streamlit's AppTest for that user: first render, median
+#    rerun, a few interactions (select a day, save weights, ...) and the hot path timings recorded by
+#    utils/instrumentation.py during the run (forecast training, file writes, chart renders, ...)
+# Everything is printed (and written with --output) as JSON, so runs of different versions can be diffed.
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from apptest_utils import ROOT
+
+# Timings per hot path are only recorded with NUTRI_METRICS, must be set before utils is imported
+os.environ.setdefault("NUTRI_METRICS", "1")
+
+PAGES = sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+
+# -------------------- HELPERS --------------------
+def summary(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))] * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+    }
+
+
+def time_calls(func, args_list, before=None, warm=False):
+    # before: called untimed before every call (e.g. clear the caches), warm: call once untimed first
+    timings = []
+    for args in args_list:
+        if before:
+            before()
+        if warm:
+            func(*args)
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return summary(timings)
+
+
+def git_revision():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def hot_paths():
+    # Timings recorded by utils/instrumentation.py since the last reset, summed over pages
+    from utils import instrumentation
+
+    totals = {}
+    for (_, name), histogram in instrumentation.snapshot().items():
+        entry = totals.setdefault(name, {"count": 0, "total_ms": 0.0})
+        entry["count"] += histogram["count"]
+        entry["total_ms"] += histogram["sum"] * 1000
+    return {name: {"count": entry["count"], "total_ms": round(entry["total_ms"], 3)}
+            for name, entry in sorted(totals.items())}
+
+
+# -------------------- DATA PATHS --------------------
+def bench_data(profile_id, history, runs, seed):
+    from utils import aggregates, favorites, meal_store, templates
+    from utils.food_api import Food
+    from utils.calendar_heatmap import render_heatmap_html
+    from utils.targets import daily_targets
+
+    def clear_caches():
+        with meal_store._cache_lock:
+            meal_store._cache.clear()
+        with aggregates._cache_lock:
+            aggregates._cache.clear()
+
+    rng = random.Random(seed)
+    start, end = date.fromisoformat(history["start"]), date.fromisoformat(history["end"])
+    days = [start + timedelta(days=rng.randrange((end - start).days + 1)) for _ in range(runs)]
+    months = [(day.year, day.month) for day in days]
+    goal = daily_targets(profile_id)["calories"]
+
+    def render_month(year, month):
+        render_heatmap_html(aggregates.month_aggregate(profile_id, year, month), goal)
+
+    def save_meal(day):
+        meal_store.append_entry(profile_id, {
+            "recipe_title": "Benchmark banana", "selected_date": day.isoformat(), "meal_category": "Snack",
+            "nutrition": {"calories": 89.0, "carbohydrates": 22.8, "fat": 0.3, "protein": 1.1},
+        })
+
+    results = {
+        "load_month_cold": time_calls(lambda y, m: meal_store.load_month(profile_id, y, m), months, clear_caches),
+        "load_month_warm": time_calls(lambda y, m: meal_store.load_month(profile_id, y, m), months, warm=True),
+        "load_full_history": time_calls(lambda: sum(1 for _ in meal_store.iter_entries(profile_id)), [()] * 3),
+        "day_filter": time_calls(lambda d: meal_store.load_day(profile_id, d.isoformat()), [(d,) for d in days], warm=True),
+        "day_totals_cold": time_calls(lambda d: aggregates.day_totals(profile_id, d), [(d,) for d in days], clear_caches),
+        "day_totals_warm": time_calls(lambda d: aggregates.day_totals(profile_id, d), [(d,) for d in days], warm=True),
+        "calendar_month_render_cold": time_calls(render_month, months, clear_caches),
+        "calendar_month_render_warm": time_calls(render_month, months, warm=True),
+        "saved_recipes_first_page": time_calls(lambda: meal_store.page_entries(profile_id), [()] * 20, warm=True),
+        "saved_recipes_lunch_page": time_calls(lambda: meal_store.page_entries(profile_id, category="Lunch"),
+                                               [()] * 20, warm=True),
+    }
+    # Last, it changes the history: every save rewrites the month file of that day
+    results["save_meal"] = time_calls(save_meal, [(d,) for d in days])
+    # Single entries by id (the saved bananas): only the month file of the entry is rewritten
+    saved = [entry["id"] for d in days for entry in meal_store.load_day(profile_id, d.isoformat(), "Snack")
+             if entry["recipe_title"] == "Benchmark banana"][:runs]
+    results["update_meal"] = time_calls(lambda entry_id: meal_store.update_entry(
+        profile_id, entry_id, {"recipe_title": "Benchmark apple"}), [(i,) for i in saved])
+    results["delete_meal"] = time_calls(lambda entry_id: meal_store.delete_entry(profile_id, entry_id),
+                                        [(i,) for i in saved])
+    # A whole day of the history as template, logged without any USDA request in one write
+    template = templates.save_template(profile_id, templates.template_from_entries(
+        "Benchmark day", "Breakfast", meal_store.load_day(profile_id, days[0].isoformat())))
+    results["log_template"] = time_calls(lambda d: templates.log_template(profile_id, template["id"], d.isoformat()),
+                                         [(d,) for d in days])
+    # Quick add of a stored food: no USDA request, the entry plus the small favorites file are written
+    favorites.record_food(profile_id, Food("Benchmark banana", 89.0, 1.1, 0.3, 22.8), 120)
+    results["quick_add"] = time_calls(lambda d: favorites.quick_add(profile_id, "benchmark banana", d.isoformat(), "Snack"),
+                                      [(d,) for d in days])
+    results["quick_add_buttons"] = time_calls(lambda: favorites.top_foods(profile_id), [()] * 20, warm=True)
+    return results
+
+
+# -------------------- PAGES --------------------
+def _click(label):
+    def action(at):
+        next(button for button in at.button if button.label == label).click().run()
+    return action
+
+
+def _select_day(at):
+    today = date.today()
+    at.selectbox(key=f"calendar_day_{today.month}_{today.year}").set_value(today.day).run()
+
+
+# page -> {interaction name: action}, run in this order after the plain reruns
+INTERACTIONS = {
+    os.path.join("pages", "Calories Tracker.py"): {"select_day": _select_day},
+    os.path.join("pages", "Recipes Generator.py"): {"view_saved_recipes": _click("📂 View Saved Recipes"),
+                                                    "saved_recipes_next_page": _click("Next ➡")},
+    os.path.join("pages", "data_visualization.py"): {
+        "save_weights": _click("📄 Save All"),
+        "save_body_composition": _click("📄 Save Today's Entry"),
+    },
+}
+
+
+def bench_page(page, profile_id, runs):
+    from streamlit.testing.v1 import AppTest
+
+    from utils import instrumentation
+
+    instrumentation.reset()
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=300)
+    at.session_state["profile_id"] = profile_id
+
+    start = time.perf_counter()
+    at.run()
+    result = {"first_render_ms": round((time.perf_counter() - start) * 1000, 3)}
+    if at.exception:
+        result["exception"] = [exception.message for exception in at.exception]
+        return result
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    result["rerun"] = summary(timings)
+
+    interactions = {}
+    for name, action in INTERACTIONS.get(page, {}).items():
+        start = time.perf_counter()
+        try:
+            action(at)
+        except (StopIteration, KeyError) as e:
+            interactions[name] = {"error": f"widget not found: {e!r}"}
+            continue
+        interactions[name] = {"ms": round((time.perf_counter() - start) * 1000, 3)}
+        if at.exception:
+            interactions[name]["exception"] = [exception.message for exception in at.exception]
+    if interactions:
+        result["interactions"] = interactions
+    result["hot_paths"] = hot_paths()
+    return result
+
+
+# -------------------- COMPARE --------------------
+def _timings(results, prefix=""):
+    # Flattens {"data": {"day_filter": {"median_ms": 1.2}}} to {"data.day_filter.median_ms": 1.2}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _timings(value, f"{prefix}{key}.")
+        elif key.endswith("_ms") or key == "ms":
+            yield f"{prefix}{key}", value
+
+
+def compare(old, new):
+    old_timings = dict(_timings(old))
+    changes = {}
+    for key, value in _timings(new):
+        before = old_timings.get(key)
+        if before and value is not None:
+            changes[key] = {"before": before, "after": value, "ratio": round(value / before, 2)}
+    return changes
+
+
+# -------------------- MAIN --------------------
+def main():
+    parser = argparse.ArgumentParser(description="Large history benchmark suite")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--runs", type=int, default=20, help="repetitions per data path / reruns per page")
+    parser.add_argument("--pages", nargs="*", default=PAGES, help="pages to render (default: all in pages/)")
+    parser.add_argument("--skip-pages", action="store_true", help="only time the data paths")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="earlier results file to compare the timings with")
+    parser.add_argument("--keep", action="store_true", help="keep the generated users directory")
+    args = parser.parse_args()
+
+    users_dir = tempfile.mkdtemp(prefix="nutri_history_")
+    os.environ["NUTRI_USERS_DIR"] = users_dir     # read by utils.storage on import
+    os.chdir(ROOT)  # the pages use paths relative to the repository root
+    from synthetic_history import generate_history
+
+    results = {"meta": {"revision": git_revision(), "python": platform.python_version(), "platform": sys.platform,
+                        "years": args.years, "seed": args.seed, "runs": args.runs}}
+    try:
+        start = time.perf_counter()
+        history = generate_history(years=args.years, seed=args.seed)
+        results["history"] = dict(history, generate_sec=round(time.perf_counter() - start, 2))
+        profile_id = history["profile_id"]
+        results["history"].pop("profile_id")
+
+        results["data"] = bench_data(profile_id, history, args.runs, args.seed)
+        if not args.skip_pages:
+            results["pages"] = {page: bench_page(page, profile_id, args.runs) for page in args.pages}
+    finally:
+        if args.keep:
+            results["meta"]["users_dir"] = users_dir
+        else:
+            shutil.rmtree(users_dir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            results["compare"] = compare(json.load(f), results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,106 @@
+# Throughput and memory of the streaming meal history import (utils/importer.py).
+#
+#   python benchmarks/bench_import.py --rows 100000,1000000 --lookup-share 0.01 --output import.json
+#
+# For every size a seeded CSV export in the format of a typical tracker ("Date;Meal;Food;Calories;...") is
+# written to a temporary file and imported into a fresh profile. A share of the rows has no calories and
+# is resolved at the local USDA stand-in (api_stub.py). Reported per size: rows per second and the peak of
+# the memory allocated during the import (tracemalloc), which should stay the same for every size.
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from apptest_utils import ROOT  # noqa: F401  (puts the repository root on sys.path)
+from api_stub import start_stub, stub_env
+from synthetic_history import FOODS
+
+HEADER = ["Date", "Meal", "Food", "Quantity (g)", "Calories", "Fat (g)", "Carbohydrates (g)", "Protein (g)"]
+
+
+def write_export(path, rows, lookup_share, seed):
+    # Rows ordered by date like the exports of other trackers, 8 per day
+    rng = random.Random(seed)
+    day = date.today() - timedelta(days=rows // 8)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(HEADER)
+        for i in range(rows):
+            if i and i % 8 == 0:
+                day += timedelta(days=1)
+            category = rng.choice(list(FOODS))
+            name, (calories, protein, fat, carbohydrates), portion = rng.choice(FOODS[category])
+            factor = portion / 100
+            if rng.random() < lookup_share:
+                writer.writerow([day.isoformat(), category, name, portion, "", "", "", ""])
+            else:
+                writer.writerow([day.isoformat(), category, name, portion, round(calories * factor, 1),
+                                 round(fat * factor, 1), round(carbohydrates * factor, 1), round(protein * factor, 1)])
+
+
+def run(rows, lookup_share, seed, folder):
+    from utils.importer import import_meals
+    from utils.storage import new_profile_id
+
+    path = os.path.join(folder, f"export_{rows}.csv")
+    write_export(path, rows, lookup_share, seed)
+    profile_id = new_profile_id()
+    tracemalloc.start()
+    start = time.perf_counter()
+    stats = import_meals(profile_id, path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "rows": rows,
+        "file_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+        "imported": stats["imported"],
+        "skipped": stats["skipped"],
+        "looked_up": stats["looked_up"],
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(rows / elapsed),
+        "peak_traced_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming import benchmark")
+    parser.add_argument("--rows", default="100000,1000000", help="comma separated file sizes in rows")
+    parser.add_argument("--lookup-share", type=float, default=0.01, help="share of rows without calories")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    stub = start_stub(seed=args.seed)
+    os.environ.update(stub_env(stub))
+    os.environ.setdefault("API_KEY_USDA", "benchmark")
+    folder = tempfile.mkdtemp(prefix="nutri_import_")
+    os.environ["NUTRI_USERS_DIR"] = os.path.join(folder, "users")
+    results = []
+    try:
+        for rows in (int(size) for size in args.rows.split(",")):
+            result = run(rows, args.lookup_share, args.seed, folder)
+            results.append(result)
+            print(f"{rows:>9} rows: {result['rows_per_sec']} rows/s, peak {result['peak_traced_mb']} MB",
+                  file=sys.stderr)
+    finally:
+        stub.shutdown()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,119 @@
+# Cold start import cost of every page, measured with "python -X importtime".
+#
+#   python benchmarks/bench_importtime.py                      # current tree
+#   python benchmarks/bench_importtime.py --baseline HEAD~1    # compare with an older revision
+#   python benchmarks/bench_importtime.py --render             # also time a cold AppTest render per page
+#
+# The top level imports of each page (found with ast, the pages can't be imported without running them)
+# are executed in a fresh interpreter with -X importtime. Reported per page: total import time and the
+# heaviest top level packages. With --baseline the page sources are taken from that git revision.
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+from apptest_utils import ROOT
+
+PAGES = ["app.py"] + sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+
+def page_source(page, revision=None):
+    if revision is None:
+        with open(os.path.join(ROOT, page), "r", encoding="utf-8") as f:
+            return f.read()
+    result = subprocess.run(["git", "show", f"{revision}:{page}"], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+def top_level_imports(source):
+    # Only module level import statements, in their original order
+    tree = ast.parse(source)
+    return "\n".join(ast.get_source_segment(source, node) for node in tree.body
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def importtime(code):
+    # Returns (total ms, {top level package: cumulative ms}) or (None, error) if an import fails.
+    # Imports that the interpreter already does at startup (site, encodings, ...) are left out.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    startup = _startup_modules()
+    packages = {}
+    for name, cumulative_ms in _first_level(result.stderr):
+        if name not in startup:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + cumulative_ms
+    return sum(packages.values()), packages
+
+
+def _first_level(stderr):
+    # Nested imports are indented in the last column, only the first level adds up to the total
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) == 1:
+            yield name.strip(), int(cumulative) / 1000
+
+
+_STARTUP = []
+
+
+def _startup_modules():
+    if not _STARTUP:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+        _STARTUP.append({name for name, _ in _first_level(result.stderr)})
+    return _STARTUP[0]
+
+
+def measure(page, revision, top):
+    source = page_source(page, revision)
+    if source is None:
+        return {"error": "page does not exist in this revision"}
+    total, packages = importtime(top_level_imports(source))
+    if total is None:
+        return {"error": packages}
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"import_ms": round(total, 1), "heaviest": {name: round(ms, 1) for name, ms in heaviest}}
+
+
+def cold_render(page):
+    # Fresh interpreter per page: interpreter start + imports + first full run of the script
+    code = ("import time; start = time.perf_counter()\n"
+            "from streamlit.testing.v1 import AppTest\n"
+            f"AppTest.from_file({os.path.join(ROOT, page)!r}, default_timeout=120).run()\n"
+            "print((time.perf_counter() - start) * 1000)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return round(float(result.stdout.strip().splitlines()[-1]), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time per page benchmark")
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--top", type=int, default=5, help="number of heaviest packages to list")
+    parser.add_argument("--render", action="store_true", help="also time a cold AppTest render (needs streamlit)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = {}
+    for page in PAGES:
+        results[page] = {"current": measure(page, None, args.top)}
+        if args.baseline:
+            results[page]["baseline"] = measure(page, args.baseline, args.top)
+        if args.render:
+            results[page]["cold_render_ms"] = cold_render(page)
+    results["benchmark_seconds"] = round(time.perf_counter() - start, 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,82 @@
+# Landing page (app.py) payload and render time before and after the static asset pipeline.
+#
+#   python -m utils.assets                  # build the variants first (needs Pillow for resizing)
+#   python benchmarks/bench_landing.py --runs 10 --mbit 20
+#
+# "before": both images read from disk, base64 encoded and inlined on every rerun (old app.py)
+# "cached data uri": no static serving, encoded variant cached per process but still inlined
+# "static serving": only the URL is sent per rerun, the image is downloaded once and then cached
+# Time to first paint is estimated as render time + transfer time of the first visit at --mbit.
+import argparse
+import base64
+import json
+import os
+import statistics
+import time
+
+from apptest_utils import ROOT, payload_bytes
+
+IMAGES = ["images/image.png", "images/Group_image.png"]
+
+
+def legacy_payload():
+    # The old page encoded and inlined both originals on every rerun
+    start = time.perf_counter()
+    total = 0
+    for path in IMAGES:
+        with open(os.path.join(ROOT, path), "rb") as f:
+            total += len(base64.b64encode(f.read()))
+    return total, (time.perf_counter() - start) * 1000
+
+
+def measure_app(static_serving, runs):
+    from streamlit import config
+    from streamlit.testing.v1 import AppTest
+
+    config.set_option("server.enableStaticServing", static_serving)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"))
+    start = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - start) * 1000
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return payload_bytes(at), cold_ms, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landing page payload benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--mbit", type=float, default=20.0, help="bandwidth used for the transfer estimate")
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    from utils.assets import _manifest
+    static_bytes = sum(entry["bytes"] for entry in _manifest().values())
+    bytes_per_ms = args.mbit * 1_000_000 / 8 / 1000
+
+    legacy_bytes, legacy_encode_ms = legacy_payload()
+    results = {"before": {"payload_per_rerun": legacy_bytes, "encode_ms_per_rerun": round(legacy_encode_ms, 2),
+                          "first_paint_ms": round(legacy_encode_ms + legacy_bytes / bytes_per_ms, 1)}}
+
+    for label, static_serving in [("cached data uri", False), ("static serving", True)]:
+        payload, cold_ms, rerun_ms = measure_app(static_serving, args.runs)
+        first_visit = payload + (static_bytes if static_serving else 0)
+        results[label] = {
+            "payload_per_rerun": payload,
+            "first_visit_bytes": first_visit,
+            "cold_render_ms": round(cold_ms, 2),
+            "rerun_ms": round(rerun_ms, 2),
+            "first_paint_ms": round(cold_ms + first_visit / bytes_per_ms, 1),
+        }
+    if not static_bytes:
+        results["note"] = "static/assets/manifest.json missing, run 'python -m utils.assets' first"
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,74 @@
+# CSS bytes sent per rerun and time spent on styles per rerun, before and after the compiled theme.
+#
+#   python benchmarks/bench_theme.py --runs 1000
+#
+# "before": every page read its CSS file(s) or f-string blocks and sent them unminified on every rerun
+# "no static serving": only the marker per rerun, the minified stylesheet is injected once per session
+#   ("session_injection_bytes")
+# "static serving": only a <link> tag + marker per rerun, the stylesheet is downloaded once per browser
+# Runs without Streamlit: it measures the HTML that apply_theme() hands to st.markdown.
+import argparse
+import json
+import os
+import time
+
+from apptest_utils import ROOT
+from utils.theme import SCOPES, inject_html, stylesheet, theme_html  # noqa: E402
+
+# page -> scopes passed to apply_theme()
+PAGES = {
+    "app.py": ("landing", "no_sidebar"),
+    "profilecreation.py": ("profile_creation",),
+    "profile_view.py": ("profile_view", "no_sidebar"),
+    "data_visualization.py": ("data_visualization",),
+    "Calories Tracker.py": ("base", "no_sidebar"),
+    "Calories Tracker - <meal>.py": ("base", "no_sidebar"),
+    "Recipes Generator.py": ("base",),
+}
+
+
+def legacy_html(scopes):
+    # The old pages: read the sources on every rerun, one <style> block each
+    parts = []
+    for scope in scopes:
+        with open(SCOPES[scope], "r", encoding="utf-8") as f:
+            parts.append(f"<style>{f.read()}</style>")
+    return "".join(parts)
+
+
+def per_rerun(render, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        html = render()
+    return len(html.encode("utf-8")), (time.perf_counter() - start) * 1_000_000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stylesheet bytes per rerun benchmark")
+    parser.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    start = time.perf_counter()
+    full = stylesheet()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    results = {"stylesheet_bytes": len(full.encode("utf-8")), "compile_ms": round(compile_ms, 2),
+               "session_injection_bytes": len(inject_html(full).encode("utf-8")), "pages": {}}
+    for page, scopes in PAGES.items():
+        page_results = {}
+        for label, render in [
+            ("before", lambda: legacy_html(scopes)),
+            ("no static serving", lambda: theme_html(*scopes)),
+            ("static serving", lambda: theme_html(*scopes, static_serving=True)),
+        ]:
+            size, micros = per_rerun(render, args.runs)
+            page_results[label] = {"bytes_per_rerun": size, "us_per_rerun": round(micros, 1)}
+        results["pages"][page] = page_results
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,156 @@
+# Load benchmark for the per-user storage layout (utils/storage.py).
+#
+#   python benchmarks/bench_user_partitions.py --users 100000 --threads 16 --ops 20000
+#
+# 1. provisions N user partitions (profile, calendar, weight and body composition file each)
+# 2. reports how the users spread over the bucket directories and the lock stripes
+# 3. runs the same read-modify-write workload against the partitions and against one shared
+#    global file (the old layout) and compares throughput and latency percentiles
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import storage  # noqa: E402
+
+# -------------------- HELPERS --------------------
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def provision(root, users):
+    profile_ids = []
+    for i in range(users):
+        profile_id = storage.new_profile_id()
+        profile_ids.append(profile_id)
+        folder = storage.user_dir(profile_id, root)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, storage.PROFILE_FILE), "w") as f:
+            json.dump({"profile_id": profile_id, "name": f"user{i}", "goal": "Lose Weight"}, f)
+        with open(os.path.join(folder, storage.CALENDAR_FILE), "w") as f:
+            json.dump([], f)
+        with open(os.path.join(folder, storage.WEIGHT_FILE), "w") as f:
+            f.write("Date,Weight\n")
+        with open(os.path.join(folder, storage.BODY_COMP_FILE), "w") as f:
+            json.dump([], f)
+    return profile_ids
+
+
+def layout_stats(root):
+    level1 = os.listdir(root)
+    level2_sizes = []
+    leaf_sizes = []
+    for first in level1:
+        second_level = os.listdir(os.path.join(root, first))
+        level2_sizes.append(len(second_level))
+        for second in second_level:
+            leaf_sizes.append(len(os.listdir(os.path.join(root, first, second))))
+    return {
+        "level1_dirs": len(level1),
+        "level2_max_entries": max(level2_sizes),
+        "leaf_dirs": len(leaf_sizes),
+        "leaf_max_entries": max(leaf_sizes),
+        "leaf_mean_entries": round(statistics.mean(leaf_sizes), 2),
+    }
+
+
+def stripe_stats(profile_ids):
+    stripes = Counter(zlib.crc32(pid.encode()) % storage.LOCK_STRIPES for pid in profile_ids)
+    return {"stripes": storage.LOCK_STRIPES, "max_users_per_stripe": max(stripes.values()),
+            "mean_users_per_stripe": round(len(profile_ids) / storage.LOCK_STRIPES, 2)}
+
+
+def add_meal(path, lock):
+    with lock:
+        meals = storage.read_json(path, [])
+        meals.append({"recipe_title": "Banana", "selected_date": "2025-05-15", "meal_category": "Breakfast",
+                      "nutrition": {"calories": 89.0, "carbohydrates": 22.8, "fat": 0.3, "protein": 1.1}})
+        storage.write_json(path, meals)
+
+
+def run_workload(threads, ops, pick_target):
+    latencies = []
+    latencies_lock = threading.Lock()
+    per_thread = ops // threads
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(per_thread):
+            path, lock = pick_target(rng)
+            start = time.perf_counter()
+            add_meal(path, lock)
+            local.append(time.perf_counter() - start)
+        with latencies_lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+# -------------------- MAIN --------------------
+def main():
+    parser = argparse.ArgumentParser(description="Per-user storage load benchmark")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--root", default=None, help="directory for the partitions (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated files")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix="nutri_users_")
+    results = {"users": args.users, "threads": args.threads}
+    try:
+        start = time.perf_counter()
+        profile_ids = provision(root, args.users)
+        results["provision_sec"] = round(time.perf_counter() - start, 2)
+        results["layout"] = layout_stats(root)
+        results["locks"] = stripe_stats(profile_ids)
+
+        # Per-user partitions: every op touches a random user's own calendar file
+        def pick_partition(rng):
+            profile_id = rng.choice(profile_ids)
+            return storage.user_file(profile_id, storage.CALENDAR_FILE, root), storage.user_lock(profile_id, root)
+        results["partitioned"] = run_workload(args.threads, args.ops, pick_partition)
+
+        # Old layout: every user appends to the same global file behind one lock.
+        # The file grows with every op, so the global run is capped to keep the benchmark finite.
+        global_path = os.path.join(root, "global_calendar_recipes.json")
+        global_lock = threading.Lock()
+        results["global_file"] = run_workload(args.threads, min(args.ops, 5_000), lambda rng: (global_path, global_lock))
+    finally:
+        if not args.keep and not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
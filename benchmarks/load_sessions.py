@@ -0,0 +1,247 @@
+# Load test with many simultaneous sessions on one Streamlit process.
+#
+#   python benchmarks/load_sessions.py --sessions 1,10,50,100,200 --duration 30 --output load.json
+#
+# Every simulated session is a thread with its own AppTest per page (its own session state), all in one
+# process, so they share the module level caches, the storage locks and the HTTP session like the sessions
+# of one "streamlit run". Each session loops over realistic flows in random order:
+#   log_breakfast     open the breakfast page, search a food and add it (the rerun only submits the lookup,
+#                     USDA search and month file write run in the background, utils/lookups.py)
+#   view_dashboard    open the dashboard and select a day in the calendar
+#   generate_recipes  open the recipes page in live mode and serve recipes (Spoonacular search + details)
+#   save_weight       open the progress page, enter a weight and save (weights CSV write)
+# The APIs are replaced by benchmarks/api_stub.py (latency and error rates configurable), every user gets
+# a seeded history from synthetic_history.py. Reported per number of sessions: throughput, p50/p95/p99
+# rerun latency (overall and per flow), error rate (reruns with an exception or st.error) and RSS.
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from apptest_utils import ROOT
+from api_stub import start_stub, stub_env
+
+FOOD_QUERIES = ["banana", "oats", "apple", "salmon", "brown rice", "greek yogurt", "almonds", "broccoli"]
+WEIGHT_PAGE = os.path.join("pages", "data_visualization.py")
+
+
+# -------------------- HELPERS --------------------
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def latency_stats(latencies):
+    return {f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 2) for pct in (50, 95, 99)}
+
+
+def rss_mb():
+    # Current resident set size (Linux), otherwise the peak
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)   # bytes on macOS, KiB on Linux
+
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+# -------------------- SESSION --------------------
+class Session:
+    def __init__(self, profile_id, seed):
+        self.profile_id = profile_id
+        self.rng = random.Random(seed)
+        self.apps = {}
+        self.latencies = []     # (flow, seconds)
+        self.errors = []        # (flow, message)
+        self.flows = 0
+
+    def app(self, page):
+        from streamlit.testing.v1 import AppTest
+
+        at = self.apps.get(page)
+        if at is None:
+            at = self.apps[page] = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600)
+            at.session_state["profile_id"] = self.profile_id
+        return at
+
+    def rerun(self, flow, at):
+        start = time.perf_counter()
+        try:
+            at.run()
+        except Exception as e:  # a page that crashes or times out must not stop the load test
+            self.latencies.append((flow, time.perf_counter() - start))
+            self.errors.append((flow, repr(e)))
+            return False
+        self.latencies.append((flow, time.perf_counter() - start))
+        messages = [exception.message for exception in at.exception] + [error.value for error in at.error]
+        if messages:
+            self.errors.append((flow, messages[0]))
+        return not at.exception
+
+    # -------------------- FLOWS --------------------
+    def log_breakfast(self):
+        at = self.app(os.path.join("pages", "Calories Tracker - Breakfast.py"))
+        if self.rerun("log_breakfast", at):
+            at.text_input(key="breakfast_food_query").input(self.rng.choice(FOOD_QUERIES))
+            at.button(key="breakfast_add_food").click()
+            self.rerun("log_breakfast", at)
+
+    def view_dashboard(self):
+        at = self.app(os.path.join("pages", "Calories Tracker.py"))
+        if self.rerun("view_dashboard", at):
+            month, year = at.session_state["calendar_month"], at.session_state["calendar_year"]
+            at.selectbox(key=f"calendar_day_{month}_{year}").set_value(self.rng.randint(1, 28))
+            self.rerun("view_dashboard", at)
+
+    def generate_recipes(self):
+        at = self.app(os.path.join("pages", "Recipes Generator.py"))
+        if self.rerun("generate_recipes", at):
+            at.sidebar.checkbox[0].uncheck()    # live mode, the requests go to the stub
+            _button(at, "🧑🏼‍🍳 Serve the Recipes!").click()
+            self.rerun("generate_recipes", at)
+
+    def save_weight(self):
+        at = self.app(WEIGHT_PAGE)
+        if self.rerun("save_weight", at):
+            at.number_input(key="weight_0").set_value(round(self.rng.uniform(60, 100), 1))
+            _button(at, "📄 Save All").click()
+            self.rerun("save_weight", at)
+
+    def run(self, flows, deadline):
+        while time.perf_counter() < deadline:
+            for flow in self.rng.sample(flows, len(flows)):
+                if time.perf_counter() >= deadline:
+                    return
+                getattr(self, flow)()
+                self.flows += 1
+
+
+FLOWS = ["log_breakfast", "view_dashboard", "generate_recipes", "save_weight"]
+
+
+# -------------------- LOAD LEVELS --------------------
+def run_level(sessions, profile_ids, flows, duration, seed):
+    workers = [Session(profile_ids[i % len(profile_ids)], seed + i) for i in range(sessions)]
+    barrier = threading.Barrier(sessions + 1)
+    deadline = []
+
+    def worker(session):
+        barrier.wait()
+        session.run(flows, deadline[0])
+
+    threads = [threading.Thread(target=worker, args=(session,), name=f"session-{i}") for i, session in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    deadline.append(time.perf_counter() + duration)
+    start = time.perf_counter()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [seconds for session in workers for _, seconds in session.latencies]
+    errors = [error for session in workers for error in session.errors]
+    per_flow = {}
+    for flow in flows:
+        flow_latencies = [seconds for session in workers for name, seconds in session.latencies if name == flow]
+        per_flow[flow] = dict(reruns=len(flow_latencies), **latency_stats(flow_latencies))
+    messages = sorted({message for _, message in errors})
+    return {
+        "sessions": sessions,
+        "elapsed_sec": round(elapsed, 1),
+        "reruns": len(latencies),
+        "flows": sum(session.flows for session in workers),
+        "throughput_reruns_per_sec": round(len(latencies) / elapsed, 2),
+        **latency_stats(latencies),
+        "error_rate": round(len(errors) / len(latencies), 4) if latencies else None,
+        "error_samples": messages[:5],
+        "per_flow": per_flow,
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# -------------------- MAIN --------------------
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent session load test")
+    parser.add_argument("--sessions", default="1,10,50,100,200", help="comma separated numbers of sessions")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per number of sessions")
+    parser.add_argument("--flows", default=",".join(FLOWS), help="comma separated subset of " + ", ".join(FLOWS))
+    parser.add_argument("--users", type=int, default=None, help="distinct users (default: one per session)")
+    parser.add_argument("--years", type=float, default=1, help="history per user")
+    parser.add_argument("--latency", default="lognormal:120,0.6", help="API latency, see api_stub.py")
+    parser.add_argument("--errors", default="429=0.02,500=0.01", help="API error rates, see api_stub.py")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.sessions.split(",")]
+    flows = [flow for flow in args.flows.split(",") if flow]
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(sorted(unknown))}")
+
+    # Stub APIs and a fresh users directory, both must be configured before utils is imported
+    stub = start_stub(latency=args.latency, errors=args.errors, seed=args.seed)
+    os.environ.update(stub_env(stub))
+    os.environ.setdefault("API_KEY_USDA", "load-test")
+    os.environ.setdefault("API_KEY_SPOONACULAR", "load-test")
+    users_dir = tempfile.mkdtemp(prefix="nutri_load_")
+    os.environ["NUTRI_USERS_DIR"] = users_dir
+    os.chdir(ROOT)  # the pages use paths relative to the repository root
+    from synthetic_history import generate_history
+
+    results = {"config": {"levels": levels, "duration_sec": args.duration, "flows": flows, "years": args.years,
+                          "latency": args.latency, "errors": args.errors, "seed": args.seed},
+               "levels": []}
+    try:
+        users = args.users or max(levels)
+        start = time.perf_counter()
+        profile_ids = [generate_history(years=args.years, seed=args.seed + i)["profile_id"] for i in range(users)]
+        results["config"]["users"] = users
+        results["config"]["generate_sec"] = round(time.perf_counter() - start, 1)
+        results["config"]["rss_mb_before"] = rss_mb()
+
+        for sessions in levels:
+            level = run_level(sessions, profile_ids, flows, args.duration, args.seed)
+            results["levels"].append(level)
+            print(f"{sessions:>4} sessions: {level['throughput_reruns_per_sec']} reruns/s, p95 {level['p95_ms']} ms, "
+                  f"errors {level['error_rate']}, RSS {level['rss_mb']} MB", file=sys.stderr)
+
+        with urllib.request.urlopen(f"{stub_env(stub)['NUTRI_SPOONACULAR_URL']}/_stats") as response:
+            results["api_requests"] = json.load(response)
+    finally:
+        stub.shutdown()
+        shutil.rmtree(users_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
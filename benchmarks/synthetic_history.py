@@ -0,0 +1,137 @@
+# Seeded generator for large, realistic user histories, used by bench_history.py.
+#
+#   python benchmarks/synthetic_history.py --years 10 --root /tmp/nutri_users
+#
+# Creates one profile with (by default) 10 years ending today of
+#   - 4-10 meal entries per day (3 main meals, the rest snacks), stored in the month files of utils/meal_store.py
+#   - one weight per day (slow trend + daily noise) in weight_data.csv
+#   - one body composition measurement per week in body_composition.json
+# The same seed always produces the same history, so results of different versions can be compared.
+import argparse
+import json
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from apptest_utils import ROOT  # noqa: F401  (puts the repository root on sys.path)
+
+# name -> nutrition per 100 g (calories, protein, fat, carbohydrates), typical portion in g
+FOODS = {
+    "Breakfast": [("Oats", (389, 16.9, 6.9, 66.3), 60), ("Banana", (89, 1.1, 0.3, 22.8), 120),
+                  ("Greek yogurt", (97, 9.0, 5.0, 3.9), 150), ("Whole wheat bread", (247, 13.0, 3.4, 41.0), 80),
+                  ("Scrambled eggs", (149, 10.0, 11.0, 1.6), 120), ("Coffee with milk", (38, 2.0, 1.5, 3.6), 250)],
+    "Lunch": [("Chicken breast", (165, 31.0, 3.6, 0.0), 150), ("Brown rice", (111, 2.6, 0.9, 23.0), 200),
+              ("Mixed salad", (20, 1.4, 0.2, 3.3), 150), ("Lentil soup", (76, 5.0, 1.8, 10.0), 350),
+              ("Pasta with tomato sauce", (131, 4.5, 2.2, 24.0), 300), ("Tuna sandwich", (231, 13.0, 9.0, 24.0), 180)],
+    "Dinner": [("Salmon", (208, 20.0, 13.0, 0.0), 150), ("Potatoes", (77, 2.0, 0.1, 17.0), 250),
+               ("Broccoli", (34, 2.8, 0.4, 7.0), 150), ("Beef stir fry", (180, 18.0, 9.0, 6.0), 250),
+               ("Vegetable curry", (110, 3.0, 6.0, 12.0), 300), ("Pizza margherita", (266, 11.0, 10.0, 33.0), 250)],
+    "Snack": [("Apple", (52, 0.3, 0.2, 14.0), 150), ("Almonds", (579, 21.0, 50.0, 22.0), 30),
+              ("Protein bar", (350, 30.0, 10.0, 35.0), 60), ("Dark chocolate", (546, 4.9, 31.0, 61.0), 25),
+              ("Carrot sticks", (41, 0.9, 0.2, 10.0), 100), ("Orange juice", (45, 0.7, 0.2, 10.4), 250)],
+}
+MAIN_MEALS = ("Breakfast", "Lunch", "Dinner")
+
+
+# -------------------- GENERATORS --------------------
+def _meal_entry(rng, day, category):
+    name, (calories, protein, fat, carbohydrates), portion = rng.choice(FOODS[category])
+    factor = portion * rng.uniform(0.6, 1.5) / 100
+    return {
+        "recipe_title": name,
+        "selected_date": day.isoformat(),
+        "meal_category": category,
+        "nutrition": {"calories": round(calories * factor, 2), "carbohydrates": round(carbohydrates * factor, 2),
+                      "fat": round(fat * factor, 2), "protein": round(protein * factor, 2)},
+    }
+
+
+def meal_entries(rng, start, end, min_per_day=4, max_per_day=10):
+    day = start
+    while day <= end:
+        count = rng.randint(min_per_day, max_per_day)
+        categories = list(MAIN_MEALS[:count]) + ["Snack"] * max(0, count - len(MAIN_MEALS))
+        for category in categories:
+            yield _meal_entry(rng, day, category)
+        day += timedelta(days=1)
+
+
+def weights(rng, start, end, start_weight=92.0):
+    # Slow random trend (changes every ~4 weeks) plus daily water fluctuation
+    weight, trend, day = start_weight, 0.0, start
+    while day <= end:
+        if day.day == 1:
+            trend = rng.uniform(-0.05, 0.04)
+        weight = min(max(weight + trend, 55.0), 140.0)
+        yield day, round(weight + rng.gauss(0, 0.4), 1)
+        day += timedelta(days=1)
+
+
+def body_compositions(rng, start, end):
+    body_fat, muscle_mass, day = 28.0, 33.0, start
+    while day <= end:
+        body_fat = min(max(body_fat + rng.uniform(-0.3, 0.25), 8.0), 45.0)
+        muscle_mass = min(max(muscle_mass + rng.uniform(-0.15, 0.2), 20.0), 50.0)
+        # Same format as pandas' to_json(orient="records") in data_visualization.py: dates as epoch ms
+        epoch_ms = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+        yield {"Date": epoch_ms, "Body Fat": round(body_fat, 1), "Muscle Mass": round(muscle_mass, 1),
+               "Water Content": round(rng.uniform(48.0, 56.0), 1)}
+        day += timedelta(days=7)
+
+
+# -------------------- WRITING --------------------
+def generate_history(profile_id=None, years=10, seed=42, end=None, meals_per_day=(4, 10)):
+    # Writes the history below utils.storage.USERS_DIR (set NUTRI_USERS_DIR before importing utils)
+    # and returns the profile id plus the number of generated records.
+    from utils.meal_store import append_entries
+    from utils.storage import BODY_COMP_FILE, PROFILE_FILE, WEIGHT_FILE, new_profile_id, user_file, write_json
+
+    rng = random.Random(seed)
+    profile_id = profile_id or new_profile_id()
+    end = end or date.today()
+    start = end - timedelta(days=round(365.25 * years))
+
+    write_json(user_file(profile_id, PROFILE_FILE), {
+        "profile_id": profile_id, "name": "Synthetic", "age": 35, "gender": "Female", "goal": "Lose Weight",
+        "diet": "Omnivore", "height": 168, "activity": "Moderately active (3-5 days per week)",
+    })
+
+    # One month at a time, so memory stays flat for any number of years
+    meals, batch = 0, []
+    for entry in meal_entries(rng, start, end, *meals_per_day):
+        if batch and batch[-1]["selected_date"][:7] != entry["selected_date"][:7]:
+            append_entries(profile_id, batch)
+            meals += len(batch)
+            batch = []
+        batch.append(entry)
+    if batch:
+        append_entries(profile_id, batch)
+        meals += len(batch)
+
+    weight_rows = list(weights(rng, start, end))
+    with open(user_file(profile_id, WEIGHT_FILE), "w", encoding="utf-8") as f:
+        f.write("Date,Weight\n")
+        f.writelines(f"{day.isoformat()},{weight}\n" for day, weight in weight_rows)
+
+    compositions = list(body_compositions(rng, start, end))
+    write_json(user_file(profile_id, BODY_COMP_FILE), compositions)
+
+    return {"profile_id": profile_id, "start": start.isoformat(), "end": end.isoformat(), "meals": meals,
+            "weights": len(weight_rows), "body_compositions": len(compositions)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic user history")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--root", required=True, help="users directory to write to (NUTRI_USERS_DIR)")
+    args = parser.parse_args()
+
+    os.environ["NUTRI_USERS_DIR"] = args.root     # read by utils.storage on import
+    print(json.dumps(generate_history(years=args.years, seed=args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -2,10 +2,25 @@ import streamlit as st
 import datetime
 from streamlit_extras.switch_page_button import switch_page
 import calendar
-import matplotlib.pyplot as plt
-import json
+from utils.session import get_profile_id
+from utils.aggregates import day_totals, month_aggregate
+from utils.calendar_heatmap import render_heatmap_html
+from utils.charts import goal_bar_chart, goal_ring_charts
+from utils.fragments import dashboard_section
+from utils.instrumentation import set_page
+from utils.meal_store import adjacent_months, prefetch_months
+from utils.memory import track_session
+from utils.profiler import render_page_profile, start_page_profile
+from utils.targets import daily_targets
+from utils.templates import apply_schedules
+from utils.theme import apply_theme
 
 active_page = "Calories"  # Set the active page name
+set_page("Calories Tracker")  # timings of this run are counted for this page
+track_session("Calories Tracker")  # session state size, off unless NUTRI_MEMDIAG=1
+page_profile = start_page_profile("Calories Tracker")  # off unless NUTRI_PROFILE is set
+profile_id = get_profile_id()  # all reads below use the partition of this user
+apply_schedules(profile_id)  # log recurring meal templates that are due (utils/templates.py)
 
 # Centered navigation with switch_page
 st.markdown('<div class="nav-container">', unsafe_allow_html=True)
@@ -44,11 +59,8 @@ if "recipes" not in st.session_state:
     st.session_state.recipes = {}
 
 # -------------------- CSS STYLES --------------------
-# Load custom CSS styles from a file
-with open("ressources/styles.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-st.markdown('<link rel="stylesheet" href="styles.css">', unsafe_allow_html=True)
+# Shared styles, compiled once per process (utils/theme.py)
+apply_theme("base", "no_sidebar")
 
 # -------------------- PAGE TITLE --------------------
 # Display the main title and subtitle of the page
@@ -74,180 +86,94 @@ st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
 st.markdown('<p class="title">Your Daily Nutrition Overview</p>', unsafe_allow_html=True)
 st.markdown(f'<div class="description">Review how your daily nutrient intake compares with your personalized dietary targets, helping you stay aligned with your health and wellness objectives</p>', unsafe_allow_html=True)
 
+# Personalized daily targets from the profile (utils/targets.py), computed once per profile version
+targets = daily_targets(profile_id)
+user_goal = targets["goal"]
+
+# Calculate percentages for each nutrient
+def goal_percentages(totals, max_values):
+    return {nutrient: min((totals[nutrient] / max_values[nutrient]) * 100, 100) for nutrient in ["calories", "protein", "carbs", "fat"]}
+
+# The dashboard is split into sections (fragments). Changing the date only reruns the overview with
+# totals and charts (plain functions inside it, they have no widgets of their own), paging or picking a
+# day in the calendar only reruns the calendar part.
+
 # -------------------- TOTAL NUTRITIONAL INFORMATION --------------------
-# Load recipes from calendar_recipes.json
-def load_calendar_recipes():
-    try:
-        with open("ressources/calendar_recipes.json", "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
-
-calendar_recipes = load_calendar_recipes()
-
-# Synchronize session state with file
-if "calendar_recipes" not in st.session_state:
-    st.session_state["calendar_recipes"] = calendar_recipes
-else:
-    # Update session state if the file has new data
-    if st.session_state["calendar_recipes"] != calendar_recipes:
-        st.session_state["calendar_recipes"] = calendar_recipes
-
-# Select a date to view totals
-selected_date = st.date_input("Select a date to view totals:", value=datetime.datetime.now().date())
-selected_date_str = selected_date.strftime("%Y-%m-%d")
-
-# Filter meals for the selected date
-meals_today = [meal for meal in st.session_state["calendar_recipes"] if meal["selected_date"] == selected_date_str]
-
-# Calculate totals for the selected date
-totals = {
-    "calories": sum(meal["nutrition"]["calories"] for meal in meals_today),
-    "protein": sum(meal["nutrition"]["protein"] for meal in meals_today),
-    "fat": sum(meal["nutrition"]["fat"] for meal in meals_today),
-    "carbs": sum(meal["nutrition"]["carbohydrates"] for meal in meals_today),
-}
-
-# Display totals in a dashboard layout
-st.markdown(f"""
-<div class="dashboard-box">
-    <div class="dashboard-title">Total Nutritional Information for {selected_date_str}</div>
-    <div class="dashboard-stats">
-        <div>
-            <div class="stats-text">Calories</div>
-            <div class="stats-value">{totals['calories']:.2f} kcal</div>
-        </div>
-        <div>
-            <div class="stats-text">Protein</div>
-            <div class="stats-value">{totals['protein']:.2f} g</div>
-        </div>
-        <div>
-            <div class="stats-text">Carbohydrates</div>
-            <div class="stats-value">{totals['carbs']:.2f} g</div>
-        </div>
-        <div>
-            <div class="stats-text">Fat</div>
-            <div class="stats-value">{totals['fat']:.2f} g</div>
+@dashboard_section("overview", depends_on=("dashboard_date",))
+def daily_overview():
+    # Select a date to view totals
+    selected_date = st.date_input("Select a date to view totals:", value=datetime.datetime.now().date(), key="dashboard_date")
+
+    # Totals for the selected date come from the per-day aggregates of its month (computed once per data version)
+    totals = day_totals(profile_id, selected_date)
+
+    totals_section(selected_date, totals)
+
+    # Add some spacing between sections
+    st.markdown("<br><br>", unsafe_allow_html=True)
+
+    goal_bar_chart_section(totals)
+    ring_charts_section(totals)
+
+def totals_section(selected_date, totals):
+    # Display totals in a dashboard layout
+    st.markdown(f"""
+    <div class="dashboard-box">
+        <div class="dashboard-title">Total Nutritional Information for {selected_date.strftime("%Y-%m-%d")}</div>
+        <div class="dashboard-stats">
+            <div>
+                <div class="stats-text">Calories</div>
+                <div class="stats-value">{totals['calories']:.2f} kcal</div>
+            </div>
+            <div>
+                <div class="stats-text">Protein</div>
+                <div class="stats-value">{totals['protein']:.2f} g</div>
+            </div>
+            <div>
+                <div class="stats-text">Carbohydrates</div>
+                <div class="stats-value">{totals['carbs']:.2f} g</div>
+            </div>
+            <div>
+                <div class="stats-text">Fat</div>
+                <div class="stats-value">{totals['fat']:.2f} g</div>
+            </div>
         </div>
     </div>
-</div>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
 # -------------------- BAR CHARTS FOR GOALS --------------------
-
-# Add some spacing between sections
-st.markdown("<br><br>", unsafe_allow_html=True)
-
-# Load user preferences from profile_data.json
-def load_user_preferences():
-    try:
-        with open('ressources/profile_data.json', 'r') as f:
-            data = json.load(f)
-            goal = data.get("goal")  # Get the goal exactly as it is in the file
-            diet = data.get("diet")  # Get the diet exactly as it is in the file
-            return {"goal": goal, "diet": diet}
-    except FileNotFoundError:
-        return {"goal": None, "diet": None}  # Return None if the file is not found
-
-# Get user preferences
-user_prefs = load_user_preferences()
-user_goal = user_prefs.get("goal", "just eat Healthier :)")  # Default to "just eat Healthier :)"
-
-# Define maximum values for each goal
-goals = {
-    "Build Muscle": {"calories": 2700, "protein": 180, "carbs": 350, "fat": 80},
-    "Lose Weight": {"calories": 1700, "protein": 135, "carbs": 300, "fat": 40},
-    "just eat Healthier :)": {"calories": 2200, "protein": 100, "carbs": 275, "fat": 70},
-}
-
-# Check if the user's goal is in the defined goals
-if user_goal in goals:
-    max_values = goals[user_goal]
-
-    # Calculate percentages for each nutrient
-    percentages = {
-        "calories": min((totals["calories"] / max_values["calories"]) * 100, 100),
-        "protein": min((totals["protein"] / max_values["protein"]) * 100, 100),
-        "carbs": min((totals["carbs"] / max_values["carbs"]) * 100, 100),
-        "fat": min((totals["fat"] / max_values["fat"]) * 100, 100),
-    }
+def goal_bar_chart_section(totals):
+    # Check if the user has selected a supported goal
+    if user_goal is None:
+        st.info("No goal selected or goal not supported.")
+        return
+    max_values = targets
 
     # Create bar chart data
-    labels = ["Calories", "Protein", "Carbs", "Fat"]
-    values = [totals["calories"], totals["protein"], totals["carbs"], totals["fat"]]
-    max_values_list = [max_values["calories"], max_values["protein"], max_values["carbs"], max_values["fat"]]
-
-    # Plot the bar charts
-    fig, ax = plt.subplots(figsize=(8, 5))
-    bars = ax.bar(labels, values, color=["#4caf50", "#2196f3", "#ff9800", "#f44336"], alpha=0.8)
-
-    # Add value/max value labels on top of the bars
-    for i, bar in enumerate(bars):
-        unit = "kcal" if labels[i] == "Calories" else "g"
-        ax.text(
-            bar.get_x() + bar.get_width() / 2,
-            bar.get_height() + 2,
-            f"{values[i]:.0f}/{max_values_list[i]} {unit}",
-            ha="center",
-            va="bottom",
-            fontsize=10,
-            fontweight="bold"
-        )
+    labels = ("Calories", "Protein", "Carbs", "Fat")
+    values = (totals["calories"], totals["protein"], totals["carbs"], totals["fat"])
+    max_values_list = (max_values["calories"], max_values["protein"], max_values["carbs"], max_values["fat"])
 
-    # Customize the chart
-    ax.set_ylim(0, max(max_values_list) * 1.2)  # Adjust the y-axis limit
-    ax.set_ylabel("Nutritional Values")
-    ax.set_title(f"Progress Towards {user_goal} Goal",fontweight="bold")
-    ax.set_xticks(range(len(labels)))
-    ax.set_xticklabels(labels)
-
-    # Display the chart in Streamlit
-    st.pyplot(fig)
-else:
-    st.info("No goal selected or goal not supported.")
+    # Rendered once per distinct input and served from the chart cache afterwards
+    st.image(goal_bar_chart(labels, values, max_values_list, user_goal), use_container_width=True)
 
 # -------------------- CIRCULAR PROGRESS CHARTS FOR GOALS --------------------
-
-# Check if the user's goal is in the defined goals
-if user_goal in goals:
-    max_values = goals[user_goal]
-
-    # Calculate percentages for each nutrient
-    percentages = {
-        "calories": min((totals["calories"] / max_values["calories"]) * 100, 100),
-        "protein": min((totals["protein"] / max_values["protein"]) * 100, 100),
-        "carbs": min((totals["carbs"] / max_values["carbs"]) * 100, 100),
-        "fat": min((totals["fat"] / max_values["fat"]) * 100, 100),
-    }
+def ring_charts_section(totals):
+    # Check if the user has selected a supported goal
+    if user_goal is None:
+        st.info("No goal selected or goal not supported.")
+        return
+    percentages = goal_percentages(totals, targets)
 
     # Define labels, values, and colors for the circular charts
-    labels = ["Calories", "Protein", "Carbs", "Fat"]
-    colors = ["#4caf50", "#2196f3", "#ff9800", "#f44336"]  # Green, Blue, Orange, Red
-
-    # Create circular progress charts
-    fig, axes = plt.subplots(1, 4, figsize=(16, 4))  # Create 4 subplots side by side
-
-    for i, ax in enumerate(axes):
-        # Create a pie chart with the percentage and remaining space
-        ax.pie(
-            [percentages[labels[i].lower()], 100 - percentages[labels[i].lower()]],
-            colors=[colors[i], "#e0e0e0"],  # Use the color and a light gray for the remaining
-            startangle=90,
-            counterclock=False,
-            wedgeprops={"width": 0.3},  # Make it look like a progress ring
-        )
-        # Add the percentage text in the center
-        ax.text(
-            0, 0, f"{percentages[labels[i].lower()]:.0f}%", ha="center", va="center", fontsize=20, fontweight="bold", color=colors[i]
-        )
-        # Add the label below the chart
-        ax.set_title(labels[i], fontsize=20,fontweight="bold", pad=20)
+    labels = ("Calories", "Protein", "Carbs", "Fat")
+    colors = ("#4caf50", "#2196f3", "#ff9800", "#f44336")  # Green, Blue, Orange, Red
+    values = tuple(percentages[label.lower()] for label in labels)
+
+    # Create circular progress charts (4 rings side by side)
+    st.image(goal_ring_charts(labels, values, colors), use_container_width=True)
 
-    # Adjust layout and display the charts in Streamlit
-    plt.tight_layout()
-    st.pyplot(fig)
-else:
-    st.info("No goal selected or goal not supported.")
+daily_overview()
 
 # -------------------- LINE SEPARATOR --------------------
 st.markdown('<div class="separator"></div>', unsafe_allow_html=True) 
@@ -263,90 +189,84 @@ if "calendar_year" not in st.session_state:
 if "calendar_month" not in st.session_state:
     st.session_state.calendar_month = datetime.datetime.now().month
 
-# Functions to change the month
+# Functions to change the month (the button callback already triggers the rerun of the calendar section)
 def previous_month():
-    if st.session_state.calendar_month == 1:
-        st.session_state.calendar_month = 12
-        st.session_state.calendar_year -= 1
-    else:
-        st.session_state.calendar_month -= 1
-    st.rerun()
+    (st.session_state.calendar_year, st.session_state.calendar_month), _ = adjacent_months(
+        st.session_state.calendar_year, st.session_state.calendar_month)
 
 def next_month():
-    if st.session_state.calendar_month == 12:
-        st.session_state.calendar_month = 1
-        st.session_state.calendar_year += 1
-    else:
-        st.session_state.calendar_month += 1
-    st.rerun()
+    _, (st.session_state.calendar_year, st.session_state.calendar_month) = adjacent_months(
+        st.session_state.calendar_year, st.session_state.calendar_month)
 
 # Variable to store recipes
 if "recipes" not in st.session_state:
     st.session_state.recipes = {}
 
-col1, col2, col3 = st.columns([1, 2, 1])
+# Calorie goal used to color the days
+calorie_goal = targets["calories"]
 
-with col1:
-    st.markdown('<div class="active-button">', unsafe_allow_html=True)
-    st.button("⬅ Previous", key="prev_month", on_click=previous_month)
+@dashboard_section("calendar", depends_on=("calendar_year", "calendar_month", "prev_month", "next_month"))
+def calendar_section():
+    col1, col2, col3 = st.columns([1, 2, 1])
 
-with col2:
-    st.markdown(
-        f"<h3 style='text-align: center;margin-top: 15px'>📅 {calendar.month_name[st.session_state.calendar_month]} {st.session_state.calendar_year}</h3>",
-        unsafe_allow_html=True
-    )
+    with col1:
+        st.markdown('<div class="active-button">', unsafe_allow_html=True)
+        st.button("⬅ Previous", key="prev_month", on_click=previous_month)
 
-with col3:
-    st.button(" Next ➡", key="next_month", on_click=next_month)
-
-# Get the matrix of weeks
-cal = calendar.Calendar(firstweekday=0)
-month_days = cal.monthdayscalendar(st.session_state.calendar_year, st.session_state.calendar_month)
-
-# Days of the week
-days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-cols = st.columns(7)
-for idx, day in enumerate(days_of_week):
-    cols[idx].markdown(f"**{day}**")
-
-# Draw the calendar
-for week in month_days:
-    cols = st.columns(7)
-    for idx, day in enumerate(week):
-        if day == 0:
-            cols[idx].markdown(" ")  # empty day
-        else:
-            with cols[idx]:
-                if st.button(f"{day}", key=f"day_{day}_{st.session_state.calendar_month}_{st.session_state.calendar_year}"):
-                    st.session_state.selected_day = day
+    with col2:
+        st.markdown(
+            f"<h3 style='text-align: center;margin-top: 15px'>📅 {calendar.month_name[st.session_state.calendar_month]} {st.session_state.calendar_year}</h3>",
+            unsafe_allow_html=True
+        )
+
+    with col3:
+        st.button(" Next ➡", key="next_month", on_click=next_month)
+
+    # Per-day aggregates of the visible month, the months before and after are parsed in the background
+    # so that "Previous" / "Next" find them already in the cache
+    aggregate = month_aggregate(profile_id, st.session_state.calendar_year, st.session_state.calendar_month)
+    prefetch_months(profile_id, adjacent_months(st.session_state.calendar_year, st.session_state.calendar_month))
+
+    # Draw the calendar as one heatmap instead of one button per day
+    st.markdown(render_heatmap_html(aggregate, calorie_goal), unsafe_allow_html=True)
+
+    day_detail_section(aggregate)
 
 # -------------------- DISPLAY SELECTED DAY ENTRIES --------------------
+@dashboard_section("day_detail", depends_on=("calendar_day_*",), parent="calendar")
+def day_detail_section(aggregate):
+    month_name = calendar.month_name[aggregate["month"]]
+    selected_day = st.selectbox(
+        "Select a day to see its entries:",
+        range(1, aggregate["days"] + 1),
+        index=None,
+        format_func=lambda day: f"{day} {month_name} ({len(aggregate['entries'][day - 1])} entries)",
+        key=f"calendar_day_{aggregate['month']}_{aggregate['year']}",
+    )
 
-# Display the selected day and show entries for that day
-if "selected_day" in st.session_state:
-    selected_day = st.session_state.selected_day
-    selected_date_key = f"{st.session_state.calendar_year}-{st.session_state.calendar_month:02d}-{selected_day:02d}"
-
-    st.markdown(f"### Selected Day: {selected_day} {calendar.month_name[st.session_state.calendar_month]} {st.session_state.calendar_year}")
-
-    # Filter meals for the selected date
-    meals_today = [meal for meal in st.session_state["calendar_recipes"] if meal["selected_date"] == selected_date_key]
-
-    # Organize meals by meal type
-    meals_by_type = {"Breakfast": [], "Lunch": [], "Dinner": [], "Snack": []}
-    for meal in meals_today:
-        meal_type = meal.get("meal_category", "Other")
-        if meal_type in meals_by_type:
-            meals_by_type[meal_type].append(meal)
-
-    # Display meals by type
-    for meal_type, meals in meals_by_type.items():
-        st.markdown(f"#### {meal_type}")
-        if meals:
-            for meal in meals:
-                st.markdown(f"- **{meal['recipe_title']}**")
-        else:
-            st.markdown("No data available.")
+    # Display the selected day and show entries for that day
+    if selected_day:
+        st.markdown(f"### Selected Day: {selected_day} {month_name} {aggregate['year']}")
+
+        # Entries of the selected day are a lookup in the month aggregate
+        meals_today = aggregate["entries"][selected_day - 1]
+
+        # Organize meals by meal type
+        meals_by_type = {"Breakfast": [], "Lunch": [], "Dinner": [], "Snack": []}
+        for meal in meals_today:
+            meal_type = meal.get("meal_category", "Other")
+            if meal_type in meals_by_type:
+                meals_by_type[meal_type].append(meal)
+
+        # Display meals by type
+        for meal_type, meals in meals_by_type.items():
+            st.markdown(f"#### {meal_type}")
+            if meals:
+                st.markdown("\n".join(f"- **{meal['recipe_title']}**" for meal in meals))
+            else:
+                st.markdown("No data available.")
+
+calendar_section()
    
 # -------------------- LINE SEPARATOR --------------------
 st.markdown('<div class="separator"></div>', unsafe_allow_html=True) 
@@ -389,15 +309,9 @@ with col4:
     if st.button("🍫 Snack"):
         st.switch_page("pages/Calories Tracker - Snack.py")
         
-#------------- HIDE SIDEBAR -------------
-st.markdown("""
-    <style>
-        [data-testid="stSidebar"] {
-            display: none;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
 st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
 
+# -------------------- PROFILE OF THIS RUN --------------------
+render_page_profile(page_profile)
+
 # Code developed with the help of ChatGPT and Copilot.
\ No newline at end of file
@@ -7,6 +7,14 @@ import datetime
 import json
 import uuid # for generating unique IDs so that each recipe has a unique identifier and no conflicts occurr
 from streamlit_extras.switch_page_button import switch_page # for switching between pages
+from utils.instrumentation import set_page, timed # hot path timings, off unless NUTRI_METRICS=1
+from utils.memory import track_session # session state sizes, off unless NUTRI_MEMDIAG=1
+from utils.profiler import render_page_profile, start_page_profile # profiler view, off unless NUTRI_PROFILE is set
+from utils.session import get_profile_id # every user reads and writes only his own data partition
+from utils.listing import entry_rows, keyset_page, offset_page # one page of a long list per rerun
+from utils.meal_store import append_entries, clear_history, page_entries # meal history stored in one file per month
+from utils.targets import user_profile # profile fields cached per version of the profile file
+from utils.theme import apply_theme # one compiled stylesheet for all pages
 
 # -------------------- Initialize session state for recipes and calendar ----------------------
 if "recipes" not in st.session_state:
@@ -15,27 +23,24 @@ if "recipes" not in st.session_state:
 if "calendar_recipes" not in st.session_state:
     st.session_state["calendar_recipes"] = []   # if the session state does not exist, create it
 
+set_page("Recipes Generator")
+track_session("Recipes Generator")
+page_profile = start_page_profile("Recipes Generator")
+
+# -------------------- Current user ------------------------------------------------------------
+profile_id = get_profile_id()
+
 # -------------------- Load environment variables from .env file ------------------------------
 load_dotenv() 
 
 # --------------------- API keys and URLs ----------------------------------------------------
 API_KEY_SPOONACULAR = os.getenv("API_KEY_SPOONACULAR")
-
-# -------------------- Load user preferences from profile data (JSON file) --------------------
-def load_user_preferences():
-    try:
-        with open('ressources/profile_data.json', 'r') as f:  # Load the user preferences from the profile data
-            data = json.load(f)
-            goal = data.get("goal")  # Get the goal exactly as it is in the file
-            diet = data.get("diet")  # Get the diet exactly as it is in the file
-            return {"goal": goal, "diet": diet}
-    except FileNotFoundError:
-        return {"goal": None, "diet": None}  # Return None if the file is not found
+SPOONACULAR_URL = os.getenv("NUTRI_SPOONACULAR_URL", "https://api.spoonacular.com").rstrip("/")  # e.g. the local stand-in benchmarks/api_stub.py
 
 # -------------------- Define the user preferences ---------------------------------------------
-user_prefs = load_user_preferences()    # load the user preferences from the profile data
-diet = user_prefs.get("diet", "None")   # assign diet and goal from the user preferences
-goal = user_prefs.get("goal", "None")
+user_prefs = user_profile(profile_id)    # parsed once per version of the profile file (utils/targets.py)
+diet = user_prefs.get("diet")   # assign diet and goal from the user preferences
+goal = user_prefs.get("goal")
 
 # -------------------- Handle API error responses ---------------------------------------------
 def handle_api_error(response):     
@@ -65,8 +70,7 @@ def handle_api_error(response):
 test_mode = st.sidebar.checkbox("⚙️ Use Test Mode (Load Local JSON Data)", value=True)  
 
 # -------------------- Load the custom CSS for styling the app --------------------------------
-with open("ressources/styles.css") as f:     
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+apply_theme("base")
 
 # ------------------- Navigation buttons for different sections ------------------------------
 active_page = "Recipes"  # Set the active page to "Recipes", which is used for styling the navigation buttons
@@ -104,12 +108,7 @@ st.markdown("</div>", unsafe_allow_html=True)   # close the navigation container
 st.markdown('<p class="title">Discover Recipes Based on Your Preferences</p>', unsafe_allow_html=True)
 
 # ------------------- Load user's profile data for personalized welcome message ---------------
-try:      
-    with open('ressources/profile_data.json', 'r') as f:
-        profile_data = json.load(f)
-        user_name = profile_data.get("name", "Guest")   # get the user name from the profile data
-except FileNotFoundError:
-    user_name = "Guest"
+user_name = user_prefs.get("name") or "Guest"   # get the user name from the profile data
 
 st.markdown(f'<div class="description">Welcome, {user_name}! Discover delicious recipes tailored to your dietary goals, preferences, and cuisine choices. Get cooking today!</p>', unsafe_allow_html=True)
 st.markdown('<div class="separator"></div>', unsafe_allow_html=True) 
@@ -120,6 +119,7 @@ st.markdown(f"<p style='font-size: 20px; margin-left: 50px;'><b>🎯 Goal:</b> {
 st.markdown(f"<p style='font-size: 20px; margin-left: 50px;'><b>🥗 Diet:</b> {diet}</p>", unsafe_allow_html=True)
 
 # ------------------ Recipe fetching functions -------------------------------------------------
+@timed("get_recipes")
 def get_recipes(diet, goal, cuisine, dish_type, test_mode=False):
     if test_mode:  # Use local JSON file if in test mode
         try:
@@ -141,7 +141,7 @@ def get_recipes(diet, goal, cuisine, dish_type, test_mode=False):
         }
         goal_calories = calorie_ranges.get(goal, "calories=2000")  # Default to 2000 kcal
 
-        url = f"https://api.spoonacular.com/recipes/complexSearch?diet={diet}&{goal_calories}&cuisine={cuisine}&type={dish_type}&sort=healthiness&number=15&addRecipeInformation=true&apiKey={API_KEY_SPOONACULAR}"
+        url = f"{SPOONACULAR_URL}/recipes/complexSearch?diet={diet}&{goal_calories}&cuisine={cuisine}&type={dish_type}&sort=healthiness&number=15&addRecipeInformation=true&apiKey={API_KEY_SPOONACULAR}"
         response = requests.get(url)
         if handle_api_error(response):
             return response.json().get("results", [])
@@ -149,6 +149,7 @@ def get_recipes(diet, goal, cuisine, dish_type, test_mode=False):
             return []
 
 # ------------------ Recipe details functions -------------------------------------------------
+@timed("get_recipe_details")
 def get_recipe_details(recipe_id, test_mode=False):
     if test_mode:   # Use local JSON file if in test mode
         try:
@@ -167,7 +168,7 @@ def get_recipe_details(recipe_id, test_mode=False):
             st.error("Test data file is not properly formatted. Please check 'sample_recipe_details.json'.")
             return {}
     else:         # live mode: make an API call to fetch recipe details
-        url = f"https://api.spoonacular.com/recipes/{recipe_id}/information?includeNutrition=true&apiKey={API_KEY_SPOONACULAR}"
+        url = f"{SPOONACULAR_URL}/recipes/{recipe_id}/information?includeNutrition=true&apiKey={API_KEY_SPOONACULAR}"
         response = requests.get(url)
         if handle_api_error(response):
             data = response.json()
@@ -333,50 +334,57 @@ def save_recipe_to_calendar(recipe, selected_date, meal_category, details):
 def display_calendar_recipes(): 
     if "calendar_recipes" in st.session_state and st.session_state["calendar_recipes"]:
         st.subheader("Your Selected Recipes")
-        for entry in st.session_state["calendar_recipes"]:
-            st.write(f"{entry['recipe_title']} on {entry['selected_date']} as {entry['meal_category']}")
+        page = offset_page(st.session_state["calendar_recipes"], "selected_recipes_page")   # only one page is drawn
+        st.dataframe(entry_rows(page), hide_index=True, use_container_width=True)
     else:
         pass
 
+def display_saved_recipes():
+    # filters for the saved recipes, the month files are read page by page (newest first)
+    col1, col2 = st.columns(2)
+    with col1:
+        category = st.selectbox("Meal category", ["All", "Breakfast", "Lunch", "Dinner", "Snack"], key="saved_category")
+    with col2:
+        period = st.date_input("Period", (), key="saved_period")    # empty = whole history
+    start = period[0].isoformat() if len(period) > 0 else None
+    end = period[1].isoformat() if len(period) > 1 else start
+    category = None if category == "All" else category
+
+    def fetch(cursor, limit):
+        return page_entries(profile_id, cursor, limit, start, end, category)
+
+    entries = keyset_page(fetch, "saved_recipes_page", [start, end, category])
+    if entries:
+        st.markdown("### Saved Recipes")
+        st.dataframe(entry_rows(entries), hide_index=True, use_container_width=True)
+    else:
+        st.info("No saved recipes found.")
+
 # ------------------- Save and load recipes functions --------------------------------------
 def save_to_file():
     if "calendar_recipes" in st.session_state:
         recipes = st.session_state["calendar_recipes"]      # get the recipes from the session state
         
         if recipes:
-            with open('ressources/calendar_recipes.json', 'w') as f:    # open the file in write mode
-                data_to_save = []
-                for entry in recipes:       # iterate through the recipes
-                    entry_copy = entry.copy()       # create a copy of the entry
-                    if isinstance(entry_copy["selected_date"], datetime.date):      # check if the selected date is a date object
-                        entry_copy["selected_date"] = entry_copy["selected_date"].isoformat()
-                    data_to_save.append(entry_copy)     # append the entry to the data_to_save list
-                
-                json.dump(data_to_save, f, indent=4)    # save the recipes to the file
-                
+            data_to_save = []
+            for entry in recipes:       # iterate through the recipes
+                entry_copy = entry.copy()       # create a copy of the entry
+                if isinstance(entry_copy["selected_date"], datetime.date):      # check if the selected date is a date object
+                    entry_copy["selected_date"] = entry_copy["selected_date"].isoformat()
+                data_to_save.append(entry_copy)     # append the entry to the data_to_save list
+
+            append_entries(profile_id, data_to_save)    # add the recipes to the month files of their dates
+            st.session_state["calendar_recipes"] = []   # they are saved now, so pressing the button again does not add them twice
+
             st.success("Recipes have been saved to the calendar.")
         else:
             st.warning("No recipes to save.")
     else:
         st.warning("No recipes to save. Please add recipes to your calendar first.")   
 
-# ------------------- Load recipes from file functions ------------------------------------
-def load_from_file():
-    try:
-        with open('ressources/calendar_recipes.json', 'r') as f:
-            content = f.read()      # read the content of the file
-            
-            if content.strip():     # check if the file is not empty
-                return json.loads(content)
-            else:
-                return []  # Return empty list if file is empty
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []  # Return empty list if the file is not found or is malformed
-
 # -------------------- Reset calendar functions ------------------------------------------
 def reset_calendar():
-    with open('ressources/calendar_recipes.json', 'w') as f:
-        json.dump([], f)    # reset the calendar_recipes.json file to an empty list
+    clear_history(profile_id)    # remove all month files of the user
 
     st.session_state["calendar_recipes"] = []   # reset the session state to an empty list
     st.success("✅ Calendar has been reset successfully!")
@@ -423,24 +431,13 @@ if st.button("🗑️ Reset Calendar"):      # reset the calendar with this butt
 st.markdown("</div>", unsafe_allow_html=True)
 
 st.markdown('<div class="active-button">', unsafe_allow_html=True)
-if st.button("📂 View Saved Recipes"):   # view the saved recipes (that are in the json file) with this button
-    try:
-        with open('ressources/calendar_recipes.json', 'r') as f:
-            saved_recipes = json.load(f)   
-            if saved_recipes:
-                st.markdown("### Saved Recipes")
-                for recipe in saved_recipes:        # display these information of the saved recipes
-                    st.markdown(f"**Recipe Title:** {recipe['recipe_title']}")
-                    st.markdown(f"- **Date:** {recipe['selected_date']}")
-                    st.markdown(f"- **Meal Category:** {recipe['meal_category']}")
-                    st.markdown("---")
-            else:
-                st.info("No saved recipes found.")
-    except FileNotFoundError:
-        st.warning("No saved recipes found.")
-    except json.JSONDecodeError:
-        st.error("Error reading the saved recipes file.")
+def toggle_saved_recipes():
+    st.session_state["show_saved_recipes"] = not st.session_state.get("show_saved_recipes", False)
+
+st.button("📂 View Saved Recipes", on_click=toggle_saved_recipes)   # stays open while paging through the saved recipes
 st.markdown("</div>", unsafe_allow_html=True)
+if st.session_state.get("show_saved_recipes"):
+    display_saved_recipes()
 
 # ------------------ Navigation button to Calories Tracker -----------------------------------
 st.markdown('<p class="subtitle">Go to Calories Tracker to manage your daily nutrition based on your goal!</p>', unsafe_allow_html=True)
@@ -449,4 +446,7 @@ st.markdown('<div class="active-button">', unsafe_allow_html=True)
 if st.button("📊 Go to Calories Tracker"):      # option to go to calories tracker page
     st.switch_page("pages/Calories Tracker.py")
 
+# ------------------ Profile of this run (only with NUTRI_PROFILE) ---------------------------
+render_page_profile(page_profile)
+
 # Code developed with the help of ChatGPT and Copilot.
\ No newline at end of file
@@ -1,39 +1,28 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import json
 import os
-import matplotlib.pyplot as plt
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor  #für Machine Learning
+from utils.lazy import lazy_import
+from utils.instrumentation import set_page, timed
+from utils.memory import track_session
+from utils.profiler import render_page_profile, start_page_profile
+from utils.forecast import forecast_weights
+from utils.health_import import HealthImportError, import_apple_health
+from utils.charts import composition_bar_chart, composition_pie_chart, recent_entries_chart, weight_forecast_chart
+from utils.session import get_profile_id
+from utils.storage import BODY_COMP_FILE as BODY_COMP_NAME, PROFILE_FILE as PROFILE_NAME, WEIGHT_FILE, atomic_path, read_json, user_file, user_lock
+from utils.theme import apply_theme
+
+# Schwere Bibliotheken erst beim ersten Gebrauch importieren (utils/lazy.py):
+# scikit-learn und numpy werden nur für die Gewichtsprognose ab 5 Einträgen gebraucht (utils/forecast.py)
+pd = lazy_import("pandas")
 
 active_page = "Data Visualization"  # Aktive Seite für die Navigation
+set_page("data_visualization")  # Zeitmessungen dieser Seite zuordnen (utils/instrumentation.py)
+track_session("data_visualization")  # Speicher der Session messen (utils/memory.py)
+page_profile = start_page_profile("data_visualization")  # Profiler, nur mit NUTRI_PROFILE (utils/profiler.py)
 
-# CSS für gleiches Button-Styling
-st.markdown(f"""
-    <style>
-        .nav-container {{
-            display: flex;
-            justify-content: center;
-            gap: 2rem; /* This defines the spacing between the buttons */
-            margin-top: 1rem;
-            margin-bottom: 1rem;
-        }}
-        .stButton > button {{
-            background-color: #388e3c !important;
-            color: white !important;
-            font-weight: bold !important;
-            border-radius: 8px !important;
-            padding: 0.5rem 1.2rem !important;
-            border: none !important;
-        }}
-        .active-button > button {{
-            background-color: white !important;
-            color: #388e3c !important;
-            border: 2px solid #388e3c !important;
-        }}
-    </style>
-""", unsafe_allow_html=True)
+# Styles (utils/theme.py, ressources/theme/data_visualization.css)
+apply_theme("data_visualization")
 
 # Navigation zentriert mit switch_page
 st.markdown('<div class="nav-container">', unsafe_allow_html=True)
@@ -95,32 +84,17 @@ st.markdown("""
 # === HORIZONTALE LINIE ===
 st.markdown("<hr style='border: none; border-top: 1px solid #a9c4ab;'>", unsafe_allow_html=True)
 
-# === BACKGROUND COLOR ===
-def set_background_color(color):
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background-color: {color};
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-set_background_color("#d4f4dd")  # Light green background
-
-# File paths
-DATA_FILE = "ressources/weight_data.csv"
-PROFILE_FILE = "ressources/profile_data.json"
-BODY_COMP_FILE = "ressources/body_composition.json"
+# File paths (Ordner des aktuellen Benutzers)
+profile_id = get_profile_id()
+DATA_FILE = user_file(profile_id, WEIGHT_FILE)
+PROFILE_FILE = user_file(profile_id, PROFILE_NAME)
+BODY_COMP_FILE = user_file(profile_id, BODY_COMP_NAME)
 
 # === PROFILE IMPORT BLOCK (immer importieren) ===
 imported_msg = None  # Zum Anzeigen oben
 
 if os.path.exists(PROFILE_FILE):
-    with open(PROFILE_FILE, "r") as f:
-        profile = json.load(f)
+    profile = read_json(PROFILE_FILE, {})
 
     if "weight" in profile and "date" in profile:
         init_entry = pd.DataFrame([{
@@ -128,13 +102,15 @@ if os.path.exists(PROFILE_FILE):
             "Weight": profile["weight"]
         }])
 
-        if os.path.exists(DATA_FILE):
-            df_existing = pd.read_csv(DATA_FILE)
-            df_combined = pd.concat([init_entry, df_existing], ignore_index=True)
-            df_combined = df_combined.drop_duplicates(subset=["Date"], keep="first")
-            df_combined.to_csv(DATA_FILE, index=False)
-        else:
-            init_entry.to_csv(DATA_FILE, index=False)
+        with user_lock(profile_id):
+            if os.path.exists(DATA_FILE):
+                df_existing = pd.read_csv(DATA_FILE)
+                df_combined = pd.concat([init_entry, df_existing], ignore_index=True)
+                df_combined = df_combined.drop_duplicates(subset=["Date"], keep="first")
+            else:
+                df_combined = init_entry
+            with timed("write_weights_csv"), atomic_path(DATA_FILE) as tmp_path:
+                df_combined.to_csv(tmp_path, index=False)
 
         imported_msg = f"✅ Initial weight ({profile['weight']} kg on {profile['date']}) imported from profile!"
 
@@ -142,6 +118,30 @@ if os.path.exists(PROFILE_FILE):
 if imported_msg:
     st.success(imported_msg)
 
+# === IMPORT AUS APPLE HEALTH (utils/health_import.py, vor dem Laden der Daten weiter unten) ===
+with st.expander("📲 Import weight and body fat from Apple Health"):
+    st.markdown("""
+        <p style='text-align: center;'>In the Health app on your iPhone tap your profile picture, then
+        <b>Export All Health Data</b>, and upload the export.zip here. The weight and body fat of your scale are
+        added to your history, one measurement per day.</p>
+    """, unsafe_allow_html=True)
+    health_file = st.file_uploader("Apple Health export", type=["zip", "xml"], key="health_import_file")
+    st.caption("Exports above the upload limit: python -m utils.health_import <profile id> export.zip")
+    if health_file is not None and st.button("📥 Import Measurements", key="health_import"):
+        health_bar = st.progress(0.0, text="Reading the export ...")
+
+        def show_health_progress(stats):
+            share = stats["bytes_read"] / stats["total_bytes"] if stats["bytes_read"] and stats["total_bytes"] else 0.0
+            health_bar.progress(min(share, 1.0), text=f"{stats['records']:,} records read, {stats['measurements']} measurements")
+
+        try:
+            health_stats = import_apple_health(profile_id, health_file, progress=show_health_progress)
+        except HealthImportError as e:
+            st.error(str(e))
+        else:
+            st.success(f"✅ Imported {health_stats['weight_days']} days of weight and "
+                       f"{health_stats['body_fat_days']} days of body fat.")
+
 # Title for Enter Weights
 st.markdown("""
     <div style='margin-top: 70px;'></div>
@@ -150,8 +150,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Save/load helpers
+@timed("write_weights_csv")
 def save_data(df):
-    df.to_csv(DATA_FILE, index=False)
+    with user_lock(profile_id), atomic_path(DATA_FILE) as tmp_path:
+        df.to_csv(tmp_path, index=False)
 
 def load_data():
     try:
@@ -159,8 +161,10 @@ def load_data():
     except FileNotFoundError:
         return pd.DataFrame(columns=["Date", "Weight"])
 
+@timed("write_body_composition")
 def save_body_composition(df):
-    df.to_json(BODY_COMP_FILE, orient="records")
+    with user_lock(profile_id), atomic_path(BODY_COMP_FILE) as tmp_path:
+        df.to_json(tmp_path, orient="records")
 
 def load_body_composition():
     try:
@@ -239,74 +243,28 @@ if len(df) >= 5:
 
     forecast_days = st.slider("Forecast range (days)", min_value=7, max_value=30, value=30, step=1)
 
-    # === Datenaufbereitung ===
-    # 🟢 1. Datenvorbereitung: Es werden Features aus den letzten 3 Einträgen berechnet:
-#    - Weight_lag1, lag2, lag3: Die letzten drei Gewichtseinträge
-#    - Weight_avg: Durchschnitt der drei Werte
-#    - Weight_std: Standardabweichung der drei Werte (Schwankung)
-#    - Weight_delta: Veränderung zwischen den letzten zwei Einträgen
-    df_ml = df.copy()
-    df_ml["Weight_lag1"] = df_ml["Weight"].shift(1)
-    df_ml["Weight_lag2"] = df_ml["Weight"].shift(2)
-    df_ml["Weight_lag3"] = df_ml["Weight"].shift(3)
-    df_ml["Weight_avg"] = df_ml[["Weight_lag1", "Weight_lag2", "Weight_lag3"]].mean(axis=1)
-    df_ml["Weight_std"] = df_ml[["Weight_lag1", "Weight_lag2", "Weight_lag3"]].std(axis=1)
-    df_ml["Weight_delta"] = df_ml["Weight_lag1"] - df_ml["Weight_lag2"]
-    df_ml = df_ml.dropna()
-
-    # === Modelltraining ===
-    # 🟢 2. Training des Random Forest Regressors
-#    - Das Modell lernt aus dem Zusammenhang der oben berechneten Merkmale (X) und dem tatsächlichen Gewicht (y)
-#    - Random Forest kombiniert viele Entscheidungsbäume für robuste Vorhersagen
-    X = df_ml[["Weight_lag1", "Weight_lag2", "Weight_lag3", "Weight_avg", "Weight_std", "Weight_delta"]]
-    y = df_ml["Weight"]
-
-    model = RandomForestRegressor(n_estimators=200, random_state=50)
-    model.fit(X, y)
-
-# 🟢 3. Forecast: Auf Basis der letzten 3 bekannten Werte wird iterativ ein Gewicht pro Tag vorhergesagt
-#    - Nach jeder Vorhersage werden die Werte verschoben, sodass immer 3 neue aktuelle Gewichte als Input dienen
-#    - Es wird zusätzlich ein kleiner zufälliger Rauschwert (Noise) hinzugefügt, um unrealistische Glättung zu vermeiden
-# 🟢 Um realistischere Ergebnisse zu erzielen, wird dem Vorhersagewert bei jeder Iteration ein kleiner Zufallswert (sogenannter "Noise") hinzugefügt.
-#    Dies hat mehrere Vorteile: Zum einen verhindert es, dass der Random Forest bei ähnlichen Eingabewerten immer exakt denselben Ausgabewert liefert –
-#    was zu einer unnatürlich flachen und gleichförmigen Gewichtskurve führen würde. Zum anderen spiegelt der Noise die typischen natürlichen Gewichtsschwankungen
-#    im Alltag wider, etwa durch Wasserhaushalt oder Essgewohnheiten. Der verwendete Zufallswert folgt einer Normalverteilung mit einem Mittelwert von 0
-#    und einer Standardabweichung von 0.25 kg, was einer realistischen täglichen Gewichtsdynamik entspricht. Besonders bei iterativen Prognosen – also wenn
-#    die Vorhersage des einen Tages zur Grundlage für die nächste wird – sorgt dieser kleine Noise dafür, dass sich die Werte realitätsnah entwickeln
-#    und nicht in eine künstliche Konstanz abgleiten.
-    last_known_w1 = df["Weight"].iloc[-1]
-    last_known_w2 = df["Weight"].iloc[-2] if len(df) >= 2 else last_known_w1
-    last_known_w3 = df["Weight"].iloc[-3] if len(df) >= 3 else last_known_w2
-    predictions = []
-
-    for _ in range(forecast_days):
-        avg = np.mean([last_known_w1, last_known_w2, last_known_w3])
-        std = np.std([last_known_w1, last_known_w2, last_known_w3])
-        delta = last_known_w1 - last_known_w2
-        features = [[last_known_w1, last_known_w2, last_known_w3, avg, std, delta]]
-        next_pred = model.predict(features)[0] + np.random.normal(0, 0.25)  # Noise einfügen
-        predictions.append(next_pred)
-        last_known_w3, last_known_w2, last_known_w1 = last_known_w2, last_known_w1, next_pred
+    # === Datenaufbereitung, Modelltraining und Forecast (utils/forecast.py) ===
+    # 🟢 Random Forest auf den letzten 3 Einträgen (Durchschnitt, Schwankung, Trend), plus etwas Noise pro Tag.
+    # 🟢 Das Modell wird pro Gewichtsreihe nur einmal trainiert, ein anderer Prognosezeitraum verwendet es wieder.
+    predictions = forecast_weights(df["Weight"].tolist(), forecast_days)
 
     # === Forecast anzeigen ===
     # 🟢 4. Ergebnisanzeige:
 #    - Ein Liniendiagramm zeigt den bisherigen Verlauf sowie die Prognose (dargestellt mit gestrichelter Linie)
 #    - Zusätzlich können alle Prognosewerte in einer Tabelle angezeigt werden
-    max_date = pd.to_datetime(df["Date"].max(), errors="coerce")
+    # 🟢 Datumswerte wie "2025-05-15" und "2025-05-15 00:00:00" auf den Tag kürzen, nicht lesbare Zeilen weglassen
+    dates = pd.to_datetime(df["Date"].astype(str).str[:10], errors="coerce")
+    valid = dates.notna()
+    max_date = dates[valid].max() if valid.any() else pd.NaT
     if pd.notna(max_date):
         future_dates = pd.date_range(max_date + pd.Timedelta(days=1), periods=forecast_days)
         forecast_df = pd.DataFrame({"Date": future_dates, "Predicted Weight": predictions})
 
         st.markdown(f"📅 **{forecast_days}-Day Weight Forecast**")
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.plot(pd.to_datetime(df["Date"], errors="coerce"), df["Weight"], label="Actual Weight", marker='o')
-        ax.plot(forecast_df["Date"], forecast_df["Predicted Weight"], label="Forecast", linestyle='--', marker='x', color='orange')
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Weight (kg)")
-        ax.set_title(f"Weight Forecast (Next {forecast_days} Days)")
-        ax.legend()
-        ax.grid(True)
-        st.pyplot(fig)
+        forecast_png = weight_forecast_chart(
+            tuple(dates[valid].dt.strftime("%Y-%m-%d")), tuple(df.loc[valid, "Weight"]),
+            tuple(forecast_df["Date"].dt.strftime("%Y-%m-%d")), tuple(forecast_df["Predicted Weight"]), forecast_days)
+        st.image(forecast_png, use_container_width=True)
 
         if len(df) < 30:
             st.info("ℹ️ Your prediction may be unstable. For more accurate forecasts, it's recommended to have at least 30 data entries.")
@@ -363,15 +321,12 @@ if st.button("📄 Save Today's Entry", key="main_save_btn"):
     bf, mm, wc = latest["Body Fat"], latest["Muscle Mass"], latest["Water Content"]
     other = max(0, 100 - (bf + mm + wc))
 
-    labels = ['Body Fat', 'Muscle Mass', 'Water Content', 'Other']
-    values = [bf, mm, wc, other]
-    colors = ['#f4a261', '#2a9d8f', '#264653', '#cccccc']
+    labels = ('Body Fat', 'Muscle Mass', 'Water Content', 'Other')
+    values = (bf, mm, wc, other)
+    colors = ('#f4a261', '#2a9d8f', '#264653', '#cccccc')
 
     st.markdown("<h3 style='text-align: center;'>🧭 Composition Breakdown</h3>", unsafe_allow_html=True)
-    fig1, ax1 = plt.subplots()
-    ax1.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
-    ax1.axis("equal")
-    st.pyplot(fig1)
+    st.image(composition_pie_chart(labels, values, colors), use_container_width=True)
 
     st.markdown("""
 <p style='text-align: center; font-size: 0.95em; color: #444;'>
@@ -382,22 +337,8 @@ This may include bones, organs, and other tissues. If your input values do not a
 """, unsafe_allow_html=True)
 
     st.markdown("<h3 style='text-align: center;'>📊 Single Entry Overview</h3>", unsafe_allow_html=True)
-    fig_bar, ax_bar = plt.subplots()
-    categories = ['Body Fat', 'Muscle Mass', 'Water Content']
-    values = [bf, mm, wc]
-    bars = ax_bar.bar(categories, values, color=colors[:3])
-    ax_bar.set_ylabel("Percentage")
-
-    # Add value annotations on top of the bars
-    for bar in bars:
-        height = bar.get_height()
-        ax_bar.annotate(f'{height:.1f}%', 
-                        xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3),  # Offset text by 3 points above the bar
-                        textcoords="offset points",
-                        ha='center', va='bottom')
-
-    st.pyplot(fig_bar)
+    categories = ('Body Fat', 'Muscle Mass', 'Water Content')
+    st.image(composition_bar_chart(categories, (bf, mm, wc), colors[:3]), use_container_width=True)
 
 # === MEHRERE EINTRÄGE MÖGLICH NACH DER ERSTEN EINGABE ===
 st.markdown("<div style='margin-top: 50px;'></div>", unsafe_allow_html=True)
@@ -437,33 +378,9 @@ if len(comp_df) > 1:
     """, unsafe_allow_html=True)
 
     last_entries = comp_df.sort_values("Date").tail(3)
-    dates = last_entries["Date"].astype(str).tolist()
-    x = np.arange(len(dates))
-    bar_width = 0.25
-
-    fig2, ax2 = plt.subplots()
-    bars_bf = ax2.bar(x - bar_width, last_entries["Body Fat"], width=bar_width, label="Body Fat", color="#f4a261")
-    bars_mm = ax2.bar(x, last_entries["Muscle Mass"], width=bar_width, label="Muscle Mass", color="#2a9d8f")
-    bars_wc = ax2.bar(x + bar_width, last_entries["Water Content"], width=bar_width, label="Water Content", color="#264653")
-
-    ax2.set_xlabel("Date")
-    ax2.set_ylabel("Percentage")
-    ax2.set_title("Recent Body Composition Entries")
-    ax2.set_xticks(x)
-    ax2.set_xticklabels(dates)
-    ax2.legend()
-
-    # Add value annotations on top of the bars
-    for bars in [bars_bf, bars_mm, bars_wc]:
-        for bar in bars:
-            height = bar.get_height()
-            ax2.annotate(f'{height:.1f}%', 
-                         xy=(bar.get_x() + bar.get_width() / 2, height),
-                         xytext=(0, 3),  # Offset text by 3 points above the bar
-                         textcoords="offset points",
-                         ha='center', va='bottom')
-
-    st.pyplot(fig2)
+    dates = tuple(last_entries["Date"].astype(str))
+    chart_png = recent_entries_chart(dates, tuple(last_entries["Body Fat"]), tuple(last_entries["Muscle Mass"]), tuple(last_entries["Water Content"]))
+    st.image(chart_png, use_container_width=True)
 
 # === MANUELLER VERGLEICH AB 2 EINTRÄGEN ===
 if len(comp_df) >= 2:
@@ -490,4 +407,7 @@ if len(comp_df) >= 2:
 
         st.dataframe(comparison_df, use_container_width=True)
 
+# === PROFIL DIESES DURCHLAUFS (nur mit NUTRI_PROFILE) ===
+render_page_profile(page_profile)
+
 # Code developed with the help of ChatGPT and Copilot.
\ No newline at end of file
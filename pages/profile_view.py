@@ -1,37 +1,24 @@
 import streamlit as st
 import datetime
-import json
 import os
+from utils.exporter import FORMATS, INLINE_EXPORT_BYTES, available_formats, export_bytes, export_file_name, export_to_static
+from utils.importer import HistoryImportError, import_meals
+from utils.instrumentation import set_page
+from utils.memory import track_session
+from utils.session import get_profile_id
+from utils.storage import PROFILE_FILE, read_json, user_file, user_lock, write_json
+from utils.targets import daily_targets
+from utils.theme import apply_theme
 # === Seitenkonfiguration muss als Erstes kommen ===
 st.set_page_config(page_title="Your Profile", layout="centered")
 
+set_page("profile_view")
+track_session("profile_view")
+
 active_page = "Profile"  # ⚠️ <- hier anpassen: z. B. "Visual Data", "Recipes", "Calories"
 
-# CSS für gleiches Button-Styling
-st.markdown(f"""
-    <style>
-        .nav-container {{
-            display: flex;
-            justify-content: center;
-            gap: 1.2rem;
-            margin-top: 1rem;
-            margin-bottom: 1rem;
-        }}
-        .stButton > button {{
-            background-color: #388e3c !important;
-            color: white !important;
-            font-weight: bold !important;
-            border-radius: 8px !important;
-            padding: 0.5rem 1.2rem !important;
-            border: none !important;
-        }}
-        .active-button > button {{
-            background-color: white !important;
-            color: #388e3c !important;
-            border: 2px solid #388e3c !important;
-        }}
-    </style>
-""", unsafe_allow_html=True)
+# Styles (utils/theme.py, ressources/theme/profile_view.css)
+apply_theme("profile_view", "no_sidebar")
 
 # Navigation zentriert mit switch_page
 st.markdown('<div class="nav-container">', unsafe_allow_html=True)
@@ -76,43 +63,6 @@ with col4:
 st.markdown("</div>", unsafe_allow_html=True)
 
 
-# Stildefinitionen
-st.markdown("""
-    <style>
-        .stApp { background-color: #d4edda; }
-        h1, h2, h3, p, label, .stMetricValue, .stMetricLabel { color: black; }
-        .stButton>button { background-color: #388e3c; color: white; border-radius: 8px; }
-        .section-box {
-            background-color: #ffffffcc;
-            padding: 25px;
-            margin-top: 40px;
-            border-radius: 10px;
-            border: 1px solid #388e3c;
-            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.05);
-        }
-        .section-title {
-            text-align: center;
-            margin-bottom: 20px;
-        }
-        .main-title {
-            text-align: center;
-            margin-top: 0;
-            margin-bottom: 10px;
-            font-size: 40px;
-        }
-        .subtitle {
-            text-align: center;
-            font-size: 18px;
-            margin-bottom: 20px;
-        }
-        hr.centered {
-            border: 1px solid black;
-            width: 80%;
-            margin: auto;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
 # Begrüßung
 st.markdown("""
     <div class='main-title'>🌟 Welcome to Your Nutri Dashboard 🌟</div>
@@ -120,10 +70,11 @@ st.markdown("""
     <hr class='centered'>
 """, unsafe_allow_html=True)
 
-# gespeicherte Profildaten laden
-if os.path.exists("ressources/profile_data.json"):
-    with open("ressources/profile_data.json", "r") as f:
-        profile_data = json.load(f)
+# gespeicherte Profildaten laden (aus dem Ordner des aktuellen Benutzers)
+profile_id = get_profile_id()
+profile_path = user_file(profile_id, PROFILE_FILE)
+if os.path.exists(profile_path):
+    profile_data = read_json(profile_path, {})
 else:
     st.error("No profile data found. Please create your profile first.")
     st.stop()
@@ -147,6 +98,20 @@ with st.container():
         st.metric("Diet", profile_data.get("diet", "N/A"))
     st.markdown("</div>", unsafe_allow_html=True)
 
+# Tägliche Zielwerte (utils/targets.py, neu berechnet sobald sich das Profil ändert)
+targets = daily_targets(profile_id)
+st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
+st.markdown("<h2 class='section-title'>🎯 Your Daily Targets</h2>", unsafe_allow_html=True)
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Calories", f"{targets['calories']} kcal")
+col2.metric("Protein", f"{targets['protein']} g")
+col3.metric("Carbs", f"{targets['carbs']} g")
+col4.metric("Fat", f"{targets['fat']} g")
+if targets["personalized"]:
+    st.caption(f"Based on your BMR of {targets['bmr']} kcal and a daily energy need of {targets['tdee']} kcal (Mifflin-St Jeor), adjusted for your goal.")
+else:
+    st.caption("Standard values for your goal. Log your weight below to get targets calculated for you.")
+
 
 
 st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
@@ -168,8 +133,8 @@ with st.container():
     if st.button("Log Weight"):
         profile_data["weight"] = float(weight)
         profile_data["date"] = str(date)
-        with open("ressources/profile_data.json", "w") as f:
-            json.dump(profile_data, f)
+        with user_lock(profile_id):
+            write_json(profile_path, profile_data)
         st.success(f"Weight of {weight} kg logged for {date}.")
 
 # Gewichtsanalyse Navigation direkt dort hin
@@ -200,7 +165,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
 with st.container():
-    height = st.number_input("Your Height (m)", min_value=1.0, max_value=2.5, step=0.01)
+    saved_height = (profile_data.get("height") or 0) / 100
+    height = st.number_input("Your Height (m)", min_value=1.0, max_value=2.5, step=0.01,
+                             value=saved_height if 1.0 <= saved_height <= 2.5 else 1.0)
     weight_bmi = st.number_input("Your Weight (kg)", min_value=30.0, max_value=200.0, step=0.5, key="bmi_weight")
 
     if height > 0 and weight_bmi > 0:
@@ -217,18 +184,84 @@ with st.container():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
-# Footer
+st.markdown("<div style='margin-top: 80px;'></div>", unsafe_allow_html=True)
+# Import der Mahlzeiten aus anderen Trackern (utils/importer.py, liest die Datei in Blöcken)
+st.markdown("<h2 class='section-title'>📥 Import Meal History</h2>", unsafe_allow_html=True)
 st.markdown("""
-    <p style='text-align: center; font-size: 14px; color: black;'>Made with ❤️ by Team Nutri • 2025</p>
+    <p style='text-align: center; font-size: 16px; color: black;'>
+        Coming from another tracker? Upload its CSV or JSON export and your meals appear in the calendar.<br>
+        Rows without calories are looked up in the USDA database.
+    </p>
+""", unsafe_allow_html=True)
+with st.container():
+    upload = st.file_uploader("Export file", type=["csv", "json", "jsonl"], key="history_import_file")
+    st.caption("Columns are recognised by name: Date, Meal (Breakfast, Lunch, Dinner, Snack), Food, Quantity (g), "
+               "Calories, Protein, Fat, Carbohydrates. Very large files: python -m utils.importer <profile id> <file>")
+    if upload is not None and st.button("Import Meals", key="history_import"):
+        bar = st.progress(0.0, text="Importing ...")
+
+        def show_progress(stats):
+            share = stats["bytes_read"] / stats["total_bytes"] if stats["bytes_read"] and stats["total_bytes"] else 0.0
+            bar.progress(min(share, 1.0), text=f"{stats['rows']} rows read, {stats['imported']} meals imported")
+
+        try:
+            stats = import_meals(profile_id, upload, progress=show_progress)
+        except HistoryImportError as e:
+            st.error(str(e))
+        else:
+            st.success(f"{stats['imported']} meals imported from {stats['rows']} rows.")
+            if stats["skipped"]:
+                st.warning(f"{stats['skipped']} rows could not be imported.")
+                with st.expander("Details"):
+                    for message in stats["errors"]:
+                        st.write(message)
+
+
+st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
+# Export (utils/exporter.py). Mit Static Serving wird die Datei stückweise nach static/exports/ geschrieben und
+# verlinkt, sie liegt also nie ganz im Speicher. Ohne bleibt nur st.download_button (ganze Datei im Speicher),
+# daher nur bis INLINE_EXPORT_BYTES; größere Exporte laufen über den gestreamten Export der REST API (api.py).
+st.markdown("<h2 class='section-title'>📤 Export Your Data</h2>", unsafe_allow_html=True)
+st.markdown("""
+    <p style='text-align: center; font-size: 16px; color: black;'>
+        Download your meals, weights or body composition, e.g. for a spreadsheet or another app.
+    </p>
 """, unsafe_allow_html=True)
+EXPORT_DATASETS = {"Meals": "meals", "Weights": "weights", "Body Composition": "body_composition"}
+with st.container():
+    col1, col2 = st.columns(2)
+    with col1:
+        export_dataset = st.selectbox("Data", list(EXPORT_DATASETS), key="export_dataset")
+    with col2:
+        export_format = st.selectbox("Format", available_formats(), format_func=str.upper, key="export_format")
+    export_start = export_end = None
+    if st.checkbox("Only a date range", key="export_limit"):
+        col1, col2 = st.columns(2)
+        with col1:
+            export_start = st.date_input("From", datetime.date.today() - datetime.timedelta(days=30), key="export_from").isoformat()
+        with col2:
+            export_end = st.date_input("To", datetime.date.today(), key="export_to").isoformat()
+
+    if st.button("Prepare Export", key="export_prepare"):
+        dataset = EXPORT_DATASETS[export_dataset]
+        file_name = export_file_name(dataset, export_format, export_start, export_end)
+        if st.get_option("server.enableStaticServing"):
+            url, size = export_to_static(profile_id, dataset, export_format, export_start, export_end)
+            st.markdown(f"<p style='text-align: center;'><a href='{url}' download='{file_name}'>"
+                        f"⬇️ Download {file_name} ({size / 1024:,.0f} KB)</a></p>", unsafe_allow_html=True)
+        else:
+            data = export_bytes(profile_id, dataset, export_format, export_start, export_end)
+            if data is None:
+                st.warning(f"This export is larger than {INLINE_EXPORT_BYTES // (1024 * 1024)} MB. Use the streamed "
+                           f"export of the REST API: GET /users/{profile_id or '<profile_id>'}/export/{dataset} "
+                           "(see api.py), or choose a date range.")
+            else:
+                st.download_button(f"⬇️ Download ({len(data) / 1024:,.0f} KB)", data, file_name=file_name,
+                                   mime=FORMATS[export_format][0], key="export_download")
 
-# Sidebar ausblenden
+# Footer
 st.markdown("""
-    <style>
-        [data-testid="stSidebar"] {
-            display: none;
-        }
-    </style>
+    <p style='text-align: center; font-size: 14px; color: black;'>Made with ❤️ by Team Nutri • 2025</p>
 """, unsafe_allow_html=True)
 
 st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
@@ -237,36 +270,6 @@ st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
 st.markdown("<hr>", unsafe_allow_html=True)
 st.markdown("<h3 style='text-align: center;'>🧭 Dashboard Navigation</h3>", unsafe_allow_html=True)
 
-# Custom CSS für Buttons + Text
-st.markdown("""
-    <style>
-        .dashboard-block {
-            text-align: left; /* Align content to the left */
-        }
-        .dashboard-button {
-            padding: 16px 40px;
-            font-size: 20px;
-            font-weight: bold;
-            background-color: #388e3c;
-            color: white;
-            border: none;
-            border-radius: 10px;
-            cursor: pointer;
-            display: inline-block;
-            margin: auto;
-        }
-        .dashboard-button:hover {
-            background-color: #2e7d32;
-        }
-        .dashboard-desc {
-            font-size: 17px;
-            margin-top: 12px;
-            color: #333333;
-            text-align: left; /* Align text to the left */
-        }
-    </style>
-""", unsafe_allow_html=True)
-
 # Drei Spalten
 col1, col2, col3 = st.columns(3)
 
@@ -1,17 +1,20 @@
 import streamlit as st
+import datetime
 import time
-import json
-import os
+from utils.instrumentation import set_page
+from utils.memory import track_session
+from utils.session import get_profile_id, set_profile_id
+from utils.storage import PROFILE_FILE, new_profile_id, user_file, user_lock, write_json
+from utils.targets import ACTIVITY_LEVELS, DEFAULT_ACTIVITY
+from utils.theme import apply_theme
 
 # Seitenkonfiguration
 st.set_page_config(page_title="Profile Creation", layout="centered", initial_sidebar_state="collapsed")
+set_page("profilecreation")
+track_session("profilecreation")
 
-# Hintergrundfarbe
-st.markdown("""
-    <style>
-        .stApp { background-color: #a9dfbf; }
-    </style>
-""", unsafe_allow_html=True)
+# Hintergrundfarbe (ressources/theme/profile_creation.css)
+apply_theme("profile_creation")
 
 # Überschrift
 st.markdown("""
@@ -32,6 +35,12 @@ with st.form("profile_form"):
     name = st.text_input("Your Name")
     age = st.number_input("Your Age", min_value=10, max_value=120, step=1)
     gender = st.selectbox("Gender", ["Select", "Male", "Female", "Other"])
+
+    # Optional, used for the personal calorie and macro targets (utils/targets.py)
+    height = st.number_input("Your Height in cm (optional)", min_value=0, max_value=250, step=1)
+    weight = st.number_input("Your Weight in kg (optional)", min_value=0.0, max_value=300.0, step=0.5)
+    activity_options = list(ACTIVITY_LEVELS)
+    activity = st.selectbox("Activity Level", activity_options, index=activity_options.index(DEFAULT_ACTIVITY))
     
     st.markdown("<p style='color: #ffffff; font-size: 16px;'>What are your health goals?</p>", unsafe_allow_html=True)
     goal_options = ["Lose Weight", "Build Muscle", "just eat Healthier :)"]
@@ -44,17 +53,26 @@ with st.form("profile_form"):
     submitted = st.form_submit_button("Submit Profile", use_container_width=True)
 
     if submitted:
+        # Each profile gets its own id, all user data is stored in the partition of that id
+        profile_id = get_profile_id() or new_profile_id()
         profile_data = {
+            "profile_id": profile_id,
             "name": name,
             "age": age,
             "gender": gender,
             "goal": selected_goals,
-            "diet": selected_diet
+            "diet": selected_diet,
+            "height": height or None,
+            "activity": activity
         }
+        if weight:
+            profile_data["weight"] = float(weight)
+            profile_data["date"] = str(datetime.date.today())
         
-        # Speichern in eine JSON-Datei
-        with open("ressources/profile_data.json", "w") as f:
-            json.dump(profile_data, f)
+        # Speichern in eine JSON-Datei (im Ordner des Benutzers)
+        with user_lock(profile_id):
+            write_json(user_file(profile_id, PROFILE_FILE), profile_data)
+        set_profile_id(profile_id)
         
         st.success(f"Thank you, {name}! Your profile has been created.")
         st.balloons()
@@ -0,0 +1,47 @@
+# Page tests render the Streamlit pages headless with AppTest, from the repository root like "streamlit run app.py"
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Shipped sample files copied into the partition of the test user
+SAMPLE_FILES = ("profile_data.json", "calendar_recipes.json", "weight_data.csv", "body_composition.json")
+
+
+@pytest.fixture
+def page(tmp_path, monkeypatch):
+    # page("pages/x.py") -> AppTest of a user whose files are copies of the samples in ressources/, in a
+    # temporary NUTRI_USERS_DIR: the pages write to those copies and leave the working tree untouched
+    testing = pytest.importorskip("streamlit.testing.v1")
+    from utils import storage
+
+    monkeypatch.chdir(ROOT)    # pages read ressources/ relative to the working directory
+    monkeypatch.setenv("NUTRI_USERS_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    profile_id = storage.new_profile_id()
+    os.makedirs(storage.user_dir(profile_id))
+    for name in SAMPLE_FILES:
+        shutil.copy(os.path.join(ROOT, storage.RESSOURCES_DIR, name), storage.user_file(profile_id, name))
+
+    def open_page(path):
+        at = testing.AppTest.from_file(os.path.join(ROOT, path), default_timeout=120)
+        at.query_params["profile"] = profile_id
+        return at
+    return open_page
+
+
+@pytest.fixture
+def no_static_serving():
+    from streamlit import config
+
+    enabled = config.get_option("server.enableStaticServing")
+    config.set_option("server.enableStaticServing", False)
+    yield
+    config.set_option("server.enableStaticServing", enabled)
+
+# Code developed with the help of ChatGPT and Copilot.
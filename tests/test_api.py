@@ -0,0 +1,59 @@
+# REST API handlers (api.py) called directly, on a temporary users directory.
+import asyncio
+
+import pytest
+
+import api
+from utils import food_api, storage
+
+WEIGHTS_CSV = "Date,Weight\n2025-05-01,80\n2025-05-02 00:00:00,79.5\nbroken,79\n2025-05-04,79.2\n2025-05-05,79\n2025-05-06,78.8\n"
+
+
+@pytest.fixture
+def profile_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    profile_id = storage.new_profile_id()
+    storage.write_json(storage.user_file(profile_id, storage.PROFILE_FILE), {})
+    with open(storage.user_file(profile_id, storage.WEIGHT_FILE), "w") as f:
+        f.write(WEIGHTS_CSV)
+    return profile_id
+
+
+def test_weights_skip_rows_with_broken_dates(profile_id):
+    status, payload = asyncio.run(api.get_weights({}, {}, profile_id))
+    assert status == 200
+    assert [row["date"] for row in payload["weights"]] == ["2025-05-01", "2025-05-02", "2025-05-04", "2025-05-05",
+                                                           "2025-05-06"]
+
+
+def test_forecast_with_a_broken_date_row(profile_id):
+    status, payload = asyncio.run(api.forecast({"days": "3"}, {}, profile_id))
+    assert status == 200
+    assert [row["date"] for row in payload["forecast"]] == ["2025-05-07", "2025-05-08", "2025-05-09"]
+
+
+def test_day_and_totals_of_an_empty_history(profile_id):
+    assert asyncio.run(api.list_day({}, {}, profile_id, "2025-05-01")) == (200, {"date": "2025-05-01", "entries": []})
+    status, payload = asyncio.run(api.totals({"from": "2025-05-01", "to": "2025-05-02"}, {}, profile_id))
+    assert status == 200 and len(payload["days"]) == 2
+
+
+def test_invalid_usda_json_is_a_bad_gateway(profile_id, monkeypatch):
+    class Response:
+        status_code = 200
+
+        def json(self):
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+    class Session:
+        def get(self, *args, **kwargs):
+            return Response()
+
+    monkeypatch.setenv("API_KEY_USDA", "test")
+    monkeypatch.setattr(food_api, "async_http_client", lambda: None)
+    monkeypatch.setattr(food_api, "http_session", Session)
+    with pytest.raises(api.ApiError) as error:
+        asyncio.run(api.log_food({}, {"date": "2025-05-01", "category": "Lunch", "query": "not json"}, profile_id))
+    assert error.value.status == 502 and error.value.message == "USDA API returned invalid JSON"
+
+# Code developed with the help of ChatGPT and Copilot.
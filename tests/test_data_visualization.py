@@ -0,0 +1,20 @@
+# The Visual Data page against a copy of the weight_data.csv shipped in ressources/ (mixed "2025-05-15" and
+# "2025-05-15 00:00:00" dates), which once broke the forecast chart.
+
+
+def test_renders_forecast_with_shipped_weights(page):
+    at = page("pages/data_visualization.py").run()
+    assert not at.exception
+    assert any(subheader.value == "🤖 Weight Forecast" for subheader in at.subheader)
+
+
+def test_rerun_reuses_the_cached_forecast_chart(page):
+    from utils.charts import weight_forecast_chart
+
+    at = page("pages/data_visualization.py").run()
+    misses = weight_forecast_chart.cache_info().misses
+    at.run()
+    assert not at.exception
+    assert weight_forecast_chart.cache_info().misses == misses
+
+# Code developed with the help of ChatGPT and Copilot.
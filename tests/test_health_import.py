@@ -0,0 +1,37 @@
+# Apple Health import (utils/health_import.py) of a small export.xml, in batches of two days.
+import io
+
+import pytest
+
+from utils import health_import, storage
+from utils.weights import load_weights
+
+
+@pytest.fixture
+def profile_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    monkeypatch.setattr(health_import, "BATCH_DAYS", 2)
+    return storage.new_profile_id()
+
+
+def _export(*weights):
+    records = "".join(f' <Record type="{health_import.BODY_MASS}" unit="kg" startDate="{start}" value="{value}"/>\n'
+                      for start, value in weights)
+    return io.BytesIO(f'<?xml version="1.0"?>\n<HealthData locale="en_US">\n{records}</HealthData>\n'.encode())
+
+
+def test_days_in_several_batches_are_counted_once(profile_id):
+    stats = health_import.import_apple_health(profile_id, _export(
+        ("2024-05-01 07:00:00 +0200", 80), ("2024-05-02 07:00:00 +0200", 79.8),
+        ("2024-05-01 09:00:00 +0200", 80.2), ("2024-05-03 07:00:00 +0200", 79.6)))
+    assert stats["weight_days"] == 3
+    assert load_weights(profile_id) == [("2024-05-01", 80.2), ("2024-05-02", 79.8), ("2024-05-03", 79.6)]
+
+
+def test_latest_measurement_of_a_day_respects_the_utc_offset(profile_id):
+    # 07:30 at -0100 is 08:30 UTC, later than 08:00 at +0200 (06:00 UTC)
+    health_import.import_apple_health(profile_id, _export(
+        ("2024-05-01 07:30:00 -0100", 81), ("2024-05-01 08:00:00 +0200", 80)))
+    assert load_weights(profile_id) == [("2024-05-01", 81.0)]
+
+# Code developed with the help of ChatGPT and Copilot.
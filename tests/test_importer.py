@@ -0,0 +1,33 @@
+# Meal history import (utils/importer.py) with USDA searches replaced by a local table.
+import io
+
+import pytest
+
+from utils import importer, storage
+from utils.food_api import Food
+from utils.meal_store import iter_entries
+
+
+@pytest.fixture
+def profile_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    def search_foods(name):
+        return [Food(name.title(), 100.0, 1.0, 1.0, 10.0)]
+
+    monkeypatch.setattr(importer, "search_foods", search_foods)
+    monkeypatch.setattr(importer, "LOOKUP_MEMO_SIZE", 3)
+    return storage.new_profile_id()
+
+
+def _csv(foods):
+    return io.BytesIO(("Date,Meal,Food\n" + "".join(f"2025-05-15,Lunch,{food}\n" for food in foods)).encode())
+
+
+def test_full_lookup_memo_keeps_the_names_of_the_chunk(profile_id):
+    # Chunks of 2 rows with a memo of 3 names: every chunk overflows the memo
+    foods = ["apple", "pear", "plum", "apple", "kiwi", "pear", "fig", "plum"]
+    stats = importer.import_meals(profile_id, _csv(foods), fmt="csv", chunk_rows=2)
+    assert stats["skipped"] == 0 and stats["imported"] == len(foods)
+    assert [entry["recipe_title"] for entry in iter_entries(profile_id)] == foods
+
+# Code developed with the help of ChatGPT and Copilot.
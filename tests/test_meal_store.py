@@ -0,0 +1,75 @@
+# Meal entry ids (utils/meal_store.py): the id index has to follow cleared, compacted and recreated logs.
+import pytest
+
+from utils import meal_store, storage
+from utils.meal_store import (append_entries, clear_history, delete_entry, get_entry, index_path, page_entries,
+                              update_entry)
+
+
+@pytest.fixture
+def profile_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    return storage.new_profile_id()
+
+
+def _entries(*dates):
+    return [{"recipe_title": f"food {i}", "selected_date": day, "meal_category": "Lunch", "nutrition": {}}
+            for i, day in enumerate(dates)]
+
+
+def _lines(profile_id):
+    with open(index_path(profile_id)) as f:
+        return [line for line in f if not line.startswith("#")]
+
+
+def test_cleared_history_forgets_the_cached_index(profile_id):
+    first = _entries("2025-05-01")
+    append_entries(profile_id, first)
+    assert get_entry(profile_id, first[0]["id"])
+    clear_history(profile_id)
+    second = _entries("2025-06-01")
+    append_entries(profile_id, second)
+    assert get_entry(profile_id, first[0]["id"]) is None
+    assert get_entry(profile_id, second[0]["id"])["selected_date"] == "2025-06-01"
+
+
+def test_index_is_compacted_once_most_lines_are_dead(profile_id, monkeypatch):
+    monkeypatch.setattr(meal_store, "INDEX_COMPACT_MIN_DEAD", 4)
+    entries = _entries("2025-05-01", "2025-05-02", "2025-05-03", "2025-05-04")
+    append_entries(profile_id, entries)
+    update_entry(profile_id, entries[0]["id"], {"selected_date": "2025-06-01"})
+    delete_entry(profile_id, entries[1]["id"])
+    assert len(_lines(profile_id)) == 6
+    delete_entry(profile_id, entries[2]["id"])
+    assert sorted(_lines(profile_id)) == sorted([f"{entries[0]['id']} 2025-06\n", f"{entries[3]['id']} 2025-05\n"])
+    assert get_entry(profile_id, entries[0]["id"])["selected_date"] == "2025-06-01"
+    assert get_entry(profile_id, entries[3]["id"])
+    assert get_entry(profile_id, entries[2]["id"]) is None
+
+
+def test_index_recreated_in_place_is_read_again(profile_id):
+    # Same inode and a longer file, e.g. another process rewrote it: the new generation gives it away
+    entries = _entries("2025-05-01")
+    append_entries(profile_id, entries)
+    assert get_entry(profile_id, entries[0]["id"])
+    with open(index_path(profile_id), "w") as f:
+        f.write(f"# {'0' * 32}\n{entries[0]['id']} 2025-07\n{'1' * 32} 2025-05\n")
+    assert meal_store._index(profile_id) == {entries[0]["id"]: "2025-07", "1" * 32: "2025-05"}
+
+
+def test_deleting_between_pages_neither_skips_nor_repeats(profile_id):
+    entries = _entries(*["2025-05-01"] * 3, *["2025-05-02"] * 3)
+    append_entries(profile_id, entries)
+    first, cursor = page_entries(profile_id, limit=2)
+    for entry in entries:
+        if entry not in first:
+            delete_entry(profile_id, entry["id"])
+            break
+    rest = []
+    while cursor:
+        page, cursor = page_entries(profile_id, cursor, limit=2)
+        rest.extend(page)
+    shown = [entry["id"] for entry in first + rest]
+    assert len(shown) == len(set(shown)) == len(entries) - 1
+
+# Code developed with the help of ChatGPT and Copilot.
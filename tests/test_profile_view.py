@@ -0,0 +1,47 @@
+# Export section of the profile page: "Prepare Export" has to offer a download for every dataset.
+import os
+
+import pytest
+
+from utils import exporter
+
+DATASETS = ["Meals", "Weights", "Body Composition"]
+
+
+def _prepare_export(page, dataset):
+    at = page("pages/profile_view.py").run()
+    at.selectbox(key="export_dataset").set_value(dataset).run()
+    next(button for button in at.button if button.key == "export_prepare").click().run()
+    assert not at.exception
+    return at
+
+
+@pytest.mark.parametrize("dataset", DATASETS)
+def test_prepare_export_links_a_static_file(page, dataset, tmp_path, monkeypatch):
+    exports = tmp_path / "exports"
+    monkeypatch.setattr(exporter, "EXPORTS_DIR", str(exports))
+    at = _prepare_export(page, dataset)
+    links = [md.value for md in at.markdown if "app/static/exports/" in md.value]
+    assert links and not at.get("download_button")
+    (token,) = os.listdir(exports)
+    assert f"app/static/exports/{token}/" in links[0]
+
+
+@pytest.mark.parametrize("dataset", DATASETS)
+def test_prepare_export_without_static_serving(page, dataset, no_static_serving):
+    at = _prepare_export(page, dataset)
+    assert at.get("download_button")
+
+
+def test_inline_export_is_capped(tmp_path, monkeypatch):
+    from utils import storage
+
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    profile_id = storage.new_profile_id()
+    os.makedirs(storage.user_dir(profile_id))
+    with open(storage.user_file(profile_id, storage.WEIGHT_FILE), "w") as f:
+        f.write("Date,Weight\n" + "".join(f"2025-05-{day:02d},80\n" for day in range(1, 29)))
+    assert exporter.export_bytes(profile_id, "weights", "csv", max_bytes=10) is None
+    assert exporter.export_bytes(profile_id, "weights", "csv").startswith(b"date,weight")
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,43 @@
+# Per-user locking (utils/storage.py): writers in different processes must not lose each other's updates.
+import multiprocessing
+
+import pytest
+
+from utils import storage
+from utils.meal_store import append_entry, iter_entries
+
+WRITERS = 4
+ENTRIES_PER_WRITER = 25
+
+
+@pytest.fixture
+def profile_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "USERS_DIR", str(tmp_path))
+    return storage.new_profile_id()
+
+
+def _write(profile_id, writer):
+    for i in range(ENTRIES_PER_WRITER):
+        append_entry(profile_id, {"recipe_title": f"food {writer}-{i}", "selected_date": "2025-05-15",
+                                  "meal_category": "Snack", "nutrition": {"calories": 1.0}})
+
+
+def test_writers_in_several_processes_keep_every_entry(profile_id):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_write, args=(profile_id, writer)) for writer in range(WRITERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(list(iter_entries(profile_id))) == WRITERS * ENTRIES_PER_WRITER
+
+
+def test_user_lock_is_reentrant(profile_id):
+    with storage.user_lock(profile_id):
+        with storage.user_lock(profile_id):
+            append_entry(profile_id, {"recipe_title": "Banana", "selected_date": "2025-05-15",
+                                      "meal_category": "Snack", "nutrition": {}})
+    assert len(list(iter_entries(profile_id))) == 1
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,17 @@
+# Page styles (utils/theme.py): without static serving the stylesheet is sent once per session, not per rerun.
+
+
+def test_stylesheet_is_injected_once_per_session(page, no_static_serving):
+    at = page("pages/profile_view.py").run()
+    assert len(at.get("iframe")) == 1
+    at.run()
+    assert not at.exception
+    assert not at.get("iframe")
+
+
+def test_static_serving_links_the_stylesheet(page):
+    at = page("pages/profile_view.py").run()
+    assert not at.get("iframe")
+    assert any('<link rel="stylesheet" href="app/static/css/theme.' in md.value for md in at.markdown)
+
+# Code developed with the help of ChatGPT and Copilot.
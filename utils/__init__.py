@@ -0,0 +1 @@
+# Shared helpers for the Nutri Mentor pages (storage, caching, rendering).
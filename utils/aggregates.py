@@ -0,0 +1,77 @@
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from utils.instrumentation import timed
+from utils.meal_store import adjacent_months, load_month, month_version
+
+# -------------------- PER-DAY AGGREGATES OF A MONTH --------------------
+# For every day of a month we keep the summed nutrients and the entries of that day:
+#   totals[day - 1]  -> [calories, protein, carbs, fat]
+#   entries[day - 1] -> list of meal entries
+# The month is scanned once per data version, afterwards totals and entries of any day are a list lookup.
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+NUTRITION_KEYS = ("calories", "protein", "carbohydrates", "fat")    # names used in the meal entries
+
+AGGREGATE_CACHE_SIZE = 512
+
+_cache = OrderedDict()      # (profile_id, year, month) -> (version, aggregate)
+_cache_lock = threading.Lock()
+
+
+def _build(year, month, meals):
+    days = calendar.monthrange(year, month)[1]
+    totals = [[0.0, 0.0, 0.0, 0.0] for _ in range(days)]
+    entries = [[] for _ in range(days)]
+    for meal in meals:
+        day = int(meal["selected_date"][8:10])
+        nutrition = meal.get("nutrition") or {}
+        for i, key in enumerate(NUTRITION_KEYS):
+            totals[day - 1][i] += nutrition.get(key) or 0   # recipes without nutrition info count as 0
+        entries[day - 1].append(meal)
+    return {"year": year, "month": month, "days": days, "totals": totals, "entries": entries}
+
+
+@timed("month_aggregate")
+def month_aggregate(profile_id, year, month):
+    key = (profile_id, year, month)
+    version = month_version(profile_id, year, month)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == version:
+            _cache.move_to_end(key)
+            return cached[1]
+    aggregate = _build(year, month, load_month(profile_id, year, month))
+    with _cache_lock:
+        _cache[key] = (version, aggregate)
+        _cache.move_to_end(key)
+        while len(_cache) > AGGREGATE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return aggregate
+
+
+def day_totals(profile_id, date):
+    aggregate = month_aggregate(profile_id, date.year, date.month)
+    return dict(zip(NUTRIENTS, aggregate["totals"][date.day - 1]))
+
+
+def day_entries(profile_id, date):
+    return month_aggregate(profile_id, date.year, date.month)["entries"][date.day - 1]
+
+
+def range_totals(profile_id, start, end):
+    # {"2025-05-01": {"calories": ..., ...}, ...} for every day from start to end (inclusive),
+    # one aggregate lookup per month of the range
+    totals = {}
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        aggregate = month_aggregate(profile_id, year, month)
+        for day in range(1, aggregate["days"] + 1):
+            current = date(year, month, day)
+            if start <= current <= end:
+                totals[current.isoformat()] = dict(zip(NUTRIENTS, aggregate["totals"][day - 1]))
+        _, (year, month) = adjacent_months(year, month)
+    return totals
+
+# Code developed with the help of ChatGPT and Copilot.
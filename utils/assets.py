@@ -0,0 +1,99 @@
+import base64
+import functools
+import hashlib
+import io
+import json
+import os
+
+# -------------------- STATIC ASSETS --------------------
+# Build step (run once per deployment, e.g. in the Dockerfile or before "streamlit run"):
+#   python -m utils.assets
+# It writes resized and compressed variants of the landing page images with a content hash in the file
+# name to static/assets/ plus a manifest. With static serving enabled (.streamlit/config.toml) the
+# pages reference them as normal URLs, so the browser downloads each image once and can cache it
+# instead of receiving it base64 encoded over the websocket on every rerun.
+IMAGES_DIR = "images"
+STATIC_DIR = "static"
+ASSETS_DIR = os.path.join(STATIC_DIR, "assets")
+MANIFEST_FILE = os.path.join(ASSETS_DIR, "manifest.json")
+
+# name in images/ -> largest width that is ever displayed (x2 for high resolution screens)
+ASSETS = {
+    "image.png": {"max_width": 600},          # shown as 300px profile circle
+    "Group_image.png": {"max_width": 1024},   # shown with max-width 800px
+}
+WEBP_QUALITY = 80
+
+MIME_TYPES = {".png": "image/png", ".webp": "image/webp", ".jpg": "image/jpeg"}
+
+# -------------------- BUILD --------------------
+def _compress(source_path, max_width):
+    # Returns (bytes, extension). Without Pillow the original file is used unchanged.
+    try:
+        from PIL import Image
+    except ImportError:
+        with open(source_path, "rb") as f:
+            return f.read(), os.path.splitext(source_path)[1]
+
+    with Image.open(source_path) as image:
+        if image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+        return buffer.getvalue(), ".webp"
+
+
+def build_assets():
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    manifest = {}
+    for name, options in ASSETS.items():
+        data, extension = _compress(os.path.join(IMAGES_DIR, name), options["max_width"])
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        file_name = f"{os.path.splitext(name)[0]}.{digest}{extension}"
+        with open(os.path.join(ASSETS_DIR, file_name), "wb") as f:
+            f.write(data)
+        manifest[name] = {"file": f"assets/{file_name}", "bytes": len(data)}
+        print(f"{name}: {os.path.getsize(os.path.join(IMAGES_DIR, name))} -> {len(data)} bytes ({file_name})")
+    with open(MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+# -------------------- RUNTIME --------------------
+@functools.lru_cache(maxsize=None)
+def _manifest():
+    try:
+        with open(MANIFEST_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+@functools.lru_cache(maxsize=None)
+def data_uri(path):
+    # Encoded once per process instead of once per rerun
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    return f"data:{MIME_TYPES.get(os.path.splitext(path)[1], 'application/octet-stream')};base64,{encoded}"
+
+
+def asset_url(name):
+    # URL of the built variant if static serving is on, otherwise an (at least cached) data URI.
+    # Returns None if the image does not exist at all.
+    import streamlit as st
+
+    entry = _manifest().get(name)
+    if entry:
+        if st.get_option("server.enableStaticServing"):
+            return f"app/static/{entry['file']}"
+        return data_uri(os.path.join(STATIC_DIR, entry["file"]))   # smaller than the original
+    path = os.path.join(IMAGES_DIR, name)
+    if not os.path.isfile(path):
+        return None
+    return data_uri(path)
+
+
+if __name__ == "__main__":
+    build_assets()
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,89 @@
+import functools
+import json
+import os
+from datetime import date, datetime, timezone
+
+from utils.instrumentation import timed
+from utils.storage import BODY_COMP_FILE, atomic_path, user_file, user_lock
+
+# -------------------- BODY COMPOSITION SERIES --------------------
+# body_composition.json of a user (records "Date", "Body Fat", "Muscle Mass", "Water Content", written by
+# data_visualization.py with pandas) without pandas, for the exporters. Parsed once per version of the file.
+# pandas stores dates as epoch milliseconds or as strings, both are reduced to "YYYY-MM-DD";
+# for a date that occurs more than once the last record wins. A metric that was not measured is None
+# (e.g. Apple Health only knows the body fat, utils/health_import.py).
+BODY_COMP_CACHE_SIZE = 256
+METRICS = ("Body Fat", "Muscle Mass", "Water Content")
+
+
+def body_composition_path(profile_id):
+    return user_file(profile_id, BODY_COMP_FILE)
+
+
+def _version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _metric(value):
+    return None if value is None else float(value)
+
+
+def _epoch_ms(day):
+    # Same format as pandas' to_json(orient="records") in data_visualization.py
+    day = date.fromisoformat(day)
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _day(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, timezone.utc).date().isoformat()
+    return str(value)[:10]
+
+
+@functools.lru_cache(maxsize=BODY_COMP_CACHE_SIZE)
+def _load(path, version):
+    # Sorted tuple of (date, (body fat, muscle mass, water content)); version is only the cache key
+    if version is None:
+        return ()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    except ValueError:
+        return ()       # broken file, the page starts a new one as well
+    by_date = {}
+    for record in records if isinstance(records, list) else []:
+        try:
+            by_date[_day(record["Date"])] = tuple(_metric(record.get(metric)) for metric in METRICS)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return tuple(sorted(by_date.items()))
+
+
+def load_body_composition(profile_id, start=None, end=None):
+    # [(date, (body fat, muscle mass, water content))] sorted by date, optionally from start to end (inclusive)
+    path = body_composition_path(profile_id)
+    return [(day, values) for day, values in _load(path, _version(path))
+            if (start is None or day >= start) and (end is None or day <= end)]
+
+
+@timed("write_body_composition")
+def add_body_compositions(profile_id, measurements):
+    # measurements: {date: {"Body Fat": 24.1, ...}}; metrics that are not given keep their stored value.
+    # Read past the cache like weights.add_weights.
+    path = body_composition_path(profile_id)
+    with user_lock(profile_id):
+        stored = {day: dict(zip(METRICS, values)) for day, values in _load.__wrapped__(path, _version(path))}
+        for day, metrics in measurements.items():
+            stored.setdefault(str(day)[:10], dict.fromkeys(METRICS)).update(
+                (metric, float(value)) for metric, value in metrics.items() if metric in METRICS)
+        records = [{"Date": _epoch_ms(day), **metrics} for day, metrics in sorted(stored.items())]
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+    return len(records)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,48 @@
+import calendar
+
+# -------------------- CALENDAR HEATMAP --------------------
+# The whole month is one HTML table (a single Streamlit element) instead of one button per day.
+# Every day is colored by how close its calories are to the daily goal.
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# (upper bound of calories / goal, color, label for the legend)
+ADHERENCE_LEVELS = [
+    (0.5, "#c8e6c9", "< 50%"),
+    (0.9, "#81c784", "50-90%"),
+    (1.1, "#388e3c", "90-110%"),
+    (float("inf"), "#f44336", "> 110%"),
+]
+NO_DATA_COLOR = "#f0f0f0"
+
+
+def adherence_color(calories, goal_calories):
+    if calories <= 0 or not goal_calories:
+        return NO_DATA_COLOR
+    ratio = calories / goal_calories
+    return next(color for limit, color, _ in ADHERENCE_LEVELS if ratio < limit)
+
+
+def render_heatmap_html(aggregate, goal_calories, selected_day=None):
+    year, month = aggregate["year"], aggregate["month"]
+    rows = ["<table class='calendar-heatmap'><tr>" + "".join(f"<th>{d}</th>" for d in WEEKDAYS) + "</tr>"]
+    for week in calendar.Calendar(firstweekday=0).monthdayscalendar(year, month):
+        cells = []
+        for day in week:
+            if day == 0:
+                cells.append("<td></td>")   # empty day
+                continue
+            calories = aggregate["totals"][day - 1][0]
+            meals = len(aggregate["entries"][day - 1])
+            css_class = " class='selected'" if day == selected_day else ""
+            cells.append(
+                f"<td{css_class} style='background:{adherence_color(calories, goal_calories)}' "
+                f"title='{calories:.0f} kcal, {meals} entries'>{day}</td>"
+            )
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    rows.append("</table>")
+
+    legend = "".join(f"<span style='background:{color}'></span>{label}" for _, color, label in ADHERENCE_LEVELS)
+    rows.append(f"<div class='calendar-legend'><span style='background:{NO_DATA_COLOR}'></span>no entries{legend}</div>")
+    return "".join(rows)
+
+# Code developed with the help of ChatGPT and Copilot.
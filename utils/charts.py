@@ -0,0 +1,161 @@
+import functools
+import io
+from datetime import date
+
+from utils.instrumentation import timed
+from utils.lazy import lazy_import
+
+# -------------------- CHART RENDERING --------------------
+# Every chart is drawn on a matplotlib Figure object (not pyplot), saved to PNG/SVG bytes and released
+# right away, so no figure stays in pyplot's global registry between reruns or sessions.
+# The bytes are cached in a bounded LRU keyed by the exact input values: the same totals, goal and
+# labels give the same image without drawing anything.
+CHART_CACHE_SIZE = 128
+
+# Same output settings as st.pyplot uses by default
+SAVE_OPTIONS = {"dpi": 200, "bbox_inches": "tight"}
+
+
+def cached_chart(draw):
+    @functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+    @timed(f"chart_render.{draw.__name__}")    # only cache misses draw and are timed
+    def render(*args, fmt="png"):
+        fig = draw(*args)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, **SAVE_OPTIONS)
+            return buffer.getvalue()
+        finally:
+            fig.clear()     # drop artists and axes immediately instead of waiting for the garbage collector
+
+    render.__name__ = draw.__name__
+    return render
+
+
+# Imported on the first chart, pages (and sections) without charts don't pay for matplotlib
+matplotlib_figure = lazy_import("matplotlib.figure")
+
+
+def _figure(**kwargs):
+    return matplotlib_figure.Figure(**kwargs)
+
+# -------------------- CALORIES TRACKER --------------------
+@cached_chart
+def goal_bar_chart(labels, values, max_values, goal):
+    fig = _figure(figsize=(8, 5))
+    ax = fig.subplots()
+    bars = ax.bar(labels, values, color=["#4caf50", "#2196f3", "#ff9800", "#f44336"], alpha=0.8)
+
+    # Add value/max value labels on top of the bars
+    for i, bar in enumerate(bars):
+        unit = "kcal" if labels[i] == "Calories" else "g"
+        ax.text(
+            bar.get_x() + bar.get_width() / 2,
+            bar.get_height() + 2,
+            f"{values[i]:.0f}/{max_values[i]} {unit}",
+            ha="center",
+            va="bottom",
+            fontsize=10,
+            fontweight="bold"
+        )
+
+    # Customize the chart
+    ax.set_ylim(0, max(max_values) * 1.2)  # Adjust the y-axis limit
+    ax.set_ylabel("Nutritional Values")
+    ax.set_title(f"Progress Towards {goal} Goal", fontweight="bold")
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+    return fig
+
+
+@cached_chart
+def goal_ring_charts(labels, percentages, colors):
+    fig = _figure(figsize=(16, 4))
+    axes = fig.subplots(1, 4)  # Create 4 subplots side by side
+
+    for ax, label, percentage, color in zip(axes, labels, percentages, colors):
+        # Create a pie chart with the percentage and remaining space
+        ax.pie(
+            [percentage, 100 - percentage],
+            colors=[color, "#e0e0e0"],  # Use the color and a light gray for the remaining
+            startangle=90,
+            counterclock=False,
+            wedgeprops={"width": 0.3},  # Make it look like a progress ring
+        )
+        # Add the percentage text in the center
+        ax.text(0, 0, f"{percentage:.0f}%", ha="center", va="center", fontsize=20, fontweight="bold", color=color)
+        # Add the label below the chart
+        ax.set_title(label, fontsize=20, fontweight="bold", pad=20)
+
+    fig.tight_layout()
+    return fig
+
+# -------------------- DATA VISUALIZATION --------------------
+@cached_chart
+def weight_forecast_chart(dates, weights, forecast_dates, predictions, forecast_days):
+    # Dates as "YYYY-MM-DD" strings: hashable cache keys, converted to dates only when drawing
+    dates = [date.fromisoformat(day) for day in dates]
+    forecast_dates = [date.fromisoformat(day) for day in forecast_dates]
+    fig = _figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.plot(dates, weights, label="Actual Weight", marker='o')
+    ax.plot(forecast_dates, predictions, label="Forecast", linestyle='--', marker='x', color='orange')
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Weight (kg)")
+    ax.set_title(f"Weight Forecast (Next {forecast_days} Days)")
+    ax.legend()
+    ax.grid(True)
+    return fig
+
+
+@cached_chart
+def composition_pie_chart(labels, values, colors):
+    fig = _figure()
+    ax = fig.subplots()
+    ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
+    ax.axis("equal")
+    return fig
+
+
+def _annotate_bars(ax, bars):
+    # Add value annotations on top of the bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f'{height:.1f}%',
+                    xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3),  # Offset text by 3 points above the bar
+                    textcoords="offset points",
+                    ha='center', va='bottom')
+
+
+@cached_chart
+def composition_bar_chart(categories, values, colors):
+    fig = _figure()
+    ax = fig.subplots()
+    bars = ax.bar(categories, values, color=colors)
+    ax.set_ylabel("Percentage")
+    _annotate_bars(ax, bars)
+    return fig
+
+
+@cached_chart
+def recent_entries_chart(dates, body_fat, muscle_mass, water_content):
+    fig = _figure()
+    ax = fig.subplots()
+    x = range(len(dates))
+    bar_width = 0.25
+    bars_bf = ax.bar([i - bar_width for i in x], body_fat, width=bar_width, label="Body Fat", color="#f4a261")
+    bars_mm = ax.bar(list(x), muscle_mass, width=bar_width, label="Muscle Mass", color="#2a9d8f")
+    bars_wc = ax.bar([i + bar_width for i in x], water_content, width=bar_width, label="Water Content", color="#264653")
+
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Percentage")
+    ax.set_title("Recent Body Composition Entries")
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(dates)
+    ax.legend()
+    for bars in [bars_bf, bars_mm, bars_wc]:
+        _annotate_bars(ax, bars)
+    return fig
+
+# Code developed with the help of ChatGPT and Copilot.
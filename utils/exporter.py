@@ -0,0 +1,222 @@
+import csv
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from itertools import islice
+
+from utils.assets import STATIC_DIR
+from utils.body_composition import load_body_composition
+from utils.instrumentation import timed
+from utils.lazy import lazy_import
+from utils.meal_store import iter_entries
+from utils.storage import atomic_path
+from utils.weights import load_weights
+
+# pyarrow is optional, Parquet is only offered when it is installed
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+# -------------------- HISTORY EXPORT --------------------
+# Streams the meal entries, the weight series or the body composition of a user as CSV, JSON Lines or
+# Parquet. Rows are generated lazily (the meal history one month file at a time, utils/meal_store.py) and
+# encoded in chunks of CHUNK_ROWS, so a decade of history never sits in memory as a whole.
+# The column names are the ones utils/importer.py recognises, so an export can be imported again.
+#
+#   for chunk in export_chunks(profile_id, "meals", "csv", start="2024-01-01"):
+#       f.write(chunk)
+#
+#   python -m utils.exporter <profile_id> meals csv [start] [end] > meals.csv
+#
+# The profile page writes the export chunk by chunk to static/exports/<random token>/ and links it (static
+# serving, .streamlit/config.toml), so the file is never held in memory; the browser downloads it like any
+# static file. Without static serving it falls back to st.download_button, which needs the whole file in
+# memory, so only exports up to INLINE_EXPORT_BYTES are offered there.
+CHUNK_ROWS = 5000
+EXPORTS_DIR = os.path.join(STATIC_DIR, "exports")
+EXPORT_TTL = 3600                       # seconds a prepared export stays downloadable
+INLINE_EXPORT_BYTES = 10 * 1024 * 1024
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+DATASETS = {
+    "meals": ("date", "meal", "food", "calories", "protein", "fat", "carbohydrates"),
+    "weights": ("date", "weight"),
+    "body_composition": ("date", "body_fat", "muscle_mass", "water_content"),
+}
+TEXT_COLUMNS = ("date", "meal", "food")
+
+# format -> (mime type, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != "parquet" or PARQUET_AVAILABLE]
+
+# -------------------- ROWS --------------------
+def meal_rows(profile_id, start=None, end=None):
+    for entry in iter_entries(profile_id, start, end):
+        nutrition = entry.get("nutrition", {})
+        yield {"date": entry["selected_date"], "meal": entry["meal_category"], "food": entry["recipe_title"],
+               "calories": nutrition.get("calories", 0), "protein": nutrition.get("protein", 0),
+               "fat": nutrition.get("fat", 0), "carbohydrates": nutrition.get("carbohydrates", 0)}
+
+
+def weight_rows(profile_id, start=None, end=None):
+    for day, weight in load_weights(profile_id, start, end):
+        yield {"date": day, "weight": weight}
+
+
+def body_composition_rows(profile_id, start=None, end=None):
+    for day, (body_fat, muscle_mass, water_content) in load_body_composition(profile_id, start, end):
+        yield {"date": day, "body_fat": body_fat, "muscle_mass": muscle_mass, "water_content": water_content}
+
+
+ROWS = {"meals": meal_rows, "weights": weight_rows, "body_composition": body_composition_rows}
+
+# -------------------- ENCODERS --------------------
+def _batches(rows, size):
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_chunks(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in _batches(rows, CHUNK_ROWS):
+        writer.writerows([row[column] for column in columns] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")     # header only, no rows
+
+
+def _jsonl_chunks(rows, columns):
+    for batch in _batches(rows, CHUNK_ROWS):
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch).encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    # File object for ParquetWriter that hands out what was written so far
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _parquet_chunks(rows, columns):
+    # One row group per chunk
+    schema = pa.schema([(column, pa.string() if column in TEXT_COLUMNS else pa.float64()) for column in columns])
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batches(rows, CHUNK_ROWS):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"csv": _csv_chunks, "jsonl": _jsonl_chunks, "parquet": _parquet_chunks}
+
+# -------------------- EXPORT --------------------
+def export_chunks(profile_id, dataset, fmt, start=None, end=None):
+    # Iterator of bytes, nothing is read before the first chunk is requested.
+    # start / end are "YYYY-MM-DD" (inclusive) or None; invalid arguments raise ValueError right away.
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset {dataset!r}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+    if fmt == "parquet" and not PARQUET_AVAILABLE:
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+    rows = ROWS[dataset](profile_id, start, end)
+    return ENCODERS[fmt](rows, DATASETS[dataset])
+
+
+def export_file_name(dataset, fmt, start=None, end=None):
+    period = f"_{start or 'start'}_{end or 'today'}" if start or end else ""
+    return f"nutri_{dataset}{period}.{FORMATS[fmt][1]}"
+
+
+@timed("history_export")
+def export_to_file(f, profile_id, dataset, fmt, start=None, end=None):
+    # Writes the export to a binary file object, returns the number of bytes
+    size = 0
+    for chunk in export_chunks(profile_id, dataset, fmt, start, end):
+        f.write(chunk)
+        size += len(chunk)
+    return size
+
+
+
+def _prune_exports(now):
+    try:
+        tokens = os.listdir(EXPORTS_DIR)
+    except FileNotFoundError:
+        return
+    for token in tokens:
+        folder = os.path.join(EXPORTS_DIR, token)
+        try:
+            expired = now - os.path.getmtime(folder) > EXPORT_TTL
+        except FileNotFoundError:
+            continue
+        if expired:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+def export_to_static(profile_id, dataset, fmt, start=None, end=None):
+    # Streams the export to static/exports/<token>/<file name>. Returns (URL, size in bytes); the token is
+    # random, so the URL is as secret as the profile id. Exports older than EXPORT_TTL are removed.
+    _prune_exports(time.time())
+    file_name = export_file_name(dataset, fmt, start, end)
+    token = uuid.uuid4().hex
+    path = os.path.join(EXPORTS_DIR, token, file_name)
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            size = export_to_file(f, profile_id, dataset, fmt, start, end)
+    return f"app/static/exports/{token}/{file_name}", size
+
+
+def export_bytes(profile_id, dataset, fmt, start=None, end=None, max_bytes=INLINE_EXPORT_BYTES):
+    # The whole export as bytes, None as soon as it grows beyond max_bytes
+    f = io.BytesIO()
+    for chunk in export_chunks(profile_id, dataset, fmt, start, end):
+        if f.tell() + len(chunk) > max_bytes:
+            return None
+        f.write(chunk)
+    return f.getvalue()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:] + [None] * (5 - len(sys.argv[1:]))
+    export_to_file(sys.stdout.buffer, *args[:5])
+
+# Code developed with the help of ChatGPT and Copilot.
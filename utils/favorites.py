@@ -0,0 +1,109 @@
+import functools
+import heapq
+import json
+import os
+from datetime import date
+
+from utils.food_api import Food, food_entry
+from utils.instrumentation import timed
+from utils.meal_store import append_entry
+from utils.storage import FAVORITES_FILE, atomic_path, user_file, user_lock
+
+# -------------------- RECENT AND FAVORITE FOODS --------------------
+# favorite_foods.json of a user: every food added on a meal page with its values per 100 g (as resolved by
+# USDA the last time), the last quantity and a frequency score that halves every HALF_LIFE_DAYS, so what was
+# eaten often lately ranks above what was eaten often a year ago. Updated on every add (one small file, at
+# most MAX_FOODS foods, the lowest scores are dropped); the quick-add buttons of the meal pages show the
+# TOP_K best foods and log them from the stored values, without any USDA request.
+HALF_LIFE_DAYS = 14
+MAX_FOODS = 200
+TOP_K = 8
+FAVORITES_CACHE_SIZE = 256
+
+
+def favorites_path(profile_id):
+    return user_file(profile_id, FAVORITES_FILE)
+
+
+def _version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def food_key(title):
+    return " ".join(title.lower().split())
+
+
+@functools.lru_cache(maxsize=FAVORITES_CACHE_SIZE)
+def _load(path, version):
+    # {key: {"food": [description, calories, protein, fat, carbohydrates], "quantity", "score", "day"}};
+    # version is only the cache key, the cached dicts must not be changed
+    if version is None:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            foods = json.load(f)
+    except ValueError:
+        return {}
+    return foods if isinstance(foods, dict) else {}
+
+
+def _decayed(food, today):
+    # Score of the food today; "day" is the day of the last update as day number (date.toordinal)
+    return food["score"] * 0.5 ** ((today - food["day"]) / HALF_LIFE_DAYS)
+
+
+@functools.lru_cache(maxsize=FAVORITES_CACHE_SIZE)
+def _top(path, version, today, k):
+    # Bounded heap: only the k best of the (at most MAX_FOODS) foods are kept while ranking
+    foods = _load(path, version)
+    best = heapq.nlargest(k, foods.items(), key=lambda item: _decayed(item[1], today))
+    return tuple((key, Food(*food["food"]), food["quantity"]) for key, food in best)
+
+
+def top_foods(profile_id, k=TOP_K, today=None):
+    # [(key, Food per 100 g, last quantity)] best first; computed once per version of the file and day
+    path = favorites_path(profile_id)
+    return list(_top(path, _version(path), (today or date.today()).toordinal(), k))
+
+# -------------------- UPDATING --------------------
+@timed("write_favorites")
+def record_foods(profile_id, foods, today=None):
+    # foods: iterable of (Food per 100 g, quantity); read past the cache like weights.add_weights
+    today = (today or date.today()).toordinal()
+    path = favorites_path(profile_id)
+    with user_lock(profile_id):
+        stored = {key: dict(food) for key, food in _load.__wrapped__(path, _version(path)).items()}
+        for food, quantity in foods:
+            key = food_key(food.description)
+            previous = stored.get(key)
+            score = _decayed(previous, today) if previous else 0.0
+            stored[key] = {"food": list(food), "quantity": quantity, "score": score + 1, "day": today}
+        if len(stored) > MAX_FOODS:
+            stored = dict(heapq.nlargest(MAX_FOODS, stored.items(), key=lambda item: _decayed(item[1], today)))
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+
+
+def record_food(profile_id, food, quantity, today=None):
+    record_foods(profile_id, [(food, quantity)], today)
+
+
+def quick_add(profile_id, key, date_key, category, quantity=None):
+    # Logs a stored food, no USDA request. Returns the new entry, None if the food is not stored (any more).
+    path = favorites_path(profile_id)
+    stored = _load(path, _version(path)).get(key)
+    if stored is None:
+        return None
+    food = Food(*stored["food"])
+    quantity = quantity or stored["quantity"]
+    entry = food_entry(food, date_key, category, quantity)
+    append_entry(profile_id, entry)
+    record_food(profile_id, food, quantity)
+    return entry
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,164 @@
+import asyncio
+import functools
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import requests
+from dotenv import load_dotenv
+
+from utils.instrumentation import timed
+
+# -------------------- USDA FOODDATA CENTRAL --------------------
+# One HTTP session (keep-alive connection pool) and one result cache for the whole process, shared
+# by all meal pages and sessions. Searching "banana" on the breakfast page and again on the snack
+# page, or by another user, only calls the API once.
+load_dotenv()   # API_KEY_USDA (and NUTRI_USDA_URL) from .env, once per process
+
+# NUTRI_USDA_URL points the client to another server, e.g. the local stand-in benchmarks/api_stub.py
+USDA_BASE_URL = os.getenv("NUTRI_USDA_URL", "https://api.nal.usda.gov/fdc/v1").rstrip("/")
+USDA_SEARCH_URL = f"{USDA_BASE_URL}/foods/search"
+REQUEST_TIMEOUT = 10        # seconds
+FOOD_CACHE_SIZE = 1024      # distinct search queries kept in memory
+
+# Nutrient names in the USDA search response -> keys used in the meal entries
+USDA_NUTRIENTS = {
+    "Energy": "calories",
+    "Protein": "protein",
+    "Total lipid (fat)": "fat",
+    "Carbohydrate, by difference": "carbohydrates",
+}
+
+# Values per 100 g (or ml). Immutable, so cached results can be shared between sessions.
+Food = namedtuple("Food", ["description", "calories", "protein", "fat", "carbohydrates"])
+
+
+class FoodApiError(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def http_session():
+    # requests.Session reuses TCP/TLS connections; urllib3's pool is safe to share between threads for GETs
+    return requests.Session()
+
+
+@functools.lru_cache(maxsize=None)
+def async_http_client():
+    # For the async API (api.py): one httpx.AsyncClient with its own connection pool, None without httpx
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+
+
+def _parse_food(food):
+    nutrients = {n.get("nutrientName"): n.get("value") or 0 for n in food.get("foodNutrients", [])}
+    return Food(
+        description=(food.get("description") or "").capitalize(),
+        **{key: nutrients.get(name, 0) for name, key in USDA_NUTRIENTS.items()},
+    )
+
+# -------------------- RESULT CACHE --------------------
+# (query, page_size) -> tuple of Food, shared by the pages (search_foods) and the API (search_foods_async).
+# Errors raise before anything is stored, so the next try calls the API again.
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key):
+    with _cache_lock:
+        foods = _cache.get(key)
+        if foods is not None:
+            _cache.move_to_end(key)
+        return foods
+
+
+def _remember(key, foods):
+    with _cache_lock:
+        _cache[key] = foods
+        _cache.move_to_end(key)
+        while len(_cache) > FOOD_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return foods
+
+
+def _query_key(query, page_size):
+    api_key = os.getenv("API_KEY_USDA")
+    if not api_key:
+        raise FoodApiError("API key not found. Please check your .env file.")
+    normalized = " ".join(query.lower().split())   # "Banana " and "banana" share one cache entry
+    return (normalized, page_size), {"api_key": api_key, "query": normalized, "pageSize": page_size}
+
+
+def _parse_response(status_code, data, page_size):
+    if status_code != 200:
+        raise FoodApiError(f"USDA API returned status {status_code}")
+    try:
+        body = data()
+    except ValueError as e:     # requests and httpx both raise a ValueError subclass
+        raise FoodApiError("USDA API returned invalid JSON") from e
+    if not isinstance(body, dict):
+        raise FoodApiError("USDA API returned invalid JSON")
+    return tuple(_parse_food(food) for food in body.get("foods", [])[:page_size])
+
+# -------------------- SEARCH --------------------
+@timed("usda_request")    # only real API calls are timed, cache hits return before
+def _fetch(params):
+    try:
+        response = http_session().get(USDA_SEARCH_URL, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise FoodApiError(f"USDA API not reachable: {e}") from e
+    return _parse_response(response.status_code, response.json, params["pageSize"])
+
+
+async def _fetch_async(params):
+    client = async_http_client()
+    if client is None:
+        return await asyncio.to_thread(_fetch, params)  # without httpx: blocking request in a worker thread
+    import httpx
+
+    with timed("usda_request"):
+        try:
+            response = await client.get(USDA_SEARCH_URL, params=params)
+        except httpx.HTTPError as e:
+            raise FoodApiError(f"USDA API not reachable: {e}") from e
+    return _parse_response(response.status_code, response.json, params["pageSize"])
+
+
+@timed("food_search")
+def search_foods(query, page_size=1):
+    key, params = _query_key(query, page_size)
+    foods = _cached(key)
+    return foods if foods is not None else _remember(key, _fetch(params))
+
+
+async def search_foods_async(query, page_size=1):
+    # Same results and cache as search_foods, without blocking the event loop
+    key, params = _query_key(query, page_size)
+    foods = _cached(key)
+    return foods if foods is not None else _remember(key, await _fetch_async(params))
+
+
+def scaled_nutrition(food, quantity):
+    # Nutrition of `quantity` grams (or ml), rounded like the stored meal entries
+    factor = quantity / 100
+    return {
+        "calories": round(food.calories * factor, 2),
+        "carbohydrates": round(food.carbohydrates * factor, 2),
+        "fat": round(food.fat * factor, 2),
+        "protein": round(food.protein * factor, 2),
+    }
+
+
+def food_entry(food, date_key, category, quantity):
+    # Meal entry as stored in the month files (utils/meal_store.py)
+    return {
+        "recipe_title": food.description,
+        "selected_date": date_key,
+        "meal_category": category,
+        "nutrition": scaled_nutrition(food, quantity),
+    }
+
+# Code developed with the help of ChatGPT and Copilot.
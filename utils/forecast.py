@@ -0,0 +1,83 @@
+import functools
+import zlib
+
+from utils.instrumentation import timed
+from utils.lazy import lazy_import
+
+# scikit-learn und numpy werden erst beim ersten Forecast importiert (utils/lazy.py)
+np = lazy_import("numpy")
+sklearn_ensemble = lazy_import("sklearn.ensemble")
+
+# -------------------- WEIGHT FORECAST --------------------
+# Random Forest weight forecast used by data_visualization.py and the REST API (api.py).
+# The model is trained once per weight series and kept for the process, so moving the forecast range
+# slider or asking the API again for the same data only runs the (cheap) forecast loop. The noise is seeded
+# from the series as well: the same weights always give the same forecast (and the same cached chart,
+# utils/charts.py), a shorter range is the beginning of the longer one.
+MIN_ENTRIES = 5         # below this the pages and the API do not offer a forecast
+# Trained models kept in memory, one per distinct weight series. A model grows with the series (about 0.5 MB
+# for a month of daily weights, 7 MB for a year), so only the last few are kept: enough for the slider and
+# repeated API calls of the users forecasting right now, a new weight entry retrains anyway.
+MODEL_CACHE_SIZE = 4
+N_ESTIMATORS = 200
+RANDOM_STATE = 50
+NOISE_STD = 0.25        # kg, see forecast_weights
+
+
+def _features(w1, w2, w3, std):
+    # Weight_lag1, lag2, lag3, Weight_avg, Weight_std, Weight_delta
+    return [w1, w2, w3, (w1 + w2 + w3) / 3, std, w1 - w2]
+
+
+def _sample_std(values):
+    mean = sum(values) / len(values)
+    return (sum((v - mean) ** 2 for v in values) / (len(values) - 1)) ** 0.5
+
+
+@functools.lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _trained_model(weights):
+    # 🟢 1. Datenvorbereitung: Es werden Features aus den letzten 3 Einträgen berechnet:
+    #    - Weight_lag1, lag2, lag3: Die letzten drei Gewichtseinträge
+    #    - Weight_avg: Durchschnitt der drei Werte
+    #    - Weight_std: Standardabweichung der drei Werte (Schwankung, wie pandas .std mit ddof=1)
+    #    - Weight_delta: Veränderung zwischen den letzten zwei Einträgen
+    X = [_features(weights[i - 1], weights[i - 2], weights[i - 3], _sample_std(weights[i - 3:i]))
+         for i in range(3, len(weights))]
+    y = list(weights[3:])
+
+    # 🟢 2. Training des Random Forest Regressors
+    #    - Das Modell lernt aus dem Zusammenhang der oben berechneten Merkmale (X) und dem tatsächlichen Gewicht (y)
+    #    - Random Forest kombiniert viele Entscheidungsbäume für robuste Vorhersagen
+    model = sklearn_ensemble.RandomForestRegressor(n_estimators=N_ESTIMATORS, random_state=RANDOM_STATE)
+    with timed("forecast_fit"):
+        model.fit(X, y)
+    return model
+
+
+def forecast_weights(weights, days):
+    # Predicted weight for each of the next `days` days, `weights` sorted by date
+    weights = tuple(float(weight) for weight in weights)
+    model = _trained_model(weights)
+
+    # 🟢 3. Forecast: Auf Basis der letzten 3 bekannten Werte wird iterativ ein Gewicht pro Tag vorhergesagt
+    #    - Nach jeder Vorhersage werden die Werte verschoben, sodass immer 3 neue aktuelle Gewichte als Input dienen
+    #    - Es wird zusätzlich ein kleiner zufälliger Rauschwert (Noise) hinzugefügt, um unrealistische Glättung zu vermeiden
+    # Der Noise folgt einer Normalverteilung mit Mittelwert 0 und Standardabweichung 0.25 kg, was einer realistischen
+    # täglichen Gewichtsdynamik entspricht. Ohne ihn liefert der Random Forest bei ähnlichen Eingaben immer denselben
+    # Wert und die iterative Prognose gleitet in eine künstliche Konstanz ab.
+    rng = np.random.default_rng(zlib.crc32(repr(weights).encode()))
+    last_known_w1 = weights[-1]
+    last_known_w2 = weights[-2] if len(weights) >= 2 else last_known_w1
+    last_known_w3 = weights[-3] if len(weights) >= 3 else last_known_w2
+    predictions = []
+
+    with timed("forecast_loop"):
+        for _ in range(days):
+            std = np.std([last_known_w1, last_known_w2, last_known_w3])
+            features = [_features(last_known_w1, last_known_w2, last_known_w3, std)]
+            next_pred = float(model.predict(features)[0] + rng.normal(0, NOISE_STD))  # Noise einfügen
+            predictions.append(next_pred)
+            last_known_w3, last_known_w2, last_known_w1 = last_known_w2, last_known_w1, next_pred
+    return predictions
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,57 @@
+import fnmatch
+import time
+
+import streamlit as st
+
+# -------------------- DASHBOARD SECTIONS --------------------
+# A section is a Streamlit fragment: a widget inside it only reruns that section (and the sections
+# called from it), not the whole page with CSS, navigation and file loading.
+# Every section declares the widget / session state keys it depends on ("calendar_day_*" matches every
+# key with that prefix) and the section it is nested in. A section holds the widgets of its keys, so one
+# interaction re-executes exactly the sections that read the changed value; benchmarks/bench_fragments.py
+# checks the declarations against the sections that really rerun.
+SECTIONS = {}   # name -> {"depends_on": (...), "parent": name or None}
+
+# st.fragment exists since Streamlit 1.37, older versions only have the experimental name.
+# Without either the section simply runs as part of the full page.
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+
+def dashboard_section(name, depends_on=(), parent=None):
+    SECTIONS[name] = {"depends_on": tuple(depends_on), "parent": parent}
+
+    def decorator(func):
+        @_fragment
+        def section(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                func(*args, **kwargs)
+            finally:
+                # Last execution time and number of runs per section, used by benchmarks/bench_fragments.py
+                stats = st.session_state.setdefault("section_timings", {}).setdefault(name, {"runs": 0, "last_ms": 0.0})
+                stats["runs"] += 1
+                stats["last_ms"] = (time.perf_counter() - start) * 1000
+
+        section.__name__ = func.__name__
+        return section
+    return decorator
+
+
+def affected_sections(key):
+    # Sections re-executed when the value of "key" changes: the ones declaring it and everything nested in them
+    affected = {name for name, info in SECTIONS.items()
+                if any(fnmatch.fnmatchcase(key, pattern) for pattern in info["depends_on"])}
+    changed = True
+    while changed:
+        nested = {name for name, info in SECTIONS.items() if info["parent"] in affected} - affected
+        affected |= nested
+        changed = bool(nested)
+    return sorted(affected)
+
+
+def owning_section(key):
+    # The outermost affected section, i.e. the fragment that holds the widget of "key"
+    affected = affected_sections(key)
+    return next((name for name in affected if SECTIONS[name]["parent"] not in affected), None)
+
+# Code developed with the help of ChatGPT and Copilot.
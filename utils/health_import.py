@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import datetime
+
+from utils.body_composition import add_body_compositions
+from utils.instrumentation import timed
+from utils.weights import add_weights
+
+# -------------------- APPLE HEALTH IMPORT --------------------
+# Reads the weight and body fat measurements of a smart scale from an Apple Health export (export.zip from
+# "Export All Health Data", or the export.xml inside) into weight_data.csv and body_composition.json.
+# export.xml is often several GB: it is parsed incrementally with iterparse and every element is cleared
+# as soon as it has been read, so memory depends on the number of measured days, not on the file size. Per day only the latest measurement is kept
+# (a scale that syncs twice, or iPhone and scale app both writing); the days are written in batches of
+# BATCH_DAYS, existing values of the same days are replaced.
+#
+#   python -m utils.health_import <profile_id> export.zip      # with NUTRI_USERS_DIR like the app
+BATCH_DAYS = 2000
+BODY_MASS = "HKQuantityTypeIdentifierBodyMass"
+BODY_FAT = "HKQuantityTypeIdentifierBodyFatPercentage"
+KG_PER_UNIT = {"kg": 1.0, "g": 0.001, "lb": 0.45359237, "st": 6.35029318}
+EXPORT_NAME = "export.xml"
+
+
+class HealthImportError(Exception):
+    pass
+
+
+def _export_xml(archive):
+    info = next((info for info in archive.infolist()
+                 if info.filename == EXPORT_NAME or info.filename.endswith("/" + EXPORT_NAME)), None)
+    if info is None:
+        raise HealthImportError("The zip file contains no export.xml, is it an Apple Health export?")
+    return archive.open(info), info.file_size
+
+
+def _open(source):
+    # Path or binary file object of export.zip or export.xml -> (xml stream, total bytes, files to close)
+    if isinstance(source, (str, os.PathLike)):
+        if zipfile.is_zipfile(source):
+            archive = zipfile.ZipFile(source)
+            stream, size = _export_xml(archive)
+            return stream, size, [stream, archive]
+        stream = open(source, "rb")
+        return stream, os.path.getsize(source), [stream]
+    if zipfile.is_zipfile(source):
+        stream, size = _export_xml(zipfile.ZipFile(source))
+        return stream, size, [stream]
+    source.seek(0)
+    return source, getattr(source, "size", None), []
+
+
+def _measurement(element):
+    # (type, day, UTC timestamp, value) of a weight or body fat record, None for everything else.
+    # The day is the local one of the measurement, the timestamp orders measurements taken in different time zones.
+    kind = element.get("type")
+    if kind != BODY_MASS and kind != BODY_FAT:
+        return None
+    start = element.get("startDate") or ""     # "2024-05-15 07:12:31 +0200", local time of the measurement
+    try:
+        value = float(element.get("value"))
+        measured = datetime.strptime(start, "%Y-%m-%d %H:%M:%S %z").timestamp()
+    except (TypeError, ValueError):
+        return None
+    if kind == BODY_MASS:
+        factor = KG_PER_UNIT.get(element.get("unit"))
+        if factor is None:
+            return None
+        value = round(value * factor, 2)
+    else:
+        value = round(value * 100 if value <= 1 else value, 1)      # stored as a fraction, "%" in the unit
+    return kind, start[:10], measured, value
+
+
+class _Batch:
+    # Latest measurement per day, written when BATCH_DAYS days are collected
+    def __init__(self, profile_id, stats):
+        self.profile_id = profile_id
+        self.stats = stats
+        self.weights = {}       # day -> weight
+        self.body_fat = {}      # day -> body fat %
+        self.latest = {}        # (type, day) -> timestamp of the value kept, for all days (a few thousand)
+
+    def add(self, kind, day, measured, value):
+        key = (kind, day)
+        if key in self.latest and self.latest[key] > measured:
+            return
+        self.latest[key] = measured
+        (self.weights if kind == BODY_MASS else self.body_fat)[day] = value
+        if len(self.weights) + len(self.body_fat) >= BATCH_DAYS:
+            self.flush()
+
+    def flush(self):
+        if self.weights:
+            add_weights(self.profile_id, self.weights.items())
+        if self.body_fat:
+            add_body_compositions(self.profile_id, {day: {"Body Fat": value} for day, value in self.body_fat.items()})
+        self.weights, self.body_fat = {}, {}
+        # Distinct days written so far; a day that comes back in a later batch only replaces its value
+        self.stats["weight_days"] = sum(1 for kind, _ in self.latest if kind == BODY_MASS)
+        self.stats["body_fat_days"] = len(self.latest) - self.stats["weight_days"]
+
+
+@timed("health_import")
+def import_apple_health(profile_id, source, progress=None, progress_every=100000):
+    # source: path or binary file object (zip or xml). progress(stats) every progress_every records.
+    # Returns the stats: records read, weight and body fat measurements found, days written
+    stream, total, to_close = _open(source)
+    stats = {"records": 0, "measurements": 0, "weight_days": 0, "body_fat_days": 0, "bytes_read": 0,
+             "total_bytes": total}
+    batch = _Batch(profile_id, stats)
+    try:
+        events = ET.iterparse(stream, events=("start", "end"))
+        _, root = next(events)
+        if root.tag != "HealthData":
+            raise HealthImportError("This is not an Apple Health export.xml")
+        depth = 1
+        for event, element in events:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if element.tag == "Record":     # also the records inside a Correlation
+                stats["records"] += 1
+                measurement = _measurement(element)
+                if measurement is not None:
+                    stats["measurements"] += 1
+                    batch.add(*measurement)
+                if progress and stats["records"] % progress_every == 0:
+                    stats["bytes_read"] = stream.tell()
+                    progress(stats)
+            if depth == 1:
+                root.clear()    # a child of HealthData is complete: drop it and everything before it
+        batch.flush()
+    except ET.ParseError as e:
+        batch.flush()   # keep what was read before the broken part
+        raise HealthImportError(f"The export is broken after {stats['records']} records: {e}") from e
+    finally:
+        for f in to_close:
+            f.close()
+    stats["bytes_read"] = total
+    if progress:
+        progress(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    def _print_progress(stats):
+        done = f"{stats['bytes_read'] / stats['total_bytes']:.0%}" if stats["bytes_read"] and stats["total_bytes"] else ""
+        print(f"{stats['records']} records, {stats['measurements']} measurements {done}", file=sys.stderr)
+
+    print(json.dumps(import_apple_health(sys.argv[1], sys.argv[2], progress=_print_progress), indent=2))
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,302 @@
+import csv
+import functools
+import io
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+from utils.food_api import FoodApiError, food_entry, search_foods
+from utils.instrumentation import timed
+from utils.meal_store import append_entries
+
+# -------------------- MEAL HISTORY IMPORT --------------------
+# Streams CSV / JSON exports of other trackers into the month files of utils/meal_store.py:
+#   - the file is read row by row (CSV, JSON Lines, or a JSON array decoded one object at a time), only
+#     CHUNK_ROWS rows are in memory at once, so a file with millions of rows needs the same memory as a small one
+#   - columns are matched by name ("Date", "Meal", "Food", "Calories", "Fat (g)", ...), see COLUMNS
+#   - rows without calories are resolved at USDA: the distinct food names of a chunk are searched in
+#     parallel (LOOKUP_WORKERS), "quantity" grams (default 100) of the first result are logged
+#   - every chunk is one append_entries() call, i.e. each month touched by the chunk is rewritten once.
+#     Exports sorted by date (all trackers we know) therefore write every month file about once.
+#
+#   python -m utils.importer <profile_id> export.csv     # with NUTRI_USERS_DIR like the app
+CHUNK_ROWS = 20000      # rows per write transaction
+LOOKUP_WORKERS = 8      # parallel USDA searches per chunk
+LOOKUP_MEMO_SIZE = 10000
+DEFAULT_QUANTITY = 100  # grams, for rows resolved at USDA without a quantity
+READ_BLOCK = 64 * 1024
+MAX_ERRORS = 20         # error messages kept for the report
+
+# Field of the meal entry -> accepted column names (lower case, units in brackets removed)
+COLUMNS = {
+    "selected_date": ("selected_date", "date", "day", "datum", "logged_at", "timestamp"),
+    "meal_category": ("meal_category", "meal", "category", "meal_type", "mealtype", "meal_name"),
+    "recipe_title": ("recipe_title", "food", "food_name", "name", "title", "description", "item"),
+    "quantity": ("quantity", "amount", "grams", "weight", "serving_size"),
+    "calories": ("calories", "energy", "kcal", "energy_kcal"),
+    "protein": ("protein",),
+    "fat": ("fat", "total_fat"),
+    "carbohydrates": ("carbohydrates", "carbs", "carbohydrate", "total_carbohydrate"),
+}
+NUTRITION = ("calories", "carbohydrates", "fat", "protein")
+CATEGORIES = {"breakfast": "Breakfast", "lunch": "Lunch", "dinner": "Dinner", "snack": "Snack", "snacks": "Snack"}
+DATE_FORMATS = ("%d.%m.%Y", "%m/%d/%Y", "%Y/%m/%d", "%d/%m/%Y")
+
+_FIELDS = {column: field for field, columns in COLUMNS.items() for column in columns}
+
+
+class HistoryImportError(Exception):
+    pass
+
+# -------------------- READING --------------------
+def _open(source):
+    # Path or binary file object (e.g. st.file_uploader) -> (binary stream, name, total bytes)
+    if isinstance(source, (str, os.PathLike)):
+        stream = open(source, "rb")
+        return stream, str(source), os.path.getsize(source)
+    size = getattr(source, "size", None)
+    if size is None:
+        try:
+            size = os.fstat(source.fileno()).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            size = None
+    return source, getattr(source, "name", ""), size
+
+
+def _csv_rows(text):
+    # The delimiter is guessed from the first block (";" is common in European exports)
+    sample = text.read(READ_BLOCK)
+    sample += text.readline()   # complete the last line of the sample
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    lines = io.StringIO(sample)
+    yield from csv.DictReader(_chain_lines(lines, text), dialect=dialect)
+
+
+def _chain_lines(*files):
+    for f in files:
+        yield from f
+
+
+def _json_array(text, buffer):
+    # Decodes one element of a top level JSON array at a time, the buffer holds at most a few blocks
+    decoder = json.JSONDecoder()
+    pos = buffer.index("[") + 1
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = text.read(READ_BLOCK), 0
+            if not buffer:
+                return
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            more = text.read(READ_BLOCK)
+            if not more:
+                raise HistoryImportError("The JSON file ends in the middle of an entry") from None
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        yield obj
+        pos = end
+        if pos > READ_BLOCK:
+            buffer, pos = buffer[pos:], 0
+
+
+def _json_rows(text):
+    # JSON array of objects or JSON Lines (one object per line)
+    buffer = text.read(READ_BLOCK)
+    start = buffer.lstrip()[:1]
+    if start == "[":
+        yield from _json_array(text, buffer)
+        return
+    for line in _chain_lines(io.StringIO(buffer + text.readline()), text):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_rows(stream, fmt):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    return _csv_rows(text) if fmt == "csv" else _json_rows(text)
+
+
+def detect_format(name):
+    extension = os.path.splitext(name.lower())[1]
+    if extension == ".csv" or extension == ".txt":
+        return "csv"
+    if extension in (".json", ".jsonl", ".ndjson"):
+        return "json"
+    raise HistoryImportError(f"Unknown file type '{extension}', expected .csv, .json or .jsonl")
+
+# -------------------- MAPPING --------------------
+@functools.lru_cache(maxsize=256)
+def _field(column):
+    # "Fat (g)" -> "fat", "Meal Type" -> "meal_type" -> "meal_category"
+    name = column.split("(")[0].split("[")[0].strip().lower().replace(" ", "_").replace("-", "_")
+    return _FIELDS.get(name)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(value):
+    # ISO dates and timestamps ("2025-05-15", "2025-05-15T08:12:00"), common local formats, epoch ms
+    value = str(value).strip()
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    if value.isdigit() and len(value) == 13:
+        return datetime.fromtimestamp(int(value) / 1000, timezone.utc).date().isoformat()
+    raise ValueError(f"unknown date '{value}'")
+
+
+def _number(value):
+    if isinstance(value, str):
+        # "1,5" (decimal comma) -> 1.5, "1,250.5" (thousands separator) -> 1250.5
+        value = value.strip()
+        value = value.replace(",", ".") if value.count(",") == 1 and "." not in value else value.replace(",", "")
+    return float(value)
+
+
+def map_row(row):
+    # Raw row -> (entry, None) when the row has calories, (entry without nutrition, quantity) when it needs a lookup
+    fields = {}
+    for column, value in row.items():
+        if column == "nutrition" and isinstance(value, dict):   # rows exported by this app
+            for key, nutrient in value.items():
+                fields.setdefault(key, nutrient)
+            continue
+        field = _field(column) if isinstance(column, str) else None
+        if field and value not in (None, "") and field not in fields:
+            fields[field] = value
+    category = CATEGORIES.get(str(fields.get("meal_category", "")).strip().lower())
+    if category is None:
+        raise ValueError(f"unknown meal '{fields.get('meal_category', '')}'")
+    if "selected_date" not in fields:
+        raise ValueError("no date")
+    entry = {"recipe_title": str(fields.get("recipe_title") or "Imported entry").strip(),
+             "selected_date": parse_date(fields["selected_date"]), "meal_category": category}
+    if "calories" in fields:
+        entry["nutrition"] = {key: round(_number(fields.get(key, 0)), 2) for key in NUTRITION}
+        return entry, None
+    if "recipe_title" not in fields:
+        raise ValueError("neither calories nor a food name")
+    return entry, _number(fields.get("quantity", DEFAULT_QUANTITY))
+
+# -------------------- LOOKUPS --------------------
+class _Resolver:
+    # Batched USDA searches; names that were already searched (found or not) are not searched again.
+    # At most LOOKUP_MEMO_SIZE names are kept, the least recently used go first.
+    def __init__(self, workers):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-lookup")
+        self.memo = OrderedDict()   # lower case name -> Food or None
+
+    def _search(self, name):
+        try:
+            foods = search_foods(name)
+        except FoodApiError:
+            return None
+        return foods[0] if foods else None
+
+    def resolve(self, names):
+        names = {name.lower() for name in names}
+        missing = names - self.memo.keys()
+        for name in names - missing:
+            self.memo.move_to_end(name)
+        for name, food in zip(missing, self.pool.map(self._search, missing)):
+            self.memo[name] = food
+        # The names of this chunk are the most recent ones, so they survive until the caller has read them
+        while len(self.memo) > max(LOOKUP_MEMO_SIZE, len(names)):
+            self.memo.popitem(last=False)
+        return len(missing)
+
+    def food(self, name):
+        return self.memo.get(name.lower())
+
+    def close(self):
+        self.pool.shutdown()
+
+# -------------------- IMPORT --------------------
+def _commit(profile_id, chunk, resolver, stats):
+    stats["looked_up"] += resolver.resolve({entry["recipe_title"] for entry, quantity in chunk if quantity is not None})
+    entries = []
+    for entry, quantity in chunk:
+        if quantity is not None:
+            food = resolver.food(entry["recipe_title"])
+            if food is None:
+                stats["skipped"] += 1
+                _error(stats, f"'{entry['recipe_title']}' not found at USDA")
+                continue
+            entry = dict(food_entry(food, entry["selected_date"], entry["meal_category"], quantity),
+                         recipe_title=entry["recipe_title"])
+        entries.append(entry)
+    with timed("meal_import_commit"):
+        append_entries(profile_id, entries, use_cache=False)
+    stats["imported"] += len(entries)
+
+
+def _error(stats, message):
+    if len(stats["errors"]) < MAX_ERRORS:
+        stats["errors"].append(message)
+
+
+@timed("meal_import")
+def import_meals(profile_id, source, fmt=None, progress=None, chunk_rows=CHUNK_ROWS):
+    # source: path or binary file object. progress(stats) is called after every committed chunk.
+    # Returns the stats: rows read, imported, skipped, distinct foods looked up, first error messages
+    stream, name, total = _open(source)
+    fmt = fmt or detect_format(name)
+    stats = {"rows": 0, "imported": 0, "skipped": 0, "looked_up": 0, "errors": [], "bytes_read": 0,
+             "total_bytes": total}
+    resolver = _Resolver(LOOKUP_WORKERS)
+    chunk = []
+    try:
+        for row in read_rows(stream, fmt):
+            stats["rows"] += 1
+            try:
+                chunk.append(map_row(row))
+            except (ValueError, TypeError, AttributeError) as e:
+                stats["skipped"] += 1
+                _error(stats, f"row {stats['rows']}: {e}")
+            if len(chunk) >= chunk_rows:
+                _commit(profile_id, chunk, resolver, stats)
+                chunk = []
+                stats["bytes_read"] = stream.tell() if stream.seekable() else None
+                if progress:
+                    progress(stats)
+        if chunk:
+            _commit(profile_id, chunk, resolver, stats)
+    except (csv.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise HistoryImportError(f"Could not read the file after {stats['rows']} rows: {e}") from e
+    finally:
+        resolver.close()
+        if isinstance(source, (str, os.PathLike)):
+            stream.close()
+    stats["bytes_read"] = total
+    if progress:
+        progress(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    def _print_progress(stats):
+        done = f"{stats['bytes_read'] / stats['total_bytes']:.0%}" if stats["bytes_read"] and stats["total_bytes"] else ""
+        print(f"{stats['rows']} rows, {stats['imported']} imported, {stats['skipped']} skipped {done}", file=sys.stderr)
+
+    result = import_meals(sys.argv[1], sys.argv[2], progress=_print_progress)
+    print(json.dumps(result, indent=2))
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,227 @@
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+# -------------------- HOT PATH TIMINGS --------------------
+# Timers for the expensive parts of a rerun (file loads and writes, API calls, model training, charts).
+# Switched on per process with the environment, everything else is off by default:
+#   NUTRI_METRICS=1                  collect timings
+#   NUTRI_METRICS_PORT=9464          serve /metrics (Prometheus text) and /metrics.jsonl on 127.0.0.1
+#   NUTRI_METRICS_FILE=metrics.prom  write the timings every NUTRI_METRICS_INTERVAL seconds and at exit
+#                                    (JSON lines if the file name ends with .jsonl)
+# When it is off, timed() returns the undecorated function and a shared no-op context manager,
+# so the instrumented code runs exactly as without it.
+#
+#   @timed("get_recipes")            # decorator
+#   def get_recipes(...): ...
+#
+#   with timed("forecast_fit"):      # context manager
+#       model.fit(X, y)
+#
+# Timings are kept as histograms per page and name. A page reports its name with set_page() at the top,
+# timings from other threads (e.g. the month prefetch) are counted under "background".
+ENABLED = os.getenv("NUTRI_METRICS", "").lower() in ("1", "true", "yes", "on")
+METRICS_HOST = os.getenv("NUTRI_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.getenv("NUTRI_METRICS_PORT")
+METRICS_FILE = os.getenv("NUTRI_METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("NUTRI_METRICS_INTERVAL", "15"))
+
+METRIC_NAME = "nutri_hot_path_seconds"
+# Upper bounds of the histogram buckets in seconds (Prometheus "le"), +Inf is added at the end
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_histograms = {}    # (page, name) -> {"buckets": [count per bucket], "sum": seconds, "count": n}
+_lock = threading.Lock()
+_local = threading.local()
+
+# -------------------- RECORDING --------------------
+def set_page(page):
+    # Every Streamlit script run has its own thread, so the page name is kept per thread
+    if ENABLED:
+        _local.page = page
+
+
+def current_page():
+    return getattr(_local, "page", "background")
+
+
+def observe(name, seconds, page=None):
+    key = (page or current_page(), name)
+    index = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0}
+        histogram["buckets"][index] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+
+class _Timer:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __call__(self, func):
+        return func
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(name):
+    return _Timer(name) if ENABLED else _NO_TIMER
+
+def reset():
+    # Forget all timings, e.g. between two runs of a benchmark
+    with _lock:
+        _histograms.clear()
+
+# -------------------- EXPORT --------------------
+def snapshot():
+    with _lock:
+        return {key: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}
+                for key, h in sorted(_histograms.items())}
+
+
+def _quantile(histogram, q):
+    # Upper bound of the bucket that contains the q-quantile (like histogram_quantile without interpolation)
+    rank = q * histogram["count"]
+    seen = 0
+    for bound, count in zip(BUCKETS + (float("inf"),), histogram["buckets"]):
+        seen += count
+        if seen >= rank:
+            return bound
+    return float("inf")
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    lines = [f"# HELP {METRIC_NAME} Time spent in instrumented hot paths per page.",
+             f"# TYPE {METRIC_NAME} histogram"]
+    for (page, name), histogram in snapshot().items():
+        labels = f'page="{_label(page)}",name="{_label(name)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), histogram["buckets"]):
+            cumulative += count
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram['sum']:.6f}")
+        lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def jsonl_text():
+    lines = []
+    for (page, name), histogram in snapshot().items():
+        count = histogram["count"]
+        lines.append(json.dumps({
+            "page": page,
+            "name": name,
+            "count": count,
+            "sum_ms": round(histogram["sum"] * 1000, 3),
+            "mean_ms": round(histogram["sum"] * 1000 / count, 3) if count else None,
+            "p50_le_ms": _quantile(histogram, 0.5) * 1000,
+            "p95_le_ms": _quantile(histogram, 0.95) * 1000,
+            # count per bucket, not cumulative like in the Prometheus text
+            "buckets": dict(zip([str(bound) for bound in BUCKETS] + ["+Inf"], histogram["buckets"])),
+        }))
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def write_metrics(path):
+    from utils.storage import atomic_path   # not at the top, utils.storage itself is instrumented
+
+    text = jsonl_text() if path.endswith(".jsonl") else prometheus_text()
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _serve(host, port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = prometheus_text(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.jsonl":
+                body, content_type = jsonl_text(), "application/x-ndjson"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass    # no access log on the console of the app
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def _write_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        write_metrics(path)
+
+
+def _start_exporters():
+    # Once per process, on the first import
+    if METRICS_PORT:
+        try:
+            _serve(METRICS_HOST, int(METRICS_PORT))
+        except OSError:
+            pass    # e.g. the port is taken by a second Streamlit process, the file export still works
+    if METRICS_FILE:
+        threading.Thread(target=_write_periodically, args=(METRICS_FILE, METRICS_INTERVAL),
+                         name="metrics-writer", daemon=True).start()
+        atexit.register(write_metrics, METRICS_FILE)
+
+
+if ENABLED:
+    _start_exporters()
+
+# Code developed with the help of ChatGPT and Copilot.
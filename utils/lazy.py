@@ -0,0 +1,49 @@
+import importlib
+import threading
+import time
+
+# -------------------- LAZY IMPORTS --------------------
+# pandas, numpy, scikit-learn and matplotlib take from a few hundred milliseconds up to seconds to import.
+# A page declares them at the top with lazy_import() and the module is only imported on the first
+# attribute access, i.e. when the section that uses it actually renders (e.g. scikit-learn only for
+# the weight forecast). Afterwards attribute access goes straight to the imported module.
+#
+#   np = lazy_import("numpy")
+#   np.mean(values)          # numpy is imported here
+IMPORT_TIMES = {}   # module name -> milliseconds the first import took in this process
+
+_import_lock = threading.Lock()
+
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _import_lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    IMPORT_TIMES.setdefault(self._name, (time.perf_counter() - start) * 1000)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attribute):
+        # Only called for attributes that aren't set in __init__, so this never recurses
+        return getattr(self._load(), attribute)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+# Code developed with the help of ChatGPT and Copilot.
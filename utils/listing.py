@@ -0,0 +1,63 @@
+import math
+
+import streamlit as st
+
+# -------------------- PAGINATED LISTINGS --------------------
+# Long lists are shown one page at a time as one st.dataframe (the table scrolls in the browser, only the
+# visible rows are drawn), so a rerun costs the same for 20 entries as for 20 000.
+#   offset_page()   lists that are already in memory (e.g. the recipes selected in this session)
+#   keyset_page()   the saved history, read page by page with meal_store.page_entries()
+PAGE_SIZE = 20
+
+
+def entry_rows(entries):
+    return [{"Date": entry["selected_date"], "Meal": entry["meal_category"], "Recipe": entry["recipe_title"],
+             "Calories": (entry.get("nutrition") or {}).get("calories")} for entry in entries]
+
+
+def _pager(key, page_label, has_previous, has_next, on_previous, on_next):
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("⬅ Previous", key=f"{key}_previous", disabled=not has_previous, on_click=on_previous)
+    with col2:
+        st.markdown(f"<p style='text-align: center;'>{page_label}</p>", unsafe_allow_html=True)
+    with col3:
+        st.button("Next ➡", key=f"{key}_next", disabled=not has_next, on_click=on_next)
+
+# -------------------- OFFSET --------------------
+def offset_page(items, key, page_size=PAGE_SIZE):
+    # Slice of items for the current page plus the pager; the page number is kept in st.session_state[key]
+    pages = max(1, math.ceil(len(items) / page_size))
+    page = min(st.session_state.get(key, 0), pages - 1)
+    st.session_state[key] = page
+
+    def move(step):
+        st.session_state[key] = page + step
+
+    if pages > 1:
+        _pager(key, f"Page {page + 1} of {pages}", page > 0, page < pages - 1, lambda: move(-1), lambda: move(1))
+    return items[page * page_size:(page + 1) * page_size]
+
+# -------------------- KEYSET --------------------
+def keyset_page(fetch, key, filters, page_size=PAGE_SIZE):
+    # fetch(cursor, limit) -> (items, next cursor or None). The cursors of the pages shown so far are kept in
+    # st.session_state[key] (a stack, "Previous" pops), and start over whenever the filters change.
+    state = st.session_state.get(key)
+    if state is None or state["filters"] != filters:
+        state = st.session_state[key] = {"filters": filters, "cursors": [None]}
+    cursors = state["cursors"]
+    items, next_cursor = fetch(cursors[-1], page_size)
+
+    def previous():
+        cursors.pop()
+
+    def following():
+        cursors.append(list(next_cursor))
+
+    if len(cursors) > 1 or next_cursor:
+        first = (len(cursors) - 1) * page_size + 1
+        _pager(key, f"Entries {first}–{first + len(items) - 1}", len(cursors) > 1, next_cursor is not None,
+               previous, following)
+    return items
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,87 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.favorites import record_foods
+from utils.food_api import FoodApiError, food_entry, search_foods
+from utils.meal_store import append_entries
+
+# -------------------- BACKGROUND FOOD LOOKUPS --------------------
+# "Add Food" on the meal pages only submits the USDA lookup to a worker pool and returns right away; the
+# page shows a placeholder for every pending lookup. When the response lands the worker saves the entries
+# (one append_entries() call) and marks the lookup as done or failed; the page picks the finished lookups up
+# with take_finished() and reports them. Lookups are kept per process like the USDA result cache, finished
+# ones that no page picks up (the session was closed) are dropped after FINISHED_TTL seconds.
+LOOKUP_WORKERS = 4
+FINISHED_TTL = 600      # seconds
+
+_pool = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix="food-lookup")
+_jobs = OrderedDict()   # id -> lookup dict, in the order of submission
+_jobs_lock = threading.Lock()
+
+
+def _finish(job, status, entries=(), error=None):
+    with _jobs_lock:
+        job.update(status=status, entries=list(entries), error=error, finished=time.monotonic())
+
+
+def _run(job):
+    try:
+        foods = search_foods(job["query"])
+        if not foods:
+            _finish(job, "not_found", error=f"No food found for '{job['query']}'.")
+            return
+        entries = [food_entry(food, job["date"], job["category"], job["quantity"]) for food in foods]
+        append_entries(job["profile_id"], entries)
+        record_foods(job["profile_id"], [(food, job["quantity"]) for food in foods])
+        _finish(job, "done", entries)
+    except FoodApiError as e:
+        _finish(job, "failed", error=f"Error fetching data from USDA API. {e}")
+    except Exception as e:     # a worker must never leave a lookup pending forever
+        _finish(job, "failed", error=f"The food could not be saved: {e}")
+
+
+def _prune(now):
+    for job_id, job in list(_jobs.items()):
+        if job["status"] != "pending" and now - job["finished"] > FINISHED_TTL:
+            del _jobs[job_id]
+
+
+def submit_lookup(profile_id, query, date_key, category, quantity):
+    # Returns the lookup at once: {"id", "query", "date", "category", "quantity", "status": "pending", ...}
+    job = {"id": uuid.uuid4().hex, "profile_id": profile_id, "query": query, "date": date_key,
+           "category": category, "quantity": quantity, "status": "pending", "entries": [], "error": None,
+           "finished": None}
+    with _jobs_lock:
+        _prune(time.monotonic())
+        _jobs[job["id"]] = job
+    _pool.submit(_run, job)
+    return dict(job)
+
+
+def _matches(job, profile_id, category):
+    return job["profile_id"] == profile_id and (category is None or job["category"] == category)
+
+
+def pending_lookups(profile_id, category=None):
+    with _jobs_lock:
+        return [dict(job) for job in _jobs.values() if job["status"] == "pending" and _matches(job, profile_id, category)]
+
+
+def has_lookups(profile_id, category=None):
+    # Pending or finished but not taken yet
+    with _jobs_lock:
+        return any(_matches(job, profile_id, category) for job in _jobs.values())
+
+
+def take_finished(profile_id, category=None):
+    # Finished lookups (done, not_found or failed) of the user, each one is returned only once
+    with _jobs_lock:
+        finished = [job for job in _jobs.values() if job["status"] != "pending" and _matches(job, profile_id, category)]
+        for job in finished:
+            del _jobs[job["id"]]
+    return finished
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,298 @@
+from datetime import date
+
+import streamlit as st
+
+from utils.favorites import quick_add, top_foods
+from utils.instrumentation import set_page
+from utils.lookups import has_lookups, pending_lookups, submit_lookup, take_finished
+from utils.meal_store import delete_entries, delete_entry, load_day
+from utils.memory import track_session
+from utils.profiler import render_page_profile, start_page_profile
+from utils.session import get_profile_id
+from utils.targets import daily_targets
+from utils.templates import (WEEKDAYS, apply_schedules, delete_template, load_templates, log_template,
+                             save_template, set_schedule, template_from_entries, template_totals)
+from utils.theme import apply_theme
+
+# -------------------- MEAL PAGE ENGINE --------------------
+# The four "Calories Tracker - <meal>.py" pages only call render_meal_page("<meal>"). Everything that
+# is expensive to set up (HTTP session, food search cache, profile targets) lives in this module and
+# is therefore created once per process and shared by all four pages, instead of once per page.
+# Session state of the pages is kept per category under st.session_state["meal_pages"].
+# "Add Food" never waits for USDA: the lookup runs in the background (utils/lookups.py) and a small
+# fragment polls it every LOOKUP_POLL_SECONDS while it is pending.
+
+MEAL_PAGES = {
+    "Breakfast": {"page": "pages/Calories Tracker - Breakfast.py", "icon": "☕", "search_icon": "🍎",
+                  "placeholder": "E.g. Apple,Banana, Coffee"},
+    "Lunch": {"page": "pages/Calories Tracker - Lunch.py", "icon": "🥗", "search_icon": "🥗",
+              "placeholder": "E.g. Salad, Rice, Broccoli"},
+    "Dinner": {"page": "pages/Calories Tracker - Dinner.py", "icon": "🍝", "search_icon": "🍝",
+               "placeholder": "E.g. Chicken, Salmon, Potatoes"},
+    "Snack": {"page": "pages/Calories Tracker - Snack.py", "icon": "🍫", "search_icon": "🍫",
+              "placeholder": "E.g. Protein Bar Almonds, Yogurt"},
+}
+
+LOOKUP_POLL_SECONDS = 1.0
+
+BAR_NUTRIENTS = [  # (label, key in the entries, key in the targets, color)
+    ("Carbohydrates", "carbohydrates", "carbs", "#4caf50"),
+    ("Proteins", "protein", "protein", "#2196f3"),
+    ("Fats", "fat", "fat", "#ff9800"),
+]
+
+# -------------------- SESSION STATE --------------------
+def _page_state(category):
+    pages = st.session_state.setdefault("meal_pages", {})
+    return pages.setdefault(category, {})
+
+
+def _remember_date(key):
+    # The selected day is shared by all meal pages, switching from breakfast to lunch keeps it
+    st.session_state["meal_pages_date"] = st.session_state[key]
+
+
+def _delete_day(profile_id, date_key, category):
+    # Runs as button callback before the rerun, so the list below is already up to date
+    delete_entries(profile_id, date_key, category)
+    _page_state(category)["deleted"] = date_key
+
+
+def _delete_meal(profile_id, entry_id, category):
+    if delete_entry(profile_id, entry_id):
+        _page_state(category)["deleted_meal"] = entry_id
+
+def _quick_add(profile_id, key, date_key, category):
+    entry = quick_add(profile_id, key, date_key, category)
+    if entry is not None:
+        _page_state(category)["quick_added"] = (entry["recipe_title"], date_key)
+
+
+def _log_template(profile_id, template_id, date_key, category):
+    entries = log_template(profile_id, template_id, date_key, category)
+    _page_state(category)["template_logged"] = (len(entries), date_key)
+
+
+def _save_day_as_template(profile_id, date_key, category):
+    ns = category.lower()
+    name = st.session_state.get(f"{ns}_template_name", "").strip() or f"My {ns}"
+    save_template(profile_id, template_from_entries(name, category, load_day(profile_id, date_key, category)))
+    _page_state(category)["template_saved"] = name
+
+# -------------------- RENDERING --------------------
+def _nutrient_bar(label, value, max_value, color):
+    bar_color = color if value <= max_value else "#ff5252"
+    st.markdown(f"""
+        <div style="margin-bottom: 10px;">
+            <strong>{label}</strong>
+            <div style="background-color: #e0e0e0; border-radius: 5px; overflow: hidden; height: 20px; width: 100%;">
+                <div style="background-color: {bar_color}; width: {min(value / max_value * 100, 100)}%; height: 100%;"></div>
+            </div>
+            <span>{value:.2f} / {max_value} g</span>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+def _auto_refresh(func):
+    # st.fragment (Streamlit >= 1.37) reruns only this block; older versions update on the next interaction
+    fragment = getattr(st, "fragment", None)
+    return fragment(run_every=LOOKUP_POLL_SECONDS)(func) if fragment else func
+
+
+@_auto_refresh
+def _lookup_status(profile_id, category):
+    # Placeholders of the pending lookups; once one has landed the whole page reruns to show the new entries
+    finished = take_finished(profile_id, category)
+    if finished:
+        _page_state(category).setdefault("lookups", []).extend(finished)
+        st.rerun()
+    for job in pending_lookups(profile_id, category):
+        st.info(f"⏳ {job['query']} ({job['quantity']} g) for {job['date']}: looking up the nutritional values…")
+
+
+def _lookup_results(category):
+    # Outcome of the lookups that finished since the last run
+    for job in _page_state(category).pop("lookups", []):
+        if job["status"] == "done":
+            for entry in job["entries"]:
+                st.success(f"Added {entry['recipe_title']} to {entry['selected_date']}!")
+        elif job["status"] == "not_found":
+            st.warning(job["error"])
+        else:
+            st.error(job["error"])
+
+
+def _quick_add_buttons(profile_id, category, date_key):
+    # The foods added most often lately, logged from their stored values without a USDA request
+    ns = category.lower()
+    added = _page_state(category).pop("quick_added", None)
+    if added:
+        st.success(f"Added {added[0]} to {added[1]}!")
+    favorites = top_foods(profile_id)
+    if not favorites:
+        return
+    st.markdown("**⚡ Quick add**")
+    for column, (key, food, quantity) in zip(st.columns(len(favorites)), favorites):
+        with column:
+            st.button(food.description, key=f"{ns}_quick_{key}", help=f"{quantity:g} g, {food.calories * quantity / 100:.0f} kcal",
+                      on_click=_quick_add, args=(profile_id, key, date_key, category), use_container_width=True)
+
+
+def _show_templates(profile_id, category, date_key):
+    # Templates carry their nutrition, logging one is a single write without any USDA request
+    ns = category.lower()
+    state = _page_state(category)
+    logged = state.pop("template_logged", None)
+    if logged:
+        st.success(f"Logged {logged[0]} foods to {logged[1]}!")
+    saved = state.pop("template_saved", None)
+    if saved:
+        st.success(f"Template '{saved}' saved!")
+
+    templates = {t["id"]: t for t in load_templates(profile_id)}
+    with st.expander("📋 Meal Templates"):
+        if templates:
+            template_id = st.selectbox(
+                "Template:", list(templates), key=f"{ns}_template",
+                format_func=lambda i: f"{templates[i]['name']} ({template_totals(templates[i])['calories']:.0f} kcal)")
+            template = templates[template_id]
+            st.caption(", ".join(item["title"] for item in template["items"]))
+            st.button(f"➕ Log to {date_key}", key=f"{ns}_log_template",
+                      on_click=_log_template, args=(profile_id, template_id, date_key, category))
+            weekdays = st.multiselect("Repeat every:", range(7), default=template["weekdays"],
+                                      format_func=WEEKDAYS.__getitem__, key=f"{ns}_template_days_{template_id}")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button("🔁 Save repetition", key=f"{ns}_template_schedule",
+                          on_click=set_schedule, args=(profile_id, template_id, weekdays))
+            with col2:
+                st.button("🗑️ Delete template", key=f"{ns}_template_delete",
+                          on_click=delete_template, args=(profile_id, template_id))
+        else:
+            st.info("No templates yet.")
+
+        if load_day(profile_id, date_key, category):
+            st.text_input("Name of the new template:", placeholder=f"My {ns}", key=f"{ns}_template_name")
+            st.button(f"💾 Save the {ns} of {date_key} as template", key=f"{ns}_template_save",
+                      on_click=_save_day_as_template, args=(profile_id, date_key, category))
+
+
+def _show_meals(profile_id, category, date_key, max_values):
+    ns = category.lower()
+    meals_today = load_day(profile_id, date_key, category)
+    state = _page_state(category)
+    if state.pop("deleted", None) == date_key:
+        st.success("Meals deleted!")
+    if state.pop("deleted_meal", None):
+        st.success("Meal deleted!")
+
+    if not meals_today:
+        st.info("No meals saved for this date.")
+        return
+
+    # The entries are selected by id, two meals with the same title stay two options
+    meals_by_id = {m["id"]: m for m in meals_today}
+    titles = [m["recipe_title"] for m in meals_today]
+    labels = {m["id"]: m["recipe_title"] if titles.count(m["recipe_title"]) == 1 else f"{m['recipe_title']} ({i + 1})"
+              for i, m in enumerate(meals_today)}
+    selected_id = st.selectbox("Select a saved meal to view its nutritional values:", list(meals_by_id),
+                               format_func=labels.get, key=f"{ns}_selected_meal")
+    selected_meal = meals_by_id[selected_id]
+    nutrition = selected_meal["nutrition"]
+
+    # Display the selected meal's nutritional values
+    with st.expander("View Nutritional Information"):
+        st.write(f"- **Calories**: {nutrition['calories']} kcal")
+        st.write(f"- **Protein**: {nutrition['protein']} g")
+        st.write(f"- **Fat**: {nutrition['fat']} g")
+        st.write(f"- **Carbohydrates**: {nutrition['carbohydrates']} g")
+        st.button("🗑️ Delete this meal", key=f"{ns}_delete_meal",
+                  on_click=_delete_meal, args=(profile_id, selected_id, category))
+
+    # Display the nutritional values in a bar chart
+    with st.expander("Show Total Nutritional Information"):
+        totals = {key: sum(m["nutrition"][key] for m in meals_today)
+                  for key in ("calories", "protein", "fat", "carbohydrates")}
+
+        st.write("### Total Nutritional Information:")
+        st.write(f"- **Total Calories**: {totals['calories']:.2f} kcal")
+        st.write(f"- **Total Protein**: {totals['protein']:.2f} g")
+        st.write(f"- **Total Fat**: {totals['fat']:.2f} g")
+        st.write(f"- **Total Carbohydrates**: {totals['carbohydrates']:.2f} g")
+
+        for label, key, goal_key, color in BAR_NUTRIENTS:
+            _nutrient_bar(label, totals[key], max_values[goal_key], color)
+
+    # Button to delete all meals of this category for the selected date
+    st.button(f"🗑️ Delete all {ns} meals for this date", key=f"{ns}_delete",
+              on_click=_delete_day, args=(profile_id, date_key, category))
+
+
+def render_meal_page(category):
+    config = MEAL_PAGES[category]
+    ns = category.lower()
+    set_page(f"Calories Tracker - {category}")
+    track_session(f"Calories Tracker - {category}")
+    page_profile = start_page_profile(f"Calories Tracker - {category}")
+    profile_id = get_profile_id()
+    apply_schedules(profile_id)     # recurring templates that are due, nothing to do on most reruns
+
+    # -------------------- STYLES CSS --------------------
+    apply_theme("base", "no_sidebar")
+
+    # -------------------- PAGE TITLE --------------------
+    st.markdown(f'<p class="title">{category} Nutrition Tracker</p>', unsafe_allow_html=True)
+    st.markdown('<div class="description">Enter a food item and its quantity to calculate your daily nutritional intake. Nutri Mentor analyzes calories, proteins, fats, and carbohydrates instantly, helping you make informed dietary choices every day.</p>', unsafe_allow_html=True)
+
+    # -------------------- BUTTON TO GO BACK TO CALORIE TRACKER --------------------
+    if st.button("Go Back to Calorie Tracker", key="go_back_button"):
+        st.switch_page("pages/Calories Tracker.py")
+
+    st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
+
+    # -------------------- CALENDAR --------------------
+    st.markdown(f"<div style='text-align: center;'><h2 class='subtitle'>📅 Select the Day for Your {category}'s Entries</h2></div>", unsafe_allow_html=True)
+    selected_date = st.date_input("Select a date for your meal:",
+                                  value=st.session_state.get("meal_pages_date", date.today()),
+                                  min_value=date(2000, 1, 1), max_value=date(2100, 12, 31),
+                                  key=f"{ns}_date", on_change=_remember_date, args=(f"{ns}_date",))
+    date_key = selected_date.strftime("%Y-%m-%d")
+
+    # -------------------- DAILY TARGETS --------------------
+    max_values = daily_targets(profile_id)    # cached per version of the profile (utils/targets.py)
+
+    # -------------------- SEARCH FOR FOOD BAR --------------------
+    st.markdown(f"<h2 class='subtitle' style='text-align: center; color: green;'>{config['search_icon']} Search for Food Items</h2>", unsafe_allow_html=True)
+    food_query = st.text_input("Search for a food", placeholder=config["placeholder"], key=f"{ns}_food_query")
+    quantity = st.number_input("Enter the consumed quantity (in grams or ml):", min_value=1, value=100, step=1,
+                               key=f"{ns}_quantity")
+
+    if st.button("Add Food", key=f"{ns}_add_food") and food_query:
+        submit_lookup(profile_id, food_query, date_key, category, quantity)
+    _lookup_results(category)
+    if has_lookups(profile_id, category):
+        _lookup_status(profile_id, category)
+    _quick_add_buttons(profile_id, category, date_key)
+
+    _show_templates(profile_id, category, date_key)
+
+    st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
+
+    # -------------------- RESULTS SECTION --------------------
+    st.markdown("<h2 class='subtitle' style='text-align: center; color: green;'>📊 Total Nutritional Values</h2>", unsafe_allow_html=True)
+    _show_meals(profile_id, category, date_key, max_values)
+
+    st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
+
+    # -------------------- NAVIGATION BUTTONS --------------------
+    st.markdown("<h2 class='subtitle' style='text-align: center; color: green; margin-bottom: 10px;'>🍽️ Navigate to Other Meals</h2>", unsafe_allow_html=True)
+    others = [name for name in MEAL_PAGES if name != category]
+    for column, name in zip(st.columns(len(others)), others):
+        with column:
+            if st.button(f"{MEAL_PAGES[name]['icon']} {name}", key=f"{ns}_to_{name.lower()}"):
+                st.switch_page(MEAL_PAGES[name]["page"])
+
+    st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
+    render_page_profile(page_profile)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,400 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.instrumentation import timed
+from utils.storage import CALENDAR_FILE, atomic_path, read_json, user_file, user_lock, write_json
+
+# -------------------- LAYOUT --------------------
+# Meal history of a user is split into one file per month:
+#   <user partition>/meals/2025-05.json
+# A page only ever loads the month(s) it shows, so a rerun costs the same for a user with one
+# week of history as for one with ten years.
+# Every entry has an "id" (uuid4 hex). <user partition>/meals/index.log maps the ids to their month
+# ("<id> <month>" per line, "<id> -" once deleted); logging a meal only appends to it, and
+# update_entry() / delete_entry() rewrite only the month file of that entry. Once more than half of its
+# lines (and at least INDEX_COMPACT_MIN_DEAD) belong to moved or deleted entries it is rewritten with only
+# the live ids. Every new index file starts with "# <random generation>", so a cached index is never
+# mistaken for the one of a file that was recreated (cleared history, compaction, another process).
+MEALS_DIR = "meals"
+INDEX_FILE = "index.log"
+INDEX_COMPACT_MIN_DEAD = 1000
+
+# Months kept in memory for the whole process (all users together). Each month holds at most a
+# few hundred entries, so this caps the memory of the meal history no matter how long it is.
+MONTH_CACHE_SIZE = 256
+# Id indexes kept in memory (users), ~100 bytes per entry of the history
+INDEX_CACHE_SIZE = 64
+
+_cache = OrderedDict()      # path -> (version, entries)
+_cache_lock = threading.Lock()
+_index_cache = OrderedDict()    # path -> [(inode, generation), bytes read, {id: month}, lines read]
+_index_lock = threading.Lock()
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="meal-prefetch")
+
+# -------------------- KEYS AND PATHS --------------------
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def month_key_of(date_str):
+    return date_str[:7]     # "2025-05-15" -> "2025-05"
+
+
+def adjacent_months(year, month):
+    previous = (year - 1, 12) if month == 1 else (year, month - 1)
+    following = (year + 1, 1) if month == 12 else (year, month + 1)
+    return previous, following
+
+
+def meals_dir(profile_id):
+    return user_file(profile_id, MEALS_DIR)
+
+
+def month_path(profile_id, key):
+    return os.path.join(meals_dir(profile_id), f"{key}.json")
+
+
+def index_path(profile_id):
+    return os.path.join(meals_dir(profile_id), INDEX_FILE)
+
+
+def new_entry_id():
+    return uuid.uuid4().hex
+
+# -------------------- MIGRATION OF THE OLD SINGLE FILE --------------------
+def _ensure_partitioned(profile_id):
+    # The meals folder doubles as "already migrated" marker, so the old calendar_recipes.json
+    # is only split up once and never read again afterwards.
+    folder = meals_dir(profile_id)
+    if os.path.isdir(folder):
+        return
+    with user_lock(profile_id):
+        if os.path.isdir(folder):
+            return
+        legacy = read_json(user_file(profile_id, CALENDAR_FILE), [])
+        by_month = {}
+        for entry in legacy:
+            by_month.setdefault(month_key_of(entry["selected_date"]), []).append(entry)
+        for key, entries in by_month.items():
+            write_json(month_path(profile_id, key), entries, indent=4)
+        os.makedirs(folder, exist_ok=True)
+
+
+def _ensure_index(profile_id):
+    # Entries saved before there were ids get one, once per user; the index file is the marker
+    _ensure_partitioned(profile_id)
+    path = index_path(profile_id)
+    if os.path.exists(path):
+        return
+    with user_lock(profile_id):
+        if os.path.exists(path):
+            return
+        lines = []
+        for key in list_months(profile_id):
+            month = month_path(profile_id, key)
+            entries = _load_path(month, use_cache=False)
+            missing = [entry for entry in entries if "id" not in entry]
+            for entry in missing:
+                entry["id"] = new_entry_id()
+            if missing:
+                _write_month(month, entries, use_cache=False)
+            lines.extend(f"{entry['id']} {key}\n" for entry in entries)
+        _write_index(path, lines)
+
+# -------------------- ID INDEX --------------------
+def _write_index(path, lines):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            f.write(f"# {uuid.uuid4().hex}\n")
+            f.writelines(lines)
+
+
+def _generation(f):
+    # First line of the index file; files written before there were generations have none
+    first = f.readline(64)
+    return first if first.startswith(b"#") else b""
+
+
+def _index_state(profile_id):
+    # The cached [(inode, generation), bytes read, {id: month}, lines read] of a user. Only the lines appended
+    # since the last call are read; a recreated file (another inode or generation) is read from the start.
+    _ensure_index(profile_id)
+    path = index_path(profile_id)
+    stat = os.stat(path)
+    with _index_lock, open(path, "rb") as f:
+        identity = (stat.st_ino, _generation(f))
+        cached = _index_cache.get(path)
+        if cached is None or cached[0] != identity or cached[1] > stat.st_size:
+            cached = [identity, 0, {}, 0]
+        if cached[1] < stat.st_size:
+            f.seek(cached[1])
+            data = f.read(stat.st_size - cached[1])
+            complete = data.rfind(b"\n") + 1   # a line that is still being written is read next time
+            index = cached[2]
+            for line in data[:complete].decode("ascii").splitlines():
+                if line.startswith("#"):
+                    continue
+                entry_id, _, key = line.partition(" ")
+                if key == "-":
+                    index.pop(entry_id, None)
+                else:
+                    index[entry_id] = key
+                cached[3] += 1
+            cached[1] += complete
+        _index_cache[path] = cached
+        _index_cache.move_to_end(path)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+        return cached
+
+
+def _index(profile_id):
+    # {id: month} of a user
+    return _index_state(profile_id)[2]
+
+
+def _log_index(profile_id, pairs):
+    # pairs: (id, month or "-"); called with the user lock held
+    with open(index_path(profile_id), "a") as f:
+        f.writelines(f"{entry_id} {key}\n" for entry_id, key in pairs)
+
+
+def _compact_index(profile_id):
+    # Called with the user lock held, after lines of moved or deleted entries were logged
+    state = _index_state(profile_id)
+    with _index_lock:
+        live = dict(state[2])
+        dead = state[3] - len(live)
+    if dead < max(INDEX_COMPACT_MIN_DEAD, len(live)):
+        return
+    path = index_path(profile_id)
+    _write_index(path, [f"{entry_id} {key}\n" for entry_id, key in live.items()])
+    with _index_lock:
+        _index_cache.pop(path, None)
+
+
+def _position(entries, entry_id):
+    return next((i for i, entry in enumerate(entries) if entry.get("id") == entry_id), None)
+
+# -------------------- READING --------------------
+def _version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@timed("meal_month_load")
+def _load_path(path, use_cache=True):
+    version = _version(path)
+    if version is None:
+        return []
+    if use_cache:
+        with _cache_lock:
+            cached = _cache.get(path)
+            if cached and cached[0] == version:
+                _cache.move_to_end(path)
+                return cached[1]
+    entries = read_json(path, [])
+    if use_cache:
+        _remember(path, version, entries)
+    return entries
+
+
+def _remember(path, version, entries):
+    with _cache_lock:
+        _cache[path] = (version, entries)
+        _cache.move_to_end(path)
+        while len(_cache) > MONTH_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def load_month(profile_id, year, month):
+    # Returns a new list, the cached one must not be changed by the pages
+    _ensure_partitioned(profile_id)
+    return list(_load_path(month_path(profile_id, month_key(year, month))))
+
+
+def month_version(profile_id, year, month):
+    # Changes whenever the month file is rewritten, used as cache key for derived data
+    _ensure_partitioned(profile_id)
+    return _version(month_path(profile_id, month_key(year, month)))
+
+
+def load_day(profile_id, date_str, category=None):
+    _ensure_index(profile_id)   # the pages select and delete the entries of a day by id
+    entries = _load_path(month_path(profile_id, month_key_of(date_str)))
+    return [m for m in entries if m["selected_date"] == date_str and (category is None or m["meal_category"] == category)]
+
+
+def prefetch_months(profile_id, months):
+    # Loads (year, month) pairs into the cache in the background, e.g. the months next to the
+    # one shown in the calendar, so paging with previous/next finds them already parsed.
+    _ensure_partitioned(profile_id)
+    for year, month in months:
+        _prefetch_pool.submit(_load_path, month_path(profile_id, month_key(year, month)))
+
+
+def list_months(profile_id):
+    _ensure_partitioned(profile_id)
+    try:
+        names = os.listdir(meals_dir(profile_id))
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith(".json"))
+
+
+def iter_entries(profile_id, start=None, end=None):
+    # Walks the history one month at a time, without filling the month cache.
+    # start / end ("YYYY-MM-DD", inclusive) skip the months outside the range without reading them.
+    for key in list_months(profile_id):
+        if (start and key < start[:7]) or (end and key > end[:7]):
+            continue
+        for entry in _load_path(month_path(profile_id, key), use_cache=False):
+            if (start is None or entry["selected_date"] >= start) and (end is None or entry["selected_date"] <= end):
+                yield entry
+
+
+def page_entries(profile_id, cursor=None, limit=20, start=None, end=None, category=None):
+    # One page of the history, newest first, for the listings. Keyset pagination: cursor is the
+    # (date, id) of the last entry of the previous page, so adding or deleting entries between two pages
+    # never shifts the next one. The next page starts in that entry's month file and only reads as many
+    # month files as it needs to fill up. Entries of the same day are ordered by id.
+    # Returns (entries, cursor of the next page or None on the last page).
+    _ensure_index(profile_id)   # every entry has an id
+    months = [key for key in reversed(list_months(profile_id))
+              if (not start or key >= start[:7]) and (not end or key <= end[:7])
+              and (not cursor or key <= month_key_of(cursor[0]))]
+    cursor = tuple(cursor) if cursor else None
+    page, last = [], None
+    for key in months:
+        for entry in sorted(_load_path(month_path(profile_id, key)),
+                            key=lambda entry: (entry["selected_date"], entry["id"]), reverse=True):
+            position = (entry["selected_date"], entry["id"])
+            if cursor and position >= cursor:
+                continue
+            if start and position[0] < start:
+                return page, None   # everything that follows is older
+            if (end and position[0] > end) or (category and entry["meal_category"] != category):
+                continue
+            if len(page) == limit:
+                return page, last
+            page.append(entry)
+            last = position
+    return page, None
+
+
+def get_entry(profile_id, entry_id):
+    key = _index(profile_id).get(entry_id)
+    if key is None:
+        return None
+    entries = _load_path(month_path(profile_id, key))
+    i = _position(entries, entry_id)
+    return None if i is None else entries[i]
+
+# -------------------- WRITING --------------------
+@timed("meal_month_write")
+def _write_month(path, entries, use_cache=True):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=4)
+    if use_cache:
+        _remember(path, _version(path), entries)
+
+
+def append_entries(profile_id, entries, use_cache=True):
+    # Groups the new entries by month, so each touched month file is rewritten once.
+    # use_cache=False for bulk writes (utils/importer.py) that should not fill the month cache.
+    # Entries without an "id" get a new one (set on the given dicts, so the caller knows it).
+    _ensure_index(profile_id)
+    by_month = {}
+    for entry in entries:
+        entry.setdefault("id", new_entry_id())
+        by_month.setdefault(month_key_of(entry["selected_date"]), []).append(entry)
+    with user_lock(profile_id):
+        for key, new_entries in by_month.items():
+            path = month_path(profile_id, key)
+            _write_month(path, list(_load_path(path, use_cache)) + new_entries, use_cache)
+            _log_index(profile_id, [(entry["id"], key) for entry in new_entries])
+
+
+def append_entry(profile_id, entry):
+    append_entries(profile_id, [entry])
+
+
+def update_entry(profile_id, entry_id, changes):
+    # Changes some fields of one entry, returns the updated entry or None for an unknown id.
+    # A new "selected_date" in another month moves the entry to that month file.
+    with user_lock(profile_id):
+        key = _index(profile_id).get(entry_id)
+        if key is None:
+            return None
+        path = month_path(profile_id, key)
+        entries = list(_load_path(path))
+        i = _position(entries, entry_id)
+        if i is None:
+            return None
+        updated = {**entries[i], **changes, "id": entry_id}
+        new_key = month_key_of(updated["selected_date"])
+        if new_key == key:
+            entries[i] = updated
+            _write_month(path, entries)
+        else:
+            del entries[i]
+            _write_month(path, entries)
+            target = month_path(profile_id, new_key)
+            _write_month(target, list(_load_path(target)) + [updated])
+            _log_index(profile_id, [(entry_id, new_key)])
+            _compact_index(profile_id)
+    return updated
+
+
+def delete_entry(profile_id, entry_id):
+    # Returns False for an unknown id
+    with user_lock(profile_id):
+        key = _index(profile_id).get(entry_id)
+        if key is None:
+            return False
+        path = month_path(profile_id, key)
+        entries = list(_load_path(path))
+        i = _position(entries, entry_id)
+        if i is not None:
+            del entries[i]
+            _write_month(path, entries)
+        _log_index(profile_id, [(entry_id, "-")])
+        _compact_index(profile_id)
+    return i is not None
+
+
+def delete_entries(profile_id, date_str, category):
+    _ensure_index(profile_id)
+    path = month_path(profile_id, month_key_of(date_str))
+    with user_lock(profile_id):
+        entries = _load_path(path)
+        kept = [m for m in entries if not (m["selected_date"] == date_str and m["meal_category"] == category)]
+        if len(kept) != len(entries):
+            _write_month(path, kept)
+            _log_index(profile_id, [(m["id"], "-") for m in entries
+                                    if m["selected_date"] == date_str and m["meal_category"] == category])
+            _compact_index(profile_id)
+
+
+def clear_history(profile_id):
+    _ensure_partitioned(profile_id)
+    with user_lock(profile_id):
+        for key in list_months(profile_id):
+            path = month_path(profile_id, key)
+            os.remove(path)
+            with _cache_lock:
+                _cache.pop(path, None)
+        if os.path.exists(index_path(profile_id)):
+            os.remove(index_path(profile_id))
+        with _index_lock:
+            _index_cache.pop(index_path(profile_id), None)
+
+# Code developed with the help of ChatGPT and Copilot.
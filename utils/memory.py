@@ -0,0 +1,250 @@
+import atexit
+import gc
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+
+# -------------------- MEMORY DIAGNOSTICS --------------------
+# Per session memory accounting and leak detection, off by default:
+#   NUTRI_MEMDIAG=1                   size the session state of every run, take tracemalloc snapshots
+#   NUTRI_MEMDIAG_FILE=memory.json    write the report every NUTRI_MEMDIAG_INTERVAL seconds and at exit
+#   NUTRI_MEMDIAG_FRAMES=1            stack frames kept per allocation (more = exact sites, slower)
+#   NUTRI_SESSION_BUDGET_MB=5         session state above this size is reported as over budget
+# A page calls track_session("<page>") at the top. The session state is sized at the start of the next
+# run of the same session, so the size is counted for the page that produced it. Every interval a
+# tracemalloc snapshot is compared with the previous one; allocation sites that grew in each of the last
+# LEAK_WINDOW intervals by at least LEAK_MIN_BYTES in total are reported as suspected leaks.
+#
+#   python -m utils.memory memory.json     # print the per page budget table of a report
+ENABLED = os.getenv("NUTRI_MEMDIAG", "").lower() in ("1", "true", "yes", "on")
+REPORT_FILE = os.getenv("NUTRI_MEMDIAG_FILE")
+SNAPSHOT_INTERVAL = float(os.getenv("NUTRI_MEMDIAG_INTERVAL", "60"))
+TRACE_FRAMES = int(os.getenv("NUTRI_MEMDIAG_FRAMES", "1"))
+SESSION_BUDGET_BYTES = int(float(os.getenv("NUTRI_SESSION_BUDGET_MB", "5")) * 1024 * 1024)
+
+MAX_SESSIONS = 1000     # sessions kept in the report, the oldest are dropped
+TOP_KEYS = 5            # largest session state keys listed per session and page
+TOP_SITES = 20          # allocation sites listed per snapshot diff
+LEAK_WINDOW = 5         # consecutive growing snapshots before a site is a suspected leak
+LEAK_MIN_BYTES = 1024 * 1024
+
+_sessions = OrderedDict()   # session id -> {"page", "bytes", "keys", "time"}
+_pages = {}                 # page -> {"bytes": [state size after each run], "keys": {key: max bytes}}
+_growth = []                # top allocation sites of the last snapshot diff
+_site_history = {}          # "file:line" -> deque of sizes of the last LEAK_WINDOW + 1 snapshots
+_lock = threading.Lock()
+
+# -------------------- SIZES --------------------
+def deep_sizeof(obj, seen=None):
+    # Bytes held by obj and everything it contains; DataFrames and arrays report their own buffers.
+    # Objects reachable twice are counted once.
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage) and hasattr(obj, "dtypes"):     # pandas DataFrame / Series
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):      # numpy array
+        return int(obj.nbytes)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def _session_state_sizes():
+    import streamlit as st
+
+    # One "seen" set per key: a list shared by two keys counts for both, like it would if one were removed
+    return {str(key): deep_sizeof(value) for key, value in st.session_state.to_dict().items()}
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+# -------------------- SESSIONS --------------------
+def track_session(page):
+    if not ENABLED:
+        return
+    session_id = _session_id()
+    if session_id is None:
+        return
+    sizes = _session_state_sizes()
+    total = sum(sizes.values())
+    largest = dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:TOP_KEYS])
+    with _lock:
+        previous = _sessions.pop(session_id, None)
+        if previous is not None:
+            # The state now is what the previous run of this session left behind
+            stats = _pages.setdefault(previous["page"], {"bytes": deque(maxlen=MAX_SESSIONS), "keys": {}})
+            stats["bytes"].append(total)
+            for key, size in largest.items():
+                stats["keys"][key] = max(stats["keys"].get(key, 0), size)
+        _sessions[session_id] = {"page": page, "bytes": total, "keys": largest, "time": time.time()}
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+
+# -------------------- TRACEMALLOC --------------------
+def _site(stat):
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def take_snapshot(previous=None):
+    # Compares a new snapshot with `previous`, updates the growth list and the site history
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    sizes = {_site(stat): stat.size for stat in snapshot.statistics("lineno")}
+    growth = []
+    if previous is not None:
+        growth = [{"site": _site(stat), "size_diff_kb": round(stat.size_diff / 1024, 1),
+                   "size_kb": round(stat.size / 1024, 1), "count_diff": stat.count_diff}
+                  for stat in snapshot.compare_to(previous, "lineno")[:TOP_SITES] if stat.size_diff > 0]
+    with _lock:
+        _growth[:] = growth
+        for site in set(_site_history) | set(sizes):
+            history = _site_history.setdefault(site, deque(maxlen=LEAK_WINDOW + 1))
+            history.append(sizes.get(site, 0))
+            if not any(history):
+                del _site_history[site]     # freed completely, stop following it
+    return snapshot
+
+
+def suspected_leaks():
+    leaks = []
+    with _lock:
+        for site, history in _site_history.items():
+            sizes = list(history)
+            if len(sizes) <= LEAK_WINDOW:
+                continue
+            growing = all(after > before for before, after in zip(sizes, sizes[1:]))
+            if growing and sizes[-1] - sizes[0] >= LEAK_MIN_BYTES:
+                leaks.append({"site": site, "growth_kb": round((sizes[-1] - sizes[0]) / 1024, 1),
+                              "size_kb": round(sizes[-1] / 1024, 1)})
+    return sorted(leaks, key=lambda leak: leak["growth_kb"], reverse=True)
+
+
+def _open_figures():
+    # Charts use matplotlib.figure.Figure without pyplot, so figures are only alive while referenced
+    if "matplotlib.figure" not in sys.modules:
+        return 0
+    figure_class = sys.modules["matplotlib.figure"].Figure
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, figure_class))
+
+# -------------------- REPORT --------------------
+def rss_bytes():
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def budget_table():
+    # page -> state size after a run of that page (median, max), largest keys and runs over budget
+    with _lock:
+        pages = {page: (list(stats["bytes"]), dict(stats["keys"])) for page, stats in _pages.items()}
+    table = {}
+    for page, (sizes, keys) in sorted(pages.items()):
+        table[page] = {
+            "runs": len(sizes),
+            "median_kb": round(statistics.median(sizes) / 1024, 1) if sizes else 0,
+            "max_kb": round(max(sizes) / 1024, 1) if sizes else 0,
+            "budget_kb": round(SESSION_BUDGET_BYTES / 1024, 1),
+            "over_budget": sum(1 for size in sizes if size > SESSION_BUDGET_BYTES),
+            "largest_keys_kb": {key: round(size / 1024, 1)
+                                for key, size in sorted(keys.items(), key=lambda item: item[1], reverse=True)[:TOP_KEYS]},
+        }
+    return table
+
+
+def report():
+    with _lock:
+        sessions = {session_id: dict(info, keys={key: round(size / 1024, 1) for key, size in info["keys"].items()})
+                    for session_id, info in _sessions.items()}
+        growth = list(_growth)
+        over_budget = sorted(session_id for session_id, info in _sessions.items() if info["bytes"] > SESSION_BUDGET_BYTES)
+    traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    rss = rss_bytes()
+    return {
+        "time": time.time(),
+        "rss_mb": round(rss / 1024 / 1024, 1) if rss else None,
+        "traced_mb": round(traced / 1024 / 1024, 1),
+        "peak_traced_mb": round(peak / 1024 / 1024, 1),
+        "open_figures": _open_figures(),
+        "sessions_over_budget": over_budget,
+        "pages": budget_table(),
+        "growth": growth,
+        "suspected_leaks": suspected_leaks(),
+        "sessions": sessions,
+    }
+
+
+def write_report(path):
+    from utils.storage import atomic_path   # not at the top, keeps this module free of app imports
+
+    data = report()
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def format_budget_table(pages):
+    lines = [f"{'page':<36} {'runs':>6} {'median KB':>10} {'max KB':>10} {'over':>5}  largest keys"]
+    for page, row in pages.items():
+        keys = ", ".join(f"{key} {size:g}" for key, size in row["largest_keys_kb"].items())
+        lines.append(f"{page:<36} {row['runs']:>6} {row['median_kb']:>10g} {row['max_kb']:>10g} "
+                     f"{row['over_budget']:>5}  {keys}")
+    return "\n".join(lines)
+
+# -------------------- BACKGROUND --------------------
+def _snapshot_periodically(interval, path):
+    previous = None
+    while True:
+        time.sleep(interval)
+        previous = take_snapshot(previous)
+        if path:
+            write_report(path)
+
+
+def _start():
+    # Once per process, on the first import
+    tracemalloc.start(TRACE_FRAMES)
+    threading.Thread(target=_snapshot_periodically, args=(SNAPSHOT_INTERVAL, REPORT_FILE),
+                     name="memory-diagnostics", daemon=True).start()
+    if REPORT_FILE:
+        atexit.register(write_report, REPORT_FILE)
+
+
+if ENABLED:
+    _start()
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    print(format_budget_table(saved["pages"]))
+    for leak in saved["suspected_leaks"]:
+        print(f"suspected leak: {leak['site']} +{leak['growth_kb']} KB (now {leak['size_kb']} KB)")
+
+# Code developed with the help of ChatGPT and Copilot.
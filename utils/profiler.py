@@ -0,0 +1,181 @@
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+# -------------------- PAGE PROFILER --------------------
+# Profiles one full run of a page and shows the result at the bottom of that page: a table of the hottest
+# functions and downloads of a collapsed stack file (for flamegraph.pl, speedscope, ...) and of the
+# cProfile stats (for snakeviz). Off by default; switched on with the environment:
+#   NUTRI_PROFILE=1       every run of the instrumented pages is profiled
+#   NUTRI_PROFILE=query   only runs opened with ?profiler=cprofile or ?profiler=sample, so a slow page can be
+#                         profiled with the data of the user who reported it
+# Modes: "cprofile" (exact call counts and times + stack samples for the flame file) and "sample" (stack
+# samples only, much lower overhead). NUTRI_PROFILE_MODE sets the mode for NUTRI_PROFILE=1.
+# A page calls start_page_profile() at the top and render_page_profile() at the bottom. When profiling is
+# off, start_page_profile() returns None after one constant check and render_page_profile(None) returns.
+# Fragment reruns and runs ended early (st.rerun, st.switch_page, st.stop) are not reported.
+PROFILE_SETTING = os.getenv("NUTRI_PROFILE", "").lower()
+ENABLED = PROFILE_SETTING in ("1", "true", "yes", "on", "query")
+QUERY_ONLY = PROFILE_SETTING == "query"
+DEFAULT_MODE = os.getenv("NUTRI_PROFILE_MODE", "cprofile")
+SAMPLE_INTERVAL = float(os.getenv("NUTRI_PROFILE_INTERVAL_MS", "5")) / 1000
+
+QUERY_PARAM = "profiler"
+MODES = ("cprofile", "sample")
+TOP_FUNCTIONS = 30
+
+_running = threading.local()    # profile of the script run on this thread, if any
+
+# -------------------- STACK SAMPLER --------------------
+class _Sampler:
+    # Samples the stack of one thread every `interval` seconds from a background thread.
+    # Only frames from files below `root` (the app) and their callees are kept.
+    def __init__(self, thread_id, root, interval):
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = Counter()     # "outer;...;inner" -> samples
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="page-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _in_app(self, filename):
+        return filename.startswith(self.root) and "site-packages" not in filename   # a venv may live in the repo
+
+    def _label(self, code):
+        path = os.path.relpath(code.co_filename, self.root) if code.co_filename.startswith(self.root) else code.co_filename
+        return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return      # the script thread ended without render_page_profile (e.g. st.rerun)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            # Drop the Streamlit frames that execute the page script
+            start = next((i for i, code in enumerate(stack) if self._in_app(code.co_filename)), None)
+            if start is not None:
+                self.stacks[";".join(self._label(code) for code in stack[start:])] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def hot_functions(self, limit):
+        # Samples in which a function is on top (self) or anywhere on the stack (total)
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        samples = sum(self.stacks.values()) or 1
+        return [{"function": name, "self_samples": own[name], "total_samples": count,
+                 "total_%": round(100 * count / samples, 1)}
+                for name, count in total.most_common(limit)]
+
+# -------------------- ONE PROFILED RUN --------------------
+class PageProfile:
+    def __init__(self, page, mode):
+        self.page = page
+        self.mode = mode
+        self.wall_ms = None
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = _Sampler(threading.get_ident(), os.path.abspath(os.getcwd()) + os.sep, SAMPLE_INTERVAL)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._sampler.start()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self):
+        if self.wall_ms is not None:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+        self._sampler.stop()
+        self.wall_ms = round((time.perf_counter() - self._start) * 1000, 1)
+
+    def hot_functions(self, limit=TOP_FUNCTIONS):
+        if self._profile is None:
+            return self._sampler.hot_functions(limit)
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({"function": f"{name} ({os.path.basename(filename)}:{line})", "calls": calls,
+                         "self_ms": round(own * 1000, 2), "cumulative_ms": round(cumulative * 1000, 2)})
+        rows.sort(key=lambda row: row["self_ms"], reverse=True)
+        return rows[:limit]
+
+    def collapsed_stacks(self):
+        return self._sampler.collapsed()
+
+    def cprofile_stats(self):
+        # Same format as cProfile's dump_stats, readable with pstats.Stats(file) or snakeviz
+        if self._profile is None:
+            return None
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+# -------------------- PAGE API --------------------
+def _requested_mode():
+    if not QUERY_ONLY:
+        return DEFAULT_MODE if DEFAULT_MODE in MODES else "cprofile"
+    import streamlit as st
+
+    mode = st.query_params.get(QUERY_PARAM)
+    if not mode:
+        return None
+    return mode if mode in MODES else "cprofile"
+
+
+def start_page_profile(page):
+    if not ENABLED:
+        return None
+    # A run that ended early (st.rerun, st.switch_page) never reached render_page_profile
+    stale = getattr(_running, "profile", None)
+    if stale is not None:
+        stale.stop()
+    mode = _requested_mode()
+    if mode is None:
+        _running.profile = None
+        return None
+    profile = PageProfile(page, mode)
+    _running.profile = profile
+    profile.start()
+    return profile
+
+
+def render_page_profile(profile):
+    if profile is None:
+        return
+    profile.stop()
+    _running.profile = None
+    import streamlit as st
+
+    slug = profile.page.lower().replace(" ", "_")
+    with st.expander(f"⏱️ Profile of this run: {profile.wall_ms} ms ({profile.mode})", expanded=True):
+        st.dataframe(profile.hot_functions(), use_container_width=True)
+        st.download_button("Download flame graph (collapsed stacks)", profile.collapsed_stacks(),
+                           file_name=f"{slug}.collapsed.txt", mime="text/plain")
+        stats = profile.cprofile_stats()
+        if stats is not None:
+            st.download_button("Download cProfile stats", stats, file_name=f"{slug}.prof",
+                               mime="application/octet-stream")
+
+# Code developed with the help of ChatGPT and Copilot.
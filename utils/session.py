@@ -0,0 +1,24 @@
+import streamlit as st
+
+from utils.storage import is_valid_profile_id
+
+# -------------------- CURRENT USER --------------------
+# The profile id is created in profilecreation.py and kept in the session state.
+# It is mirrored to the "profile" query parameter so a reload (or a bookmark) keeps the same user.
+def get_profile_id():
+    profile_id = st.session_state.get("profile_id")
+    if not profile_id:
+        profile_id = st.query_params.get("profile")
+        if not is_valid_profile_id(profile_id):
+            return None     # no profile yet -> legacy single-user files
+        st.session_state["profile_id"] = profile_id
+    if st.query_params.get("profile") != profile_id:
+        st.query_params["profile"] = profile_id
+    return profile_id
+
+
+def set_profile_id(profile_id):
+    st.session_state["profile_id"] = profile_id
+    st.query_params["profile"] = profile_id
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+
+from utils.instrumentation import timed
+
+try:
+    import fcntl    # POSIX only; without it user_lock() only serializes the threads of one process
+except ImportError:
+    fcntl = None
+
+# -------------------- PATHS --------------------
+# Shared (read-only) files like styles.css and the sample API responses stay in "ressources".
+# Everything that belongs to a user lives in its own partition below USERS_DIR.
+RESSOURCES_DIR = "ressources"
+USERS_DIR = os.getenv("NUTRI_USERS_DIR", os.path.join(RESSOURCES_DIR, "users"))
+
+PROFILE_FILE = "profile_data.json"
+CALENDAR_FILE = "calendar_recipes.json"
+WEIGHT_FILE = "weight_data.csv"
+BODY_COMP_FILE = "body_composition.json"
+TEMPLATES_FILE = "meal_templates.json"
+FAVORITES_FILE = "favorite_foods.json"
+LOCK_FILE = ".lock"
+
+# Number of locks shared by all users. A fixed table keeps memory constant for any number of users,
+# two users only wait on each other when their ids hash to the same stripe.
+LOCK_STRIPES = 1024
+
+# -------------------- PROFILE IDS --------------------
+def new_profile_id():
+    return uuid.uuid4().hex   # 32 random hex chars, evenly spread over the directory buckets
+
+
+def is_valid_profile_id(profile_id):
+    # Ids end up in file paths, so only accept exactly what new_profile_id() produces
+    if not isinstance(profile_id, str) or len(profile_id) != 32:
+        return False
+    try:
+        int(profile_id, 16)
+    except ValueError:
+        return False
+    return True
+
+# -------------------- PARTITION LAYOUT --------------------
+# ressources/users/<ab>/<cd>/<profile_id>/profile_data.json
+# Two levels of 256 buckets each = 65536 leaf directories, so 100k users means ~2 entries per
+# directory instead of 100k entries in one. Without a profile id we fall back to the old
+# single-user files directly in "ressources".
+def user_dir(profile_id, root=None):
+    if not profile_id:
+        return RESSOURCES_DIR
+    if not is_valid_profile_id(profile_id):
+        raise ValueError(f"Invalid profile id: {profile_id!r}")
+    root = root or USERS_DIR
+    return os.path.join(root, profile_id[:2], profile_id[2:4], profile_id)
+
+
+def user_file(profile_id, name, root=None):
+    return os.path.join(user_dir(profile_id, root), name)
+
+# -------------------- LOCKING --------------------
+# Two levels: the threads of one process wait on a stripe lock, processes (the Streamlit app, every API
+# worker) on an flock of <user_dir>/.lock. The flock is taken once per thread and user, so nested
+# user_lock() calls (e.g. templates -> append_entries) do not deadlock on their own file lock.
+_locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+_held = {}   # (root, profile id) -> [depth, open lock file], only touched by the thread holding the stripe
+
+
+def _open_lock_file(profile_id, root):
+    path = user_file(profile_id, LOCK_FILE, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    f = open(path, "a")
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+    return f
+
+
+@contextmanager
+def user_lock(profile_id, root=None):
+    # Serializes read-modify-write cycles of one user across threads and processes; reentrant
+    key = (root, profile_id or "")
+    with _locks[zlib.crc32(key[1].encode()) % LOCK_STRIPES]:
+        held = _held.get(key)
+        if held is None:
+            held = _held[key] = [0, _open_lock_file(profile_id, root)]
+        held[0] += 1
+        try:
+            yield
+        finally:
+            held[0] -= 1
+            if not held[0]:
+                del _held[key]
+                held[1].close()    # closing the file releases the flock
+
+# -------------------- READ / WRITE HELPERS --------------------
+def read_json(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+@contextmanager
+def atomic_path(path):
+    # Yields a temporary path next to the target; it replaces the target only if the block succeeds,
+    # so readers never see a half written file.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@timed("write_json")
+def write_json(path, data, indent=None):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=indent)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,119 @@
+import functools
+import os
+
+from utils.storage import PROFILE_FILE, read_json, user_file
+
+# -------------------- DAILY TARGETS --------------------
+# Daily calorie and macro targets of a user, computed from the profile:
+#   BMR  (Mifflin-St Jeor) from weight, height, age and gender
+#   TDEE = BMR x activity factor
+#   calories = TDEE x goal factor, protein by body weight, fat as share of the calories, rest carbs
+# The profile is parsed and the targets computed once per version (mtime, size) of profile_data.json
+# and cached for the process, so pages only pay for one os.stat per rerun.
+# Profiles without weight or age (e.g. created before these fields existed) get the fixed goal table.
+DEFAULT_GOAL = "just eat Healthier :)"
+
+DEFAULT_TARGETS = {
+    "Build Muscle": {"calories": 2700, "protein": 180, "carbs": 350, "fat": 80},
+    "Lose Weight": {"calories": 1700, "protein": 135, "carbs": 300, "fat": 40},
+    "just eat Healthier :)": {"calories": 2200, "protein": 100, "carbs": 275, "fat": 70},
+}
+
+ACTIVITY_LEVELS = {
+    "Sedentary (little or no exercise)": 1.2,
+    "Lightly active (1-3 days per week)": 1.375,
+    "Moderately active (3-5 days per week)": 1.55,
+    "Very active (6-7 days per week)": 1.725,
+}
+DEFAULT_ACTIVITY = "Lightly active (1-3 days per week)"
+
+# Used when the profile has no height, average adult height
+DEFAULT_HEIGHT_CM = {"Male": 176, "Female": 163}
+DEFAULT_HEIGHT_CM_OTHER = 170
+
+GOAL_CALORIE_FACTOR = {"Lose Weight": 0.8, "Build Muscle": 1.1, DEFAULT_GOAL: 1.0}
+PROTEIN_G_PER_KG = {"Lose Weight": 1.8, "Build Muscle": 2.0, DEFAULT_GOAL: 1.2}
+FAT_SHARE = {"Lose Weight": 0.25, "Build Muscle": 0.25, DEFAULT_GOAL: 0.3}
+MIN_CALORIES = 1200
+
+PROFILE_FIELDS = ("name", "age", "gender", "goal", "diet", "weight", "height", "activity")
+
+# -------------------- FORMULAS --------------------
+def bmr_mifflin_st_jeor(weight_kg, height_cm, age, gender):
+    bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age
+    if gender == "Male":
+        return bmr + 5
+    if gender == "Female":
+        return bmr - 161
+    return bmr - 78     # mean of both constants for "Other" / not given
+
+
+def _positive_number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def compute_targets(profile):
+    goal = profile.get("goal") if profile.get("goal") in DEFAULT_TARGETS else None
+    weight = _positive_number(profile.get("weight"))
+    age = _positive_number(profile.get("age"))
+    result = {"goal": goal, "personalized": False}
+    if weight is None or age is None:
+        result.update(DEFAULT_TARGETS[goal or DEFAULT_GOAL])
+        return result
+
+    gender = profile.get("gender")
+    height = _positive_number(profile.get("height")) or DEFAULT_HEIGHT_CM.get(gender, DEFAULT_HEIGHT_CM_OTHER)
+    activity = ACTIVITY_LEVELS.get(profile.get("activity"), ACTIVITY_LEVELS[DEFAULT_ACTIVITY])
+    plan = goal or DEFAULT_GOAL
+
+    bmr = bmr_mifflin_st_jeor(weight, height, age, gender)
+    tdee = bmr * activity
+    calories = max(tdee * GOAL_CALORIE_FACTOR[plan], MIN_CALORIES)
+    protein = weight * PROTEIN_G_PER_KG[plan]
+    fat = calories * FAT_SHARE[plan] / 9
+    carbs = max(calories - protein * 4 - fat * 9, 0) / 4
+
+    result.update({
+        "calories": round(calories), "protein": round(protein), "carbs": round(carbs), "fat": round(fat),
+        "bmr": round(bmr), "tdee": round(tdee), "personalized": True,
+    })
+    return result
+
+# -------------------- CACHE --------------------
+def _profile_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _path_and_version(profile_id):
+    path = user_file(profile_id, PROFILE_FILE)
+    return path, _profile_version(path)
+
+
+@functools.lru_cache(maxsize=256)
+def _load(path, version):
+    # (profile, targets) for one version of the profile file; version is only the cache key
+    data = read_json(path, {}) if version is not None else {}
+    profile = {field: data.get(field) for field in PROFILE_FIELDS}
+    return profile, compute_targets(profile)
+
+
+def user_profile(profile_id):
+    # The profile fields the pages display, parsed once per file version
+    profile, _ = _load(*_path_and_version(profile_id))
+    return dict(profile)
+
+
+def daily_targets(profile_id):
+    # {"calories", "protein", "carbs", "fat", "goal", "personalized", ["bmr", "tdee"]}
+    _, targets = _load(*_path_and_version(profile_id))
+    return dict(targets)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,169 @@
+import functools
+import json
+import os
+import uuid
+from datetime import date, timedelta
+
+from utils.aggregates import NUTRITION_KEYS
+from utils.instrumentation import timed
+from utils.meal_store import append_entries
+from utils.storage import TEMPLATES_FILE, atomic_path, user_file, user_lock
+
+# -------------------- MEAL TEMPLATES --------------------
+# Named bundles of foods ("My usual breakfast") in meal_templates.json of a user. The nutrition of every
+# item is stored already scaled to its quantity, as a vector in the order of NUTRITION_KEYS, and the
+# template keeps the sum of its items: logging a template needs no USDA lookup, only one append_entries()
+# call (each touched month file is rewritten once), and its totals are a vector add done when it is saved.
+#
+# A template can recur on weekdays (0 = Monday): apply_schedules() logs it for every scheduled day from
+# the day after "logged_until" up to today, at most MAX_CATCH_UP_DAYS back, all templates in one write.
+TEMPLATES_CACHE_SIZE = 256
+MAX_CATCH_UP_DAYS = 31
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def templates_path(profile_id):
+    return user_file(profile_id, TEMPLATES_FILE)
+
+
+def _version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@functools.lru_cache(maxsize=TEMPLATES_CACHE_SIZE)
+def _load(path, version):
+    # Tuple of templates; version is only the cache key. The cached dicts must not be changed.
+    if version is None:
+        return ()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            templates = json.load(f)
+    except ValueError:
+        return ()
+    return tuple(templates) if isinstance(templates, list) else ()
+
+
+def load_templates(profile_id):
+    path = templates_path(profile_id)
+    return _load(path, _version(path))
+
+
+def get_template(profile_id, template_id):
+    return next((t for t in load_templates(profile_id) if t["id"] == template_id), None)
+
+
+@timed("write_templates")
+def _update(profile_id, change):
+    # change(list of templates) modifies the list in place; read past the cache like weights.add_weights
+    path = templates_path(profile_id)
+    with user_lock(profile_id):
+        templates = [dict(t) for t in _load.__wrapped__(path, _version(path))]
+        result = change(templates)
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(templates, f)
+    return result
+
+# -------------------- VECTORS --------------------
+def _vector(nutrition):
+    return [round(float(nutrition.get(key) or 0), 2) for key in NUTRITION_KEYS]
+
+
+def _add(vectors):
+    return [round(sum(values), 2) for values in zip(*vectors)] if vectors else [0.0] * len(NUTRITION_KEYS)
+
+
+def template_totals(template):
+    return dict(zip(NUTRITION_KEYS, template["nutrition"]))
+
+# -------------------- CREATING --------------------
+def new_template(name, category, items):
+    # items: [(title, quantity in g or None, {"calories": ..., ...} for that quantity)]
+    items = [{"title": title, "quantity": quantity, "nutrition": _vector(nutrition)}
+             for title, quantity, nutrition in items]
+    return {"id": uuid.uuid4().hex, "name": name, "category": category, "items": items,
+            "nutrition": _add([item["nutrition"] for item in items]), "weekdays": [], "logged_until": None}
+
+
+def template_from_entries(name, category, entries):
+    # The meals of a day as logged (utils/meal_store.py), their nutrition is already resolved
+    return new_template(name, category, [(e["recipe_title"], e.get("quantity"), e.get("nutrition") or {})
+                                         for e in entries])
+
+
+def save_template(profile_id, template):
+    # Adds the template or replaces the one with the same id
+    def change(templates):
+        templates[:] = [t for t in templates if t["id"] != template["id"]] + [template]
+    _update(profile_id, change)
+    return template
+
+
+def delete_template(profile_id, template_id):
+    def change(templates):
+        templates[:] = [t for t in templates if t["id"] != template_id]
+    _update(profile_id, change)
+
+
+def set_schedule(profile_id, template_id, weekdays, today=None):
+    # Recurs from today on (days before are never logged); an empty list stops the recurrence
+    today = today or date.today()
+
+    def change(templates):
+        for template in templates:
+            if template["id"] == template_id:
+                template["weekdays"] = sorted(set(weekdays))
+                template["logged_until"] = (today - timedelta(days=1)).isoformat()
+    _update(profile_id, change)
+
+# -------------------- LOGGING --------------------
+def template_entries(template, date_key, category=None):
+    # Meal entries of the template for one day, the stored vectors are copied as they are
+    category = category or template["category"]
+    return [{"recipe_title": item["title"], "selected_date": date_key, "meal_category": category,
+             "nutrition": dict(zip(NUTRITION_KEYS, item["nutrition"])), "template": template["id"]}
+            for item in template["items"]]
+
+
+@timed("log_template")
+def log_template(profile_id, template_id, date_key, category=None):
+    # Returns the logged entries (with their ids), [] for an unknown template
+    template = get_template(profile_id, template_id)
+    if template is None:
+        return []
+    entries = template_entries(template, date_key, category)
+    append_entries(profile_id, entries)
+    return entries
+
+
+def _due_days(template, today):
+    first = max(date.fromisoformat(template["logged_until"]) + timedelta(days=1),
+                today - timedelta(days=MAX_CATCH_UP_DAYS - 1))
+    return [first + timedelta(days=i) for i in range((today - first).days + 1)
+            if (first + timedelta(days=i)).weekday() in template["weekdays"]]
+
+
+def apply_schedules(profile_id, today=None):
+    # Logs the recurring templates that are due; cheap when nothing is due (the cached templates are checked
+    # without taking the lock). Returns the number of entries logged.
+    today = today or date.today()
+    if not any(t["weekdays"] and t["logged_until"] < today.isoformat() for t in load_templates(profile_id)):
+        return 0
+
+    def change(templates):
+        entries = []
+        for template in templates:
+            if template["weekdays"] and template["logged_until"] < today.isoformat():
+                for day in _due_days(template, today):
+                    entries.extend(template_entries(template, day.isoformat()))
+                template["logged_until"] = today.isoformat()
+        if entries:
+            append_entries(profile_id, entries)
+        return len(entries)
+    return _update(profile_id, change)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,199 @@
+import functools
+import hashlib
+import json
+import os
+import re
+
+from utils.assets import STATIC_DIR
+from utils.storage import atomic_path
+
+# -------------------- THEME --------------------
+# All page styles live in CSS files: ressources/styles.css (shared by the tracker, meal and recipe pages)
+# and one file per page in ressources/theme/. They are compiled into a single minified stylesheet in
+# which the rules of every source are scoped to a marker class, e.g. ".stApp" of the landing page
+# becomes ":root:has(.theme-landing) .stApp". A page only switches its scopes on with apply_theme(),
+# so the same file can be served to every page without the page styles overriding each other.
+#
+# With static serving enabled the stylesheet is written once per process to static/css/ with a content
+# hash in the name and every rerun only sends a <link> tag: the browser downloads the file once and
+# reuses it for every page and rerun. Otherwise the stylesheet is sent once per session: a zero-height
+# component puts it into the <head> of the app page, where it stays for every page and rerun of the
+# session, and the reruns only send the marker.
+THEME_DIR = os.path.join("ressources", "theme")
+CSS_DIR = os.path.join(STATIC_DIR, "css")
+
+# scope name -> source file
+SCOPES = {
+    "base": os.path.join("ressources", "styles.css"),
+    "no_sidebar": os.path.join(THEME_DIR, "no_sidebar.css"),
+    "landing": os.path.join(THEME_DIR, "landing.css"),
+    "profile_creation": os.path.join(THEME_DIR, "profile_creation.css"),
+    "profile_view": os.path.join(THEME_DIR, "profile_view.css"),
+    "data_visualization": os.path.join(THEME_DIR, "data_visualization.css"),
+}
+
+# -------------------- COMPILER --------------------
+def minify(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)   # comments
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)      # whitespace around punctuation
+    css = re.sub(r":\s+", ":", css)                    # "color: red" -> "color:red"
+    return css.replace(";}", "}").strip()
+
+
+def _block_end(css, start):
+    # Index of the "}" that closes the "{" at css[start]
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == "{":
+            depth += 1
+        elif css[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError("Unbalanced braces in stylesheet")
+
+
+def _scope_rules(css, prefix):
+    # Returns (imports, rules) of minified css with every selector prefixed
+    imports, rules = [], []
+    position = 0
+    while position < len(css):
+        if css.startswith("@import", position):
+            end = css.index(";", position) + 1
+            imports.append(css[position:end])
+            position = end
+            continue
+        brace = css.index("{", position)
+        end = _block_end(css, brace)
+        selector, body = css[position:brace], css[brace + 1:end]
+        if selector.startswith(("@media", "@supports")):
+            nested = _scope_rules(body, prefix)[1]
+            rules.append(f"{selector}{{{''.join(nested)}}}")
+        elif selector.startswith("@"):
+            rules.append(f"{selector}{{{body}}}")       # @keyframes, @font-face are global by name
+        else:
+            scoped = ",".join(f"{prefix} {part}" for part in selector.split(","))
+            rules.append(f"{scoped}{{{body}}}")
+        position = end + 1
+    return imports, rules
+
+
+def _source_versions():
+    # A few stats per rerun, so edited CSS files are picked up without restarting the server
+    versions = []
+    for path in SCOPES.values():
+        try:
+            stat = os.stat(path)
+            versions.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            versions.append(None)
+    return tuple(versions)
+
+
+@functools.lru_cache(maxsize=4)
+def _compile(versions):
+    # scope -> (imports, rules); versions is only the cache key
+    compiled = {}
+    for scope, path in SCOPES.items():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                css = minify(f.read())
+        except FileNotFoundError:
+            css = ""
+        compiled[scope] = _scope_rules(css, f":root:has(.theme-{scope})")
+    return compiled
+
+
+def _join(compiled, scopes):
+    imports = [rule for scope in scopes for rule in compiled[scope][0]]
+    rules = [rule for scope in scopes for rule in compiled[scope][1]]
+    return "".join(dict.fromkeys(imports)) + "".join(rules)   # @import has to come first
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_css(versions, scopes):
+    return _join(_compile(versions), scopes)
+
+
+def stylesheet():
+    # The complete minified stylesheet of all scopes
+    return _cached_css(_source_versions(), tuple(SCOPES))
+
+
+def _digest(css):
+    return hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+
+
+@functools.lru_cache(maxsize=4)
+def _write_stylesheet(css):
+    file_name = f"theme.{_digest(css)}.css"
+    path = os.path.join(CSS_DIR, file_name)
+    try:
+        if not os.path.isfile(path):
+            os.makedirs(CSS_DIR, exist_ok=True)
+            with atomic_path(path) as tmp:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(css)
+    except OSError:
+        return None     # e.g. read-only deployment, fall back to injecting the styles
+    return f"app/static/css/{file_name}"
+
+
+def stylesheet_url():
+    # URL of the content-hashed stylesheet under static/, or None if it can't be written
+    return _write_stylesheet(stylesheet())
+
+
+def inject_html(css):
+    # Script of the component that adds the stylesheet to the <head> of the app page (the component iframe
+    # has the same origin) and removes an older version of it
+    digest = _digest(css)
+    text = json.dumps(css).replace("</", "<\\/")     # a "</script>" inside the CSS must not end the script
+    return f"""<script>
+const doc = window.parent.document;
+if (!doc.getElementById("theme-{digest}")) {{
+    doc.querySelectorAll("style[data-theme]").forEach(old => old.remove());
+    const style = doc.createElement("style");
+    style.id = "theme-{digest}";
+    style.dataset.theme = "";
+    style.textContent = {text};
+    doc.head.appendChild(style);
+}}
+</script>"""
+
+# -------------------- PAGES --------------------
+def theme_html(*scopes, static_serving=False):
+    # HTML sent on every rerun: the marker of the scopes, with static serving the <link> of the stylesheet
+    unknown = [scope for scope in scopes if scope not in SCOPES]
+    if unknown:
+        raise KeyError(f"Unknown theme scope(s): {', '.join(unknown)}")
+    marker = f'<div class="{" ".join(f"theme-{scope}" for scope in scopes)}"></div>'
+    url = stylesheet_url() if static_serving else None
+    if url:
+        return f'<link rel="stylesheet" href="{url}">{marker}'
+    return marker
+
+
+def apply_theme(*scopes):
+    # Has to run on every rerun: Streamlit removes elements that the last run didn't produce,
+    # the <link> and the marker are tiny and the stylesheet stays in the browser cache (or the page <head>).
+    import streamlit as st
+
+    static_serving = st.get_option("server.enableStaticServing")
+    if not (static_serving and stylesheet_url()):
+        css = stylesheet()
+        digest = _digest(css)
+        if st.session_state.get("theme_injected") != digest:    # once per session and stylesheet version
+            # Newer Streamlit versions embed HTML strings with st.iframe, older ones only have components.html
+            iframe = getattr(st, "iframe", None)
+            if iframe is not None:
+                iframe(inject_html(css), height="content")     # the script has no content, so no height
+            else:
+                import streamlit.components.v1 as components
+
+                components.html(inject_html(css), height=0)
+            st.session_state["theme_injected"] = digest
+    st.markdown(theme_html(*scopes, static_serving=static_serving), unsafe_allow_html=True)
+
+# Code developed with the help of ChatGPT and Copilot.
@@ -0,0 +1,72 @@
+import csv
+import functools
+import os
+from datetime import date
+
+from utils.instrumentation import timed
+from utils.storage import WEIGHT_FILE, atomic_path, user_file, user_lock
+
+# -------------------- WEIGHT SERIES --------------------
+# weight_data.csv of a user ("Date,Weight", written by data_visualization.py with pandas) without pandas,
+# for the REST API (api.py) and the exporters. Parsed once per version (mtime, size) of the file.
+# Dates are reduced to "YYYY-MM-DD" (older files contain "2025-05-15 00:00:00"); for a date that occurs
+# more than once the last row wins, like drop_duplicates(keep="last") in the page. Rows with a date that is
+# not a valid day are skipped, every date handed out can be parsed with date.fromisoformat.
+WEIGHTS_CACHE_SIZE = 256
+
+
+def weights_path(profile_id):
+    return user_file(profile_id, WEIGHT_FILE)
+
+
+def _version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _parse(rows):
+    by_date = {}
+    for row in rows:
+        try:
+            by_date[date.fromisoformat(row["Date"][:10]).isoformat()] = float(row["Weight"])
+        except (KeyError, TypeError, ValueError):
+            continue    # empty or broken line, or a date that is not "YYYY-MM-DD"
+    return by_date
+
+
+@functools.lru_cache(maxsize=WEIGHTS_CACHE_SIZE)
+def _load(path, version):
+    # Sorted tuple of (date, weight); version is only the cache key
+    if version is None:
+        return ()
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return tuple(sorted(_parse(csv.DictReader(f)).items()))
+
+
+def load_weights(profile_id, start=None, end=None):
+    # [(date, weight)] sorted by date, optionally only from start to end ("YYYY-MM-DD", inclusive)
+    path = weights_path(profile_id)
+    weights = _load(path, _version(path))
+    return [(day, weight) for day, weight in weights
+            if (start is None or day >= start) and (end is None or day <= end)]
+
+
+@timed("write_weights_csv")
+def add_weights(profile_id, entries):
+    # entries: iterable of (date, weight); replaces existing weights of the same dates.
+    # The file is read past the cache, a version that is replaced right away should not take a cache slot.
+    path = weights_path(profile_id)
+    with user_lock(profile_id):
+        weights = dict(_load.__wrapped__(path, _version(path)))
+        weights.update((str(day)[:10], float(weight)) for day, weight in entries)
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Date", "Weight"])
+                writer.writerows(sorted(weights.items()))
+    return len(weights)
+
+# Code developed with the help of ChatGPT and Copilot.